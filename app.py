@@ -4,19 +4,30 @@ GuppShupp Memory & Personality Engine - Streamlit Demo
 This demo uses DIRECT IMPORTS (not API calls) for deployment reliability.
 The FastAPI server in server.py demonstrates the microservice architecture,
 but for the hosted demo, we run everything in-process to avoid cold start issues.
+
+All async work runs on one long-lived event loop in a background thread,
+sharing the same pooled resources the API server builds per worker, and
+results are cached by a hash of their inputs so reruns don't repeat LLM calls.
 """
 import streamlit as st
 import asyncio
+import hashlib
 import json
+import os
+import queue
+import threading
+from collections import OrderedDict
 from pathlib import Path
+from typing import AsyncIterator, Iterator
 
 # Direct imports for deployment safety (no API calls needed)
-from src.llm.client import GroqClient
-from src.extractors.orchestrator import MemoryOrchestrator
-from src.personality.engine import PersonalityEngine
-from src.personality.profiles import PROFILES
+from src.api.resources import AppResources
 from src.models.messages import ChatMessage
 from src.models.memory import UserMemory
+from src.models.personality import ComparisonEvent
+
+# Tunable: extraction/comparison results kept per app process
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "64"))
 
 # Page config
 st.set_page_config(
@@ -314,14 +325,96 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-# Initialize clients (cached for performance)
+class BackgroundLoop:
+    """
+    One event loop running forever in a daemon thread.
+    
+    Streamlit reruns the script on every interaction; keeping the loop
+    alive across reruns keeps pooled connections and background tasks
+    alive with it. Coroutines are submitted from the script thread.
+    """
+    
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="streamlit-loop", daemon=True)
+        self.thread.start()
+    
+    def run(self, coro):
+        """Run a coroutine on the loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+    
+    def iterate(self, stream: AsyncIterator) -> Iterator:
+        """Yield the items of an async iterator as the loop produces them."""
+        items = queue.Queue()
+        finished = object()
+        
+        async def pump():
+            try:
+                async for item in stream:
+                    items.put(item)
+            finally:
+                items.put(finished)
+        
+        future = asyncio.run_coroutine_threadsafe(pump(), self.loop)
+        try:
+            while (item := items.get()) is not finished:
+                yield item
+            future.result()  # Re-raise a failure inside the stream
+        finally:
+            # A rerun can abandon the loop above mid-stream
+            future.cancel()
+    
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+class ResultCache:
+    """Bounded LRU of finished results keyed by a hash of their inputs."""
+    
+    def __init__(self, size: int = RESULT_CACHE_SIZE):
+        self.size = size
+        self._items: OrderedDict[str, object] = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(*parts: str) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+    
+    def get(self, key: str):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+            return self._items.get(key)
+    
+    def put(self, key: str, value) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+
+# Initialize the loop and pooled resources once per app process
 @st.cache_resource
-def get_clients():
-    """Initialize Groq client and orchestrators once."""
-    client = GroqClient()
-    orchestrator = MemoryOrchestrator(client)
-    engine = PersonalityEngine(client)
-    return client, orchestrator, engine
+def get_runtime() -> tuple[BackgroundLoop, AppResources, ResultCache]:
+    """Start the background loop and build the shared resources on it."""
+    background = BackgroundLoop()
+    
+    async def build() -> AppResources:
+        resources = AppResources.create()
+        await resources.warm_up()
+        return resources
+    
+    try:
+        resources = background.run(build())
+    except Exception:
+        background.stop()
+        raise
+    return background, resources, ResultCache()
 
 
 # Load sample messages
@@ -334,14 +427,12 @@ def load_sample_messages():
     return [ChatMessage(**m) for m in data]
 
 
-def run_async(coro):
-    """Helper to run async functions in Streamlit."""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
+def messages_key(messages: list[ChatMessage]) -> str:
+    return ResultCache.key("extract", *(m.model_dump_json() for m in messages))
+
+
+def comparison_key(query: str, memory: UserMemory, profiles_version: str) -> str:
+    return ResultCache.key("compare", query, memory.model_dump_json(exclude={"extracted_at"}), profiles_version)
 
 
 # Main app
@@ -352,7 +443,7 @@ def main():
     
     # Initialize
     try:
-        client, orchestrator, engine = get_clients()
+        background, resources, results = get_runtime()
     except Exception as e:
         st.error(f"❌ Failed to initialize Groq client: {e}")
         st.info("💡 Make sure GROQ_API_KEY is set in your environment or .env file")
@@ -374,13 +465,31 @@ def main():
         
         # Memory extraction
         if st.button("🧠 Extract Memory", type="primary", use_container_width=True):
-            with st.spinner("Extracting preferences, emotions, and facts in parallel..."):
+            key = messages_key(messages)
+            memory = results.get(key)
+            if memory is not None:
+                st.session_state.memory = memory
+                st.success("✅ Memory loaded from cache")
+            else:
+                progress = st.empty()
                 try:
-                    memory = run_async(orchestrator.extract_all(messages))
+                    # Rule-based items arrive at once, LLM items as each extractor finishes
+                    # One count per registered extractor section
+                    counts = {spec.name: 0 for spec in resources.memory_orchestrator.registry.specs}
+                    for event in background.iterate(resources.memory_orchestrator.stream_all(messages)):
+                        if event.type == "item":
+                            counts[event.section] = counts.get(event.section, 0) + 1
+                            so_far = ", ".join(f"{n} {section.replace('_', ' ')}" for section, n in counts.items())
+                            progress.info(f"Extracting... {so_far} so far")
+                        elif event.type == "done":
+                            memory = event.memory
                     st.session_state.memory = memory
-                    st.success("✅ Memory extracted successfully!")
+                    # Failed sections are worth retrying on the next click
+                    if not memory.extraction_errors:
+                        results.put(key, memory)
+                    progress.success("✅ Memory extracted successfully!")
                 except Exception as e:
-                    st.error(f"❌ Extraction failed: {e}")
+                    progress.error(f"❌ Extraction failed: {e}")
     
     with col2:
         st.markdown('<p class="section-header">🧠 Extracted Memory</p>', unsafe_allow_html=True)
@@ -482,41 +591,66 @@ def main():
         else:
             memory = st.session_state.memory
             
-            with st.spinner("Generating responses with different personalities..."):
-                try:
-                    # Generate generic response (no memory)
-                    generic = run_async(engine.generate_generic_response(query))
-                    
-                    # Generate personalized responses
-                    responses = run_async(engine.generate_comparison(query, memory))
-                    
-                    # Display results
-                    st.markdown("### ❌ Without Memory (Generic)")
-                    st.markdown(f'<div class="generic-response">{generic}</div>', unsafe_allow_html=True)
-                    
-                    st.markdown("### ✅ With Memory + Personality")
-                    
-                    cols = st.columns(3, gap="medium")
-                    
-                    personality_styles = {
-                        "calm-mentor": ("personality-calm", "🧘 Calm Mentor", "Warm, patient guide using Socratic questioning"),
-                        "witty-friend": ("personality-witty", "😄 Witty Friend", "Playful companion using humor and references"),
-                        "therapist": ("personality-therapist", "💜 Therapist", "Empathetic listener using reflective techniques"),
-                    }
-                    
-                    for i, (pid, resp) in enumerate(responses.items()):
-                        with cols[i]:
-                            style, title, desc = personality_styles.get(pid, ("personality-calm", pid, ""))
-                            st.markdown(f'''
-                            <div class="{style}">
-                                <div class="personality-title">{title}</div>
-                                <div class="personality-desc">{desc}</div>
-                                <div class="personality-response">{resp.response}</div>
-                            </div>
-                            ''', unsafe_allow_html=True)
-                    
-                except Exception as e:
-                    st.error(f"❌ Generation failed: {e}")
+            try:
+                # Placeholders are filled as each response finishes
+                st.markdown("### ❌ Without Memory (Generic)")
+                generic_slot = st.empty()
+                
+                st.markdown("### ✅ With Memory + Personality")
+                
+                # One registry for the whole comparison, even if profiles reload meanwhile
+                registry = resources.personality_engine.profiles.current
+                profile_ids = list(registry)
+                cols = st.columns(len(profile_ids), gap="medium")
+                
+                personality_styles = {
+                    "calm-mentor": ("personality-calm", "🧘 Calm Mentor", "Warm, patient guide using Socratic questioning"),
+                    "witty-friend": ("personality-witty", "😄 Witty Friend", "Playful companion using humor and references"),
+                    "therapist": ("personality-therapist", "💜 Therapist", "Empathetic listener using reflective techniques"),
+                }
+                
+                slots = {}
+                for i, pid in enumerate(profile_ids):
+                    with cols[i]:
+                        slots[pid] = st.empty()
+                        slots[pid].info("Thinking...")
+                
+                def render(event: ComparisonEvent) -> None:
+                    if event.type == "generic":
+                        generic_slot.markdown(f'<div class="generic-response">{event.generic}</div>', unsafe_allow_html=True)
+                    elif event.type == "personality":
+                        style, title, desc = personality_styles.get(event.personality_id, ("personality-calm", event.personality_id, ""))
+                        slot = slots.get(event.personality_id)
+                        if slot is None:
+                            return
+                        slot.markdown(f'''
+                        <div class="{style}">
+                            <div class="personality-title">{title}</div>
+                            <div class="personality-desc">{desc}</div>
+                            <div class="personality-response">{event.response.response}</div>
+                        </div>
+                        ''', unsafe_allow_html=True)
+                    elif event.type == "error":
+                        slot = slots.get(event.personality_id, generic_slot)
+                        slot.error(f"❌ {event.error}")
+                
+                key = comparison_key(query, memory, registry.version)
+                events = results.get(key)
+                if events is not None:
+                    for event in events:
+                        render(event)
+                    st.caption("Served from cache")
+                else:
+                    # Generic baseline and all personalities run concurrently
+                    events = []
+                    for event in background.iterate(resources.personality_engine.stream_comparison(query, memory, registry=registry)):
+                        events.append(event)
+                        render(event)
+                    if not any(e.type == "error" or (e.response and e.response.degraded) for e in events):
+                        results.put(key, events)
+            
+            except Exception as e:
+                st.error(f"❌ Generation failed: {e}")
     
     # Footer
     st.markdown('''
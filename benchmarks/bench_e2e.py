@@ -0,0 +1,245 @@
+"""
+End-to-end latency and throughput of extract, respond and compare.
+
+Drives the real MemoryOrchestrator, PersonalityEngine and FastAPI app
+against SimulatedLLM (benchmarks/simulated_llm.py), so the numbers
+cover everything except the provider itself: prompt building,
+pre-filtering, dispatch, validation, serialization and HTTP handling.
+Each scenario runs through one or more targets:
+- engine: orchestrator / engine called directly
+- asgi:   the app through httpx's ASGI transport (no sockets)
+- http:   the app served by uvicorn on a loopback port, in this
+          process and event loop (CPU time includes the client)
+
+Every (scenario, target, concurrency, history size) cell runs a closed
+loop of `concurrency` workers over `--requests` distinct requests and
+reports throughput, p50/p95/p99 latency and process CPU time per
+request. History size is the number of messages for extract and scales
+the memory passed to respond and compare.
+
+Save results with --output and diff two runs with benchmarks.compare.
+
+Usage:
+    python -m benchmarks.bench_e2e
+    python -m benchmarks.bench_e2e --scenarios extract --targets engine http --concurrency 1 32
+    python -m benchmarks.bench_e2e --output results.json --time-scale 0.05
+"""
+import argparse
+import asyncio
+import json
+import platform
+import socket
+import subprocess
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable
+import httpx
+import uvicorn
+from benchmarks.simulated_llm import SimulatedLLM, simulated_client
+from src.api.resources import LLM_MAX_CONCURRENCY, AppResources
+from src.models.memory import Fact, Preference, UserMemory
+from src.models.messages import ChatMessage
+from src.observability.metrics import Histogram
+
+SAMPLES = Path(__file__).resolve().parents[1] / "data" / "sample_messages.json"
+SCENARIOS = ("extract", "respond", "compare")
+TARGETS = ("engine", "asgi", "http")
+PATHS = {"extract": "/api/extract", "respond": "/api/respond", "compare": "/api/compare"}
+
+Send = Callable[[str, dict], Awaitable[None]]
+
+
+def make_history(size: int, salt: int) -> list[dict]:
+    """`size` sample messages; the salt makes every request's transcript distinct."""
+    samples = json.loads(SAMPLES.read_text())
+    history = [dict(samples[i % len(samples)]) for i in range(size)]
+    history[-1]["content"] += f" (#{salt})"
+    return history
+
+
+def make_memory(history: int) -> UserMemory:
+    """Memory roughly as large as extraction over `history` messages would produce."""
+    count = max(1, history // 5)
+    return UserMemory(
+        preferences=[Preference(
+            category="interests", description=f"Enjoys activity {i}", confidence=0.8,
+            source_message_ids=[i], evidence=f"I love activity {i}",
+        ) for i in range(count)],
+        facts=[Fact(
+            category="professional", fact=f"Works on project {i}", importance="medium",
+            confidence=0.9, source_message_ids=[i],
+        ) for i in range(count)],
+        message_count=history,
+    )
+
+
+def make_payload(scenario: str, history: int, index: int) -> dict:
+    if scenario == "extract":
+        return {"messages": make_history(history, index)}
+    payload = {
+        "query": f"Work has been rough this week, any advice? (#{index})",
+        "memory": make_memory(history).model_dump(mode="json"),
+    }
+    if scenario == "respond":
+        payload["personality_id"] = ("calm-mentor", "witty-friend", "therapist")[index % 3]
+    return payload
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@asynccontextmanager
+async def open_target(target: str, resources: AppResources) -> AsyncIterator[Send]:
+    """Yield a `send(scenario, payload)` coroutine for one target."""
+    if target == "engine":
+        async def send(scenario: str, payload: dict) -> None:
+            if scenario == "extract":
+                messages = [ChatMessage.model_validate(m) for m in payload["messages"]]
+                await resources.memory_orchestrator.extract_all(messages)
+                return
+            memory = UserMemory.model_validate(payload["memory"])
+            engine = resources.personality_engine
+            if scenario == "respond":
+                await engine.generate_response(payload["query"], memory, payload["personality_id"])
+            else:
+                await engine.generate_comparison(payload["query"], memory)
+        yield send
+        return
+    
+    from server import app
+    app.state.resources = resources
+    server = None
+    if target == "asgi":
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+    else:
+        port = free_port()
+        server = uvicorn.Server(uvicorn.Config(app, port=port, lifespan="off", log_level="warning"))
+        serving = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.01)
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60)
+    
+    async def send(scenario: str, payload: dict) -> None:
+        response = await client.post(PATHS[scenario], json=payload)
+        response.raise_for_status()
+    
+    try:
+        yield send
+    finally:
+        await client.aclose()
+        if server is not None:
+            server.should_exit = True
+            await serving
+
+
+async def run_cell(args, scenario: str, target: str, concurrency: int, history: int) -> dict:
+    """One closed-loop run with fresh resources; returns the result row."""
+    llm = SimulatedLLM(time_scale=args.time_scale, seed=args.seed)
+    resources = AppResources.create(simulated_client(llm, args.llm_concurrency))
+    await resources.warm_up()
+    warm = [make_payload(scenario, history, -i - 1) for i in range(min(concurrency, 4))]
+    payloads = iter([make_payload(scenario, history, i) for i in range(args.requests)])
+    latencies = Histogram(max_samples=args.requests)
+    errors = 0
+    
+    async def worker(send: Send) -> None:
+        nonlocal errors
+        for payload in payloads:
+            started = time.perf_counter()
+            try:
+                await send(scenario, payload)
+            except Exception:
+                errors += 1
+                continue
+            latencies.observe(time.perf_counter() - started)
+    
+    try:
+        async with open_target(target, resources) as send:
+            await asyncio.gather(*(send(scenario, p) for p in warm))
+            calls = llm.calls
+            cpu = time.process_time()
+            started = time.perf_counter()
+            await asyncio.gather(*(worker(send) for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+            cpu = time.process_time() - cpu
+    finally:
+        await resources.shutdown(drain_timeout=5)
+    
+    return {
+        "scenario": scenario,
+        "target": target,
+        "concurrency": concurrency,
+        "history": history,
+        "requests": args.requests,
+        "errors": errors,
+        "llm_calls": llm.calls - calls,
+        "throughput_rps": latencies.count / elapsed,
+        "p50_ms": latencies.percentile(50) * 1e3,
+        "p95_ms": latencies.percentile(95) * 1e3,
+        "p99_ms": latencies.percentile(99) * 1e3,
+        "cpu_ms_per_request": cpu / args.requests * 1e3,
+    }
+
+
+def run_metadata(args) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "benchmark": "e2e",
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time_scale": args.time_scale,
+        "llm_concurrency": args.llm_concurrency,
+        "seed": args.seed,
+    }
+
+
+async def run(args) -> list[dict]:
+    header = (f"{'scenario':<9}{'target':<8}{'conc':>5}{'history':>8}{'req/s':>9}"
+              f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'cpu ms/req':>12}{'errors':>8}")
+    print(header)
+    results = []
+    for scenario in args.scenarios:
+        for target in args.targets:
+            for history in args.history:
+                for concurrency in args.concurrency:
+                    r = await run_cell(args, scenario, target, concurrency, history)
+                    results.append(r)
+                    print(f"{scenario:<9}{target:<8}{concurrency:>5}{history:>8}{r['throughput_rps']:>9.1f}"
+                          f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+                          f"{r['cpu_ms_per_request']:>12.2f}{r['errors']:>8}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--history", type=int, nargs="+", default=[20, 200], help="messages per request")
+    parser.add_argument("--requests", type=int, default=60, help="measured requests per cell")
+    parser.add_argument("--time-scale", type=float, default=0.1, help="multiplier on simulated LLM latency")
+    parser.add_argument("--llm-concurrency", type=int, default=LLM_MAX_CONCURRENCY)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    args = parser.parse_args()
+    
+    results = asyncio.run(run(args))
+    if args.output:
+        args.output.write_text(json.dumps({"meta": run_metadata(args), "results": results}, indent=2))
+        print(f"\nWrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
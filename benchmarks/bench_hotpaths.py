@@ -0,0 +1,278 @@
+"""
+CPU hot-path microbenchmarks with a stored baseline and regression gate.
+
+Times the per-request CPU work that runs outside the LLM call, for
+memories and histories from tiny to 100k items:
+- memory.validate:   UserMemory.model_validate_json (request bodies)
+- memory.dump:       UserMemory to JSON bytes (PydanticJSONResponse)
+- memory.context:    PersonalityEngine._build_memory_context
+- prompt.render:     memory context spliced into a compiled profile prompt
+- compare.dump:      a full comparison response to JSON bytes
+- messages.format:   MemoryOrchestrator._format_messages (pre-filter + compaction)
+- messages.rules:    MemoryOrchestrator.quick_extract (rule extractor)
+History cases stop at --max-messages (10k) by default: at 100k messages
+a single call takes seconds.
+
+Inputs come from benchmarks.synthetic, so they are the same on every run.
+Each case reports the best of at least --repeat timing runs, and of as
+many more as fit in --min-time (large sizes get few calls per run, so
+they need more runs for a stable minimum). Timings are divided by a
+fixed pure-Python calibration loop timed in between the runs, so a
+baseline recorded on one machine stays roughly comparable on another,
+and a machine slowing down mid-run doesn't read as a regression.
+
+Every case also records its noise: how far the median run is above the
+best one. --save writes the baseline (benchmarks/baselines/hotpaths.json
+by default), timing each case three times as long by default; --check
+compares against it and exits 1 if any case is still slower than
+--threshold after --retries re-timings. A case whose baseline was noisy
+gets up to twice its noise more room, but never more than --threshold
+again (so at most 50% at the default 25%); the current run's noise
+never widens the gate.
+
+Usage:
+    python -m benchmarks.bench_hotpaths
+    python -m benchmarks.bench_hotpaths --save
+    python -m benchmarks.bench_hotpaths --check --threshold 0.25
+    python -m benchmarks.bench_hotpaths --cases memory.context prompt.render --sizes 10 100000
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import timeit
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+from benchmarks.simulated_llm import SimulatedLLM, simulated_client
+from benchmarks.synthetic import SyntheticConfig, generate_user
+from src.extractors.orchestrator import MemoryOrchestrator
+from src.models.adapters import type_adapter
+from src.models.memory import UserMemory
+from src.models.messages import ChatMessage
+from src.models.personality import PersonalityResponse
+from src.personality.engine import PersonalityEngine
+from src.personality.profiles import PROFILES
+from src.personality.registry import CompiledProfile
+
+BASELINE = Path(__file__).parent / "baselines" / "hotpaths.json"
+SIZES = (1, 100, 10_000, 100_000)
+# Cases whose input does not grow with size run once, at the smallest size
+FIXED_SIZE = {"prompt.render", "compare.dump"}
+# History cases take seconds per call beyond this; --max-messages raises it
+MESSAGE_CASES = {"messages.format", "messages.rules"}
+MAX_MESSAGES = 10_000
+# A case may be this many times its baseline noise slower (up to twice the
+# threshold) before it counts as a regression
+NOISE_FACTOR = 2.0
+# Seconds of timing runs per case: checks, and baselines (which need a stable best)
+MIN_TIME = 2.0
+SAVE_MIN_TIME = 6.0
+
+
+class Inputs:
+    """Lazily built, cached benchmark inputs per size."""
+    
+    def __init__(self):
+        self._memories: dict[int, UserMemory] = {}
+        self._messages: dict[int, list[ChatMessage]] = {}
+        self.orchestrator = MemoryOrchestrator(simulated_client(SimulatedLLM()))
+    
+    def memory(self, items: int) -> UserMemory:
+        if items not in self._memories:
+            user = generate_user(0, config=SyntheticConfig(messages=(50, 50), memory_items=items))
+            self._memories[items] = UserMemory.model_validate(user["memory"])
+        return self._memories[items]
+    
+    def messages(self, count: int) -> list[ChatMessage]:
+        if count not in self._messages:
+            user = generate_user(0, config=SyntheticConfig(messages=(count, count)))
+            self._messages[count] = [ChatMessage.model_validate(m) for m in user["messages"]]
+        return self._messages[count]
+
+
+def case_memory_validate(inputs: Inputs, size: int) -> Callable:
+    payload = inputs.memory(size).model_dump_json()
+    return lambda: UserMemory.model_validate_json(payload)
+
+
+def case_memory_dump(inputs: Inputs, size: int) -> Callable:
+    memory = inputs.memory(size)
+    adapter = type_adapter(UserMemory)
+    return lambda: adapter.dump_json(memory)
+
+
+def case_memory_context(inputs: Inputs, size: int) -> Callable:
+    memory = inputs.memory(size)
+    return lambda: PersonalityEngine._build_memory_context(memory)
+
+
+def case_prompt_render(inputs: Inputs, size: int) -> Callable:
+    compiled = CompiledProfile.compile(PROFILES["calm-mentor"])
+    context = PersonalityEngine._build_memory_context(inputs.memory(100))
+    return lambda: compiled.render(context)
+
+
+def case_compare_dump(inputs: Inputs, size: int) -> Callable:
+    responses = {
+        pid: PersonalityResponse(personality_id=pid, personality_name=p.name, response=p.fallback_response * 8)
+        for pid, p in PROFILES.items()
+    }
+    adapter = type_adapter(dict[str, PersonalityResponse])
+    return lambda: adapter.dump_json(responses)
+
+
+def case_messages_format(inputs: Inputs, size: int) -> Callable:
+    messages = inputs.messages(size)
+    return lambda: inputs.orchestrator._format_messages(messages)
+
+
+def case_messages_rules(inputs: Inputs, size: int) -> Callable:
+    messages = inputs.messages(size)
+    return lambda: inputs.orchestrator.quick_extract(messages)
+
+
+CASES: dict[str, Callable[[Inputs, int], Callable]] = {
+    "memory.validate": case_memory_validate,
+    "memory.dump": case_memory_dump,
+    "memory.context": case_memory_context,
+    "prompt.render": case_prompt_render,
+    "compare.dump": case_compare_dump,
+    "messages.format": case_messages_format,
+    "messages.rules": case_messages_rules,
+}
+
+
+def calibration_workload():
+    """Fixed pure-Python workload used to normalise timings."""
+    return sorted(str(i * 7919 % 10007) for i in range(20000))
+
+
+def measure(fn: Callable, repeat: int, min_time: float) -> tuple[list[float], list[float]]:
+    """
+    Seconds per call of `fn` and of the calibration workload, one sample
+    of each per run. Each run of `fn` lasts at least ~0.2s; runs continue
+    past `repeat` until `min_time` seconds of `fn` were timed.
+    """
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    calibration = timeit.Timer(calibration_workload)
+    samples, calibrations = [], []
+    started = time.perf_counter()
+    while len(samples) < repeat or time.perf_counter() - started < min_time:
+        calibrations.append(calibration.timeit(number=5) / 5)
+        samples.append(timer.timeit(number=number) / number)
+    return samples, calibrations
+
+
+def case_sizes(name: str, sizes: list[int], max_messages: int) -> list[int]:
+    if name in FIXED_SIZE:
+        return [min(sizes)]
+    if name in MESSAGE_CASES:
+        return [s for s in sizes if s <= max_messages]
+    return sizes
+
+
+def time_case(inputs: Inputs, key: str, repeat: int, min_time: float) -> dict:
+    """Time one "name/size" case, normalised by calibration runs in between."""
+    name, size = key.rsplit("/", 1)
+    fn = CASES[name](inputs, int(size))
+    samples, calibrations = measure(fn, repeat, min_time)
+    seconds, calibration = min(samples), min(calibrations)
+    noise = statistics.median(samples) / seconds - 1
+    print(f"{name:<18}{size:>8}{seconds * 1e6:>14.2f}{seconds / calibration:>12.5f}{noise:>8.0%}", flush=True)
+    return {
+        "seconds": seconds,
+        "normalized": seconds / calibration,
+        "calibration_seconds": calibration,
+        "noise": noise,
+        "runs": len(samples),
+    }
+
+
+def run(inputs: Inputs, keys: list[str], repeat: int, min_time: float) -> dict:
+    results = {key: time_case(inputs, key, repeat, min_time) for key in keys}
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def allowed_slowdown(base: dict, threshold: float) -> float:
+    """`threshold`, widened (at most twofold) for cases with a noisy baseline."""
+    return threshold + min(NOISE_FACTOR * base.get("noise", 0.0), threshold)
+
+
+def check(baseline: dict, current: dict, threshold: float) -> list[tuple[str, float]]:
+    """(case, slowdown) for every case slower than the baseline by more than its allowed slowdown."""
+    regressions = []
+    for key, result in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        slowdown = result["normalized"] / base["normalized"] - 1
+        if slowdown > allowed_slowdown(base, threshold):
+            regressions.append((key, slowdown))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="memory items / messages")
+    parser.add_argument("--max-messages", type=int, default=MAX_MESSAGES, help="largest history for messages.* cases")
+    parser.add_argument("--repeat", type=int, default=5, help="minimum timing runs per case")
+    parser.add_argument(
+        "--min-time", type=float, default=None,
+        help=f"minimum seconds of timing runs per case (default {MIN_TIME}, {SAVE_MIN_TIME} with --save)",
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 if a case regressed past --threshold")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, e.g. 0.25 = 25%%")
+    parser.add_argument("--retries", type=int, default=2, help="re-time regressed cases before failing")
+    args = parser.parse_args()
+    
+    if args.min_time is None:
+        args.min_time = SAVE_MIN_TIME if args.save else MIN_TIME
+    inputs = Inputs()
+    keys = [f"{name}/{size}" for name in args.cases for size in case_sizes(name, args.sizes, args.max_messages)]
+    print(f"{'case':<18}{'size':>8}{'us per call':>14}{'normalized':>12}{'noise':>8}")
+    current = run(inputs, keys, args.repeat, args.min_time)
+    
+    if args.check:
+        if not args.baseline.exists():
+            parser.error(f"no baseline at {args.baseline}; run with --save first")
+        baseline = json.loads(args.baseline.read_text())
+        regressions = check(baseline, current, args.threshold)
+        # A noisy neighbour can slow any single run: keep the best of a few
+        for _ in range(args.retries):
+            if not regressions:
+                break
+            print(f"\nRe-timing {len(regressions)} slow cases")
+            for key, _ in regressions:
+                retry = time_case(inputs, key, args.repeat, args.min_time)
+                current["results"][key] = min(current["results"][key], retry, key=lambda r: r["normalized"])
+            regressions = check(baseline, current, args.threshold)
+        for key, slowdown in regressions:
+            allowed = allowed_slowdown(baseline["results"][key], args.threshold)
+            print(f"REGRESSION {key}: {slowdown:+.0%} vs baseline (allowed {allowed:+.0%})")
+        print(f"\n{len(regressions)} regressions beyond {args.threshold:.0%} "
+              f"(up to {2 * args.threshold:.0%} for noisy baselines; "
+              f"{len(current['results'])} cases checked against {args.baseline})")
+        if regressions:
+            sys.exit(1)
+    if args.save:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(current, indent=2) + "\n")
+        print(f"\nSaved baseline to {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Microbenchmarks for the JSON hot path.
+
+Compares the old and new ways of:
+- turning LLM output into validated extraction models
+  (json.loads + model_validate  vs  model_validate_json)
+- serializing route responses
+  through the installed FastAPI version: response_model re-validation or
+  jsonable_encoder  vs  PydanticJSONResponse
+
+Usage:
+    python -m benchmarks.bench_json
+    python -m benchmarks.bench_json --sizes 100 10000 --repeat 5
+"""
+import argparse
+import json
+import timeit
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.api.responses import PydanticJSONResponse
+from src.models.memory import (
+    Preference, EmotionalPattern, Fact, FactList, UserMemory,
+)
+from src.models.personality import PersonalityResponse
+
+
+def make_memory(items: int) -> UserMemory:
+    """UserMemory with `items` entries split evenly across the three sections."""
+    third = max(1, items // 3)
+    return UserMemory(
+        preferences=[
+            Preference(
+                category="interests",
+                description=f"Enjoys activity number {i} on weekends",
+                confidence=0.9,
+                source_message_ids=[i, i + 1],
+                evidence=f"User said 'I love activity {i}'",
+            )
+            for i in range(third)
+        ],
+        emotional_patterns=[
+            EmotionalPattern(
+                pattern=f"Gets stressed about deadline type {i}",
+                triggers=["deadlines", "manager"],
+                frequency="frequent",
+                emotional_range=["stressed", "anxious"],
+                source_message_ids=[i],
+            )
+            for i in range(third)
+        ],
+        facts=[
+            Fact(
+                category="professional",
+                fact=f"Worked on project {i} at a startup",
+                importance="medium",
+                confidence=0.8,
+                source_message_ids=[i],
+            )
+            for i in range(third)
+        ],
+        message_count=items,
+    )
+
+
+def _best(fn, repeat: int, number: int) -> float:
+    """Best-of-`repeat` seconds per call."""
+    return min(timeit.repeat(fn, repeat=repeat, number=number)) / number
+
+
+def bench_llm_output(items: int, repeat: int) -> dict[str, float]:
+    payload = FactList(facts=make_memory(items * 3).facts).model_dump_json()
+    number = max(1, 2000 // max(items, 1))
+    old = _best(lambda: FactList.model_validate(json.loads(payload)), repeat, number)
+    new = _best(lambda: FactList.model_validate_json(payload), repeat, number)
+    return {"old_ms": old * 1e3, "new_ms": new * 1e3, "speedup": old / new}
+
+
+def _route_bench(old_route, new_route, number: int, repeat: int) -> dict[str, float]:
+    """Time two GET routes through the installed FastAPI stack (in-process ASGI)."""
+    app = FastAPI()
+    app.get("/old", **old_route[1])(old_route[0])
+    app.get("/new")(new_route)
+    client = TestClient(app)
+    old_s = _best(lambda: client.get("/old").content, repeat, number)
+    new_s = _best(lambda: client.get("/new").content, repeat, number)
+    return {"old_ms": old_s * 1e3, "new_ms": new_s * 1e3, "speedup": old_s / new_s}
+
+
+def bench_response(items: int, repeat: int) -> dict[str, float]:
+    """`response_model=UserMemory` returning a model vs PydanticJSONResponse."""
+    memory = make_memory(items)
+    
+    async def old():
+        return memory
+    
+    async def new():
+        return PydanticJSONResponse(memory)
+    
+    number = max(1, 300 // max(items, 1))
+    return _route_bench((old, {"response_model": UserMemory}), new, number, repeat)
+
+
+def bench_compare(items: int, repeat: int) -> dict[str, float]:
+    """Untyped dict of models (jsonable_encoder) vs a typed PydanticJSONResponse."""
+    memory = make_memory(items)
+    responses = {
+        str(i): PersonalityResponse(
+            personality_id=str(i), personality_name=f.fact, response=f.fact * 20,
+        )
+        for i, f in enumerate(memory.facts)
+    }
+    
+    async def old():
+        return responses
+    
+    async def new():
+        return PydanticJSONResponse(responses, annotation=dict[str, PersonalityResponse])
+    
+    number = max(1, 300 // max(items, 1))
+    return _route_bench((old, {}), new, number, repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    print(f"{'case':<22}{'items':>8}{'old ms':>12}{'new ms':>12}{'speedup':>10}")
+    for items in args.sizes:
+        for name, bench in (
+            ("llm output -> model", bench_llm_output),
+            ("memory response", bench_response),
+            ("compare response", bench_compare),
+        ):
+            r = bench(items, args.repeat)
+            print(f"{name:<22}{items:>8}{r['old_ms']:>12.3f}{r['new_ms']:>12.3f}{r['speedup']:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
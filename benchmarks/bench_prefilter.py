@@ -0,0 +1,85 @@
+"""
+Token savings and recall of the extraction pre-filter.
+
+Runs MessagePrefilter over the labelled corpus in
+benchmarks/prefilter_corpus.jsonl (one {"content", "signal"} object per
+line) and reports, per threshold:
+- how many messages were kept, dropped or collapsed as duplicates
+- estimated prompt tokens sent to the three extractors, before and after
+- recall: share of signal messages still visible to the extractors
+- noise removed: share of content-free messages that were dropped
+- filter cost per message
+
+Usage:
+    python -m benchmarks.bench_prefilter
+    python -m benchmarks.bench_prefilter --thresholds 0.3 0.5 0.7 --scale 100
+"""
+import argparse
+import json
+import timeit
+from pathlib import Path
+from src.extractors.compaction import estimate_tokens
+from src.extractors.prefilter import MessagePrefilter
+from src.models.messages import ChatMessage
+from src.observability.metrics import MetricsRegistry
+
+CORPUS = Path(__file__).parent / "prefilter_corpus.jsonl"
+EXTRACTORS = 3
+
+
+def load_corpus(path: Path = CORPUS) -> tuple[list[ChatMessage], list[bool]]:
+    """Messages and their hand labels (True = carries extractable signal)."""
+    rows = [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+    return [ChatMessage(content=r["content"]) for r in rows], [r["signal"] for r in rows]
+
+
+def bench_threshold(messages: list[ChatMessage], labels: list[bool], threshold: float, scale: int) -> dict:
+    prefilter = MessagePrefilter(threshold=threshold, metrics=MetricsRegistry())
+    result = prefilter.apply(messages)
+    
+    visible = {i for i, _ in result.kept} | {d for dups in result.duplicates.values() for d in dups}
+    signal = [i for i, label in enumerate(labels) if label]
+    noise = [i for i, label in enumerate(labels) if not label]
+    
+    before = estimate_tokens("\n".join(f"[{i}] {m.content}" for i, m in enumerate(messages))) * EXTRACTORS
+    after = estimate_tokens(result.format()) * EXTRACTORS
+    
+    scaled = messages * scale
+    seconds = min(timeit.repeat(lambda: prefilter.apply(scaled), number=1, repeat=3))
+    return {
+        "threshold": threshold,
+        "kept": len(result.kept),
+        "dropped": len(result.dropped),
+        "collapsed": sum(len(d) for d in result.duplicates.values()),
+        "tokens_before": before,
+        "tokens_after": after,
+        "tokens_saved_pct": 100 * (before - after) / before,
+        "recall": sum(i in visible for i in signal) / len(signal),
+        "noise_removed": sum(i in result.dropped for i in noise) / len(noise),
+        "missed": [messages[i].content for i in signal if i not in visible],
+        "us_per_message": seconds / len(scaled) * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.3, 0.5, 0.7])
+    parser.add_argument("--scale", type=int, default=50, help="corpus copies used for the timing run")
+    args = parser.parse_args()
+    
+    messages, labels = load_corpus()
+    print(f"corpus: {len(messages)} messages, {sum(labels)} with signal")
+    print(f"{'threshold':>10}{'kept':>6}{'drop':>6}{'dup':>5}{'tokens':>15}{'saved':>8}{'recall':>8}{'noise':>8}{'us/msg':>8}")
+    for threshold in args.thresholds:
+        r = bench_threshold(messages, labels, threshold, args.scale)
+        print(
+            f"{r['threshold']:>10.2f}{r['kept']:>6}{r['dropped']:>6}{r['collapsed']:>5}"
+            f"{r['tokens_before']:>7} -> {r['tokens_after']:<5}{r['tokens_saved_pct']:>7.1f}%"
+            f"{r['recall']:>8.1%}{r['noise_removed']:>8.1%}{r['us_per_message']:>8.1f}"
+        )
+        for content in r["missed"]:
+            print(f"{'':>10}missed: {content!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Prompt assembly and profile registry swap cost.
+
+Compares building a personality system prompt per request with the old
+full f-string against splicing the memory context into a pre-rendered
+CompiledProfile, and times a ProfileStore hot reload (read, validate,
+compile, swap) for directories of increasing size.
+
+Usage:
+    python -m benchmarks.bench_profiles
+    python -m benchmarks.bench_profiles --profiles 3 100 1000 --number 20000
+"""
+import argparse
+import json
+import tempfile
+import timeit
+from pathlib import Path
+from src.models.memory import Fact, Preference, UserMemory
+from src.models.personality import PersonalityProfile
+from src.observability.metrics import MetricsRegistry
+from src.personality.engine import PersonalityEngine
+from src.personality.profiles import PROFILES
+from src.personality.registry import CompiledProfile, ProfileStore
+
+
+def fstring_prompt(profile: PersonalityProfile, memory_context: str) -> str:
+    """The per-request f-string the engine used before profiles were compiled."""
+    return f"""{profile.system_prompt}
+
+USER CONTEXT (incorporate naturally, don't force it or be creepy about it):
+{memory_context}
+
+STYLE GUIDELINES:
+- Formality Level: {profile.formality_level}/10
+- Humor Level: {profile.humor_level}/10
+- Empathy Level: {profile.empathy_level}/10
+
+Remember: Use the context to make responses feel personal, but don't explicitly state "I know you like X" - weave it in naturally."""
+
+
+def memory_context() -> str:
+    memory = UserMemory(
+        preferences=[Preference(
+            category="interests", description="Enjoys hiking", confidence=0.9,
+            source_message_ids=[0], evidence="I love hiking",
+        )],
+        facts=[Fact(category="personal", fact="Has a dog", importance="high", confidence=0.9, source_message_ids=[1])],
+    )
+    return PersonalityEngine._build_memory_context(memory)
+
+
+def bench_assembly(number: int) -> dict:
+    profile = PROFILES["calm-mentor"]
+    compiled = CompiledProfile.compile(profile)
+    context = memory_context()
+    assert compiled.render(context) == fstring_prompt(profile, context)
+    fstring = min(timeit.repeat(lambda: fstring_prompt(profile, context), number=number, repeat=5))
+    render = min(timeit.repeat(lambda: compiled.render(context), number=number, repeat=5))
+    return {"fstring_us": fstring / number * 1e6, "render_us": render / number * 1e6}
+
+
+def bench_swap(profiles: int, repeat: int) -> dict:
+    template = PROFILES["therapist"].model_dump()
+    with tempfile.TemporaryDirectory() as directory:
+        for i in range(profiles):
+            path = Path(directory) / f"profile-{i}.json"
+            path.write_text(json.dumps(template | {"id": f"profile-{i}"}))
+        store = ProfileStore(directory, metrics=MetricsRegistry())
+        seconds = timeit.repeat(lambda: store.reload(force=True), number=1, repeat=repeat)
+        scan = min(timeit.repeat(store.reload, number=1, repeat=repeat))
+    return {"profiles": profiles, "reload_ms": min(seconds) * 1e3, "scan_ms": scan * 1e3}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", type=int, nargs="+", default=[3, 100, 1000])
+    parser.add_argument("--number", type=int, default=20000, help="prompt assemblies per timing run")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    r = bench_assembly(args.number)
+    print("prompt assembly per request")
+    print(f"  f-string: {r['fstring_us']:8.2f} us")
+    print(f"  compiled: {r['render_us']:8.2f} us  ({r['fstring_us'] / r['render_us']:.1f}x)")
+    
+    print(f"\n{'profiles':>10}{'reload ms':>12}{'no-op scan ms':>15}")
+    for count in args.profiles:
+        r = bench_swap(count, args.repeat)
+        print(f"{r['profiles']:>10}{r['reload_ms']:>12.2f}{r['scan_ms']:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Compare two saved benchmark result files.
+
+Matches rows by their identifying fields (scenario, target, concurrency,
+history) and prints the relative change of each metric. A change worse
+than --threshold is flagged as a regression and makes the exit status 1,
+so this can gate CI. Simulated latency has jitter: compare runs made with
+the same --time-scale and --seed, and prefer p50 and CPU time over p99
+for small --requests.
+
+Usage:
+    python -m benchmarks.bench_e2e --output base.json      # on the old commit
+    python -m benchmarks.bench_e2e --output new.json       # on the new commit
+    python -m benchmarks.compare base.json new.json
+    python -m benchmarks.compare base.json new.json --threshold 0.2 --metrics p50_ms cpu_ms_per_request
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+KEY_FIELDS = ("scenario", "target", "concurrency", "history")
+# Metric -> True if higher is better
+METRICS = {
+    "throughput_rps": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "cpu_ms_per_request": False,
+}
+
+
+def load_results(path: Path) -> tuple[dict, dict[tuple, dict]]:
+    """Metadata and result rows keyed by their identifying fields."""
+    data = json.loads(Path(path).read_text())
+    rows = {tuple(r.get(f) for f in KEY_FIELDS): r for r in data["results"]}
+    return data.get("meta", {}), rows
+
+
+def change(old: float, new: float, higher_is_better: bool) -> float:
+    """Relative change, positive when `new` is worse."""
+    if old == 0:
+        return 0.0
+    delta = (new - old) / old
+    return -delta if higher_is_better else delta
+
+
+def compare(base: dict[tuple, dict], new: dict[tuple, dict], metrics: list[str], threshold: float) -> list[dict]:
+    """One entry per (row, metric) present in both files."""
+    entries = []
+    for key in base.keys() & new.keys():
+        for metric in metrics:
+            if metric not in base[key] or metric not in new[key]:
+                continue
+            worse = change(base[key][metric], new[key][metric], METRICS[metric])
+            entries.append({
+                "key": key,
+                "metric": metric,
+                "base": base[key][metric],
+                "new": new[key][metric],
+                "change": (new[key][metric] - base[key][metric]) / base[key][metric] if base[key][metric] else 0.0,
+                "worse_by": worse,
+                "regression": worse > threshold,
+            })
+    return sorted(entries, key=lambda e: (tuple(map(str, e["key"])), metrics.index(e["metric"])))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base", type=Path)
+    parser.add_argument("new", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative change counted as a regression")
+    parser.add_argument("--metrics", nargs="+", choices=list(METRICS), default=list(METRICS))
+    args = parser.parse_args()
+    
+    base_meta, base = load_results(args.base)
+    new_meta, new = load_results(args.new)
+    print(f"base: {base_meta.get('commit')}  new: {new_meta.get('commit')}")
+    for field in ("time_scale", "seed", "llm_concurrency"):
+        if base_meta.get(field) != new_meta.get(field):
+            print(f"warning: {field} differs ({base_meta.get(field)} vs {new_meta.get(field)})")
+    unmatched = base.keys() ^ new.keys()
+    if unmatched:
+        print(f"warning: {len(unmatched)} rows only in one file")
+    
+    entries = compare(base, new, args.metrics, args.threshold)
+    print(f"\n{'row':<32}{'metric':<20}{'base':>10}{'new':>10}{'change':>9}")
+    for e in entries:
+        row = "/".join(map(str, e["key"]))
+        flag = "  REGRESSION" if e["regression"] else ""
+        print(f"{row:<32}{e['metric']:<20}{e['base']:>10.2f}{e['new']:>10.2f}{e['change']:>+9.1%}{flag}")
+    
+    regressions = sum(e["regression"] for e in entries)
+    print(f"\n{regressions} regressions beyond {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Replay recorded API traffic against a running server.
+
+Reads a trace written by TraceRecorder (start the server with
+TRACE_LOG=trace.jsonl) and re-sends each /api/extract, /api/respond and
+/api/compare request, open loop:
+- with its original inter-arrival times (default),
+- time-scaled with --speed (2 = twice as fast), or
+- at a fixed --rate in requests/second (uniform or --arrivals poisson),
+  cycling through the trace for --limit requests.
+
+Requests are fired on schedule whether or not earlier ones have
+finished (up to --max-inflight), so a slow server can't slow the load
+down. Each request gets two latencies:
+- service:   from when it was actually sent
+- corrected: from when it was scheduled to be sent
+The corrected percentiles don't suffer from coordinated omission: time
+a request spent waiting behind a stalled server or an overloaded
+generator still counts against the server.
+
+Usage:
+    TRACE_LOG=trace.jsonl uvicorn server:app --port 8000   # record
+    python -m benchmarks.replay trace.jsonl --url http://localhost:8000
+    python -m benchmarks.replay trace.jsonl --rate 50 --limit 2000 --arrivals poisson --output replay.json
+"""
+import argparse
+import asyncio
+import json
+import random
+from collections import Counter
+from pathlib import Path
+import httpx
+from src.observability.metrics import Histogram
+from src.observability.traces import TRACED_PATHS
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def load_trace(path: Path, paths: tuple[str, ...] = TRACED_PATHS) -> list[dict]:
+    """Recorded requests on `paths`, in arrival order."""
+    records = []
+    with Path(path).open(encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if record["path"].startswith(paths):
+                    records.append(record)
+    return sorted(records, key=lambda r: r["t"])
+
+
+def schedule(
+    trace: list[dict],
+    speed: float = 1.0,
+    rate: float | None = None,
+    arrivals: str = "uniform",
+    limit: int | None = None,
+    seed: int = 0,
+) -> list[tuple[float, dict]]:
+    """
+    (send offset in seconds, record) pairs for the whole run.
+    
+    Recorded timing is kept unless `rate` is given; `limit` truncates the
+    trace, or with `rate` cycles it until `limit` requests are scheduled.
+    """
+    if rate is None:
+        records = trace[:limit]
+        first = records[0]["t"] if records else 0.0
+        return [((r["t"] - first) / speed, r) for r in records]
+    
+    rng = random.Random(seed)
+    count = limit or len(trace)
+    offsets, offset = [], 0.0
+    for _ in range(count):
+        offsets.append(offset)
+        offset += rng.expovariate(rate) if arrivals == "poisson" else 1 / rate
+    return [(offsets[i], trace[i % len(trace)]) for i in range(count)]
+
+
+class PathStats:
+    """Latency and outcome tallies for one path."""
+    
+    def __init__(self, samples: int):
+        self.service = Histogram(max_samples=samples)
+        self.corrected = Histogram(max_samples=samples)
+        self.outcomes: Counter[str] = Counter()
+    
+    @property
+    def errors(self) -> int:
+        return sum(n for outcome, n in self.outcomes.items() if not outcome.startswith("2"))
+    
+    def summary(self) -> dict:
+        total = sum(self.outcomes.values())
+        return {
+            "requests": total,
+            "errors": self.errors,
+            "error_rate": self.errors / total if total else 0.0,
+            "outcomes": dict(self.outcomes),
+            "service_ms": latency_summary(self.service),
+            "corrected_ms": latency_summary(self.corrected),
+        }
+
+
+def latency_summary(histogram: Histogram) -> dict:
+    if not histogram.count:
+        return {}
+    summary = {f"p{q:g}": histogram.percentile(q) * 1e3 for q in PERCENTILES}
+    summary["max"] = histogram.max * 1e3
+    return summary
+
+
+async def replay(
+    url: str,
+    plan: list[tuple[float, dict]],
+    max_inflight: int = 1000,
+    timeout: float = 60.0,
+) -> dict:
+    """Send every planned request on schedule; returns per-path and overall stats."""
+    loop = asyncio.get_running_loop()
+    stats = {"all": PathStats(len(plan))}
+    inflight = asyncio.Semaphore(max_inflight)
+    max_lag = 0.0
+    limits = httpx.Limits(max_connections=max_inflight, max_keepalive_connections=max_inflight)
+    
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        async def fire(record: dict, intended: float) -> None:
+            nonlocal max_lag
+            async with inflight:
+                sent = loop.time()
+                max_lag = max(max_lag, sent - intended)
+                try:
+                    response = await client.request(
+                        record.get("method", "POST"), record["path"],
+                        json=record["body"], headers=record.get("headers") or {},
+                    )
+                    outcome = str(response.status_code)
+                except httpx.TimeoutException:
+                    outcome = "timeout"
+                except httpx.HTTPError as e:
+                    outcome = type(e).__name__
+                done = loop.time()
+            for key in ("all", record["path"]):
+                path_stats = stats.setdefault(key, PathStats(len(plan)))
+                path_stats.outcomes[outcome] += 1
+                path_stats.service.observe(done - sent)
+                path_stats.corrected.observe(done - intended)
+        
+        start = loop.time()
+        tasks = []
+        for offset, record in plan:
+            delay = start + offset - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(fire(record, start + offset)))
+        await asyncio.gather(*tasks)
+        elapsed = loop.time() - start
+    
+    scheduled = plan[-1][0] if plan else 0.0
+    return {
+        "requests": len(plan),
+        "elapsed_s": elapsed,
+        "offered_rps": len(plan) / scheduled if scheduled else None,
+        "achieved_rps": len(plan) / elapsed if elapsed else None,
+        "max_send_lag_ms": max_lag * 1e3,
+        "paths": {path: s.summary() for path, s in stats.items()},
+    }
+
+
+def print_report(report: dict) -> None:
+    offered = report["offered_rps"]
+    print(f"{report['requests']} requests in {report['elapsed_s']:.1f}s "
+          f"(offered {offered or 0:.1f} req/s, achieved {report['achieved_rps'] or 0:.1f} req/s)")
+    if report["max_send_lag_ms"] > 50:
+        print(f"warning: requests were sent up to {report['max_send_lag_ms']:.0f} ms late "
+              f"(generator or --max-inflight limit); corrected latencies include that")
+    columns = "".join(f"{f'p{q:g}':>9}" for q in PERCENTILES) + f"{'max':>9}"
+    print(f"\n{'path':<16}{'latency ms':<11}{columns}{'errors':>9}")
+    for path, s in report["paths"].items():
+        for kind in ("service_ms", "corrected_ms"):
+            values = "".join(f"{v:>9.1f}" for v in s[kind].values())
+            errors = f"{s['error_rate']:>9.1%}" if kind == "service_ms" else ""
+            label = path if kind == "service_ms" else ""
+            print(f"{label:<16}{kind[:-3]:<11}{values}{errors}")
+        failed = {k: v for k, v in s["outcomes"].items() if not k.startswith("2")}
+        if failed:
+            print(f"{'':<16}failures: {failed}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trace", type=Path)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--speed", type=float, default=1.0, help="time-scale the recorded timing")
+    parser.add_argument("--rate", type=float, help="fixed open-loop rate in req/s instead of recorded timing")
+    parser.add_argument("--arrivals", choices=("uniform", "poisson"), default="uniform")
+    parser.add_argument("--limit", type=int, help="requests to send")
+    parser.add_argument("--paths", nargs="+", default=list(TRACED_PATHS))
+    parser.add_argument("--max-inflight", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write the report as JSON")
+    args = parser.parse_args()
+    
+    trace = load_trace(args.trace, tuple(args.paths))
+    if not trace:
+        parser.error(f"no requests for {args.paths} in {args.trace}")
+    plan = schedule(trace, args.speed, args.rate, args.arrivals, args.limit, args.seed)
+    report = asyncio.run(replay(args.url, plan, args.max_inflight, args.timeout))
+    print_report(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
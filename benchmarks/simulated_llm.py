@@ -0,0 +1,169 @@
+"""
+Latency-simulating stand-in for AsyncGroq used by the benchmarks.
+
+SimulatedLLM answers chat completions with valid canned content for each
+call kind (the three extractors, the generic baseline, personality
+replies) after sleeping for as long as a hosted model plausibly would:
+time to first token, plus prefill per input token, plus decode per
+output token, with seeded log-normal jitter. The small model is faster
+than the large one, so routing decisions show up in the numbers. Replies
+longer than max_tokens are cut there, and responses carry usage and a
+finish_reason like the real API.
+
+Nothing here burns CPU; measured CPU time is the application's own.
+"""
+import asyncio
+import json
+import random
+from dataclasses import dataclass
+from types import SimpleNamespace
+from src.llm.client import GroqClient
+from src.llm.dispatcher import LLMDispatcher
+from src.llm.prompts import (
+    EMOTION_EXTRACTION_PROMPT,
+    FACT_EXTRACTION_PROMPT,
+    GENERIC_RESPONSE_PROMPT,
+    PREFERENCE_EXTRACTION_PROMPT,
+)
+from src.llm.routing import SMALL_MODEL
+from src.llm.tokens import estimate_tokens
+from src.observability.metrics import MetricsRegistry
+
+KINDS = {
+    PREFERENCE_EXTRACTION_PROMPT: "preferences",
+    EMOTION_EXTRACTION_PROMPT: "emotional_patterns",
+    FACT_EXTRACTION_PROMPT: "facts",
+    GENERIC_RESPONSE_PROMPT: "generic",
+}
+
+REPLY = (
+    "That sounds like a lot to carry at once. It makes sense you'd feel stretched thin "
+    "when deadlines keep stacking up. What would make the next week feel a little lighter "
+    "for you - fewer commitments, or more time for the things that recharge you, like hiking?"
+)
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    """Seconds spent by one model: first token, then per input and output token."""
+    first_token: float
+    per_input_token: float
+    per_output_token: float
+    
+    def seconds(self, input_tokens: int, output_tokens: int) -> float:
+        return self.first_token + input_tokens * self.per_input_token + output_tokens * self.per_output_token
+
+
+SMALL = LatencyModel(first_token=0.08, per_input_token=0.00001, per_output_token=0.001)
+LARGE = LatencyModel(first_token=0.25, per_input_token=0.00004, per_output_token=0.004)
+
+
+def canned_items(kind: str, count: int) -> list[dict]:
+    """`count` valid extraction items of one kind."""
+    if kind == "preferences":
+        return [{
+            "category": "interests", "description": f"Enjoys outdoor activity {i}",
+            "confidence": 0.8, "source_message_ids": [i], "evidence": f"I love activity {i}",
+        } for i in range(count)]
+    if kind == "emotional_patterns":
+        return [{
+            "pattern": f"Gets stressed about deadline {i}", "triggers": ["deadlines"],
+            "frequency": "frequent", "emotional_range": ["stressed", "anxious"], "source_message_ids": [i],
+        } for i in range(count)]
+    return [{
+        "category": "professional", "fact": f"Works on project {i}", "importance": "medium",
+        "confidence": 0.9, "source_message_ids": [i],
+    } for i in range(count)]
+
+
+class SimulatedStream:
+    """Async iterator of content deltas spread over the decode time."""
+    
+    def __init__(self, text: str, chunk_size: int, chunk_delay: float):
+        self.text = text
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+    
+    async def _chunks(self):
+        for start in range(0, len(self.text), self.chunk_size):
+            await asyncio.sleep(self.chunk_delay)
+            delta = SimpleNamespace(content=self.text[start:start + self.chunk_size])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+    
+    def __aiter__(self):
+        return self._chunks()
+    
+    async def close(self):
+        pass
+
+
+class SimulatedLLM:
+    """
+    AsyncGroq look-alike with modelled latency.
+    
+    Args:
+        time_scale: Multiplier on every simulated delay (0.1 runs ten times faster)
+        items: Items returned per extraction call
+        jitter: Sigma of the log-normal latency noise (0 disables)
+        seed: Seed for the jitter, so runs are repeatable
+    """
+    
+    def __init__(self, time_scale: float = 1.0, items: int = 3, jitter: float = 0.25, seed: int = 0):
+        self.chat = SimpleNamespace(completions=self)
+        self.models = SimpleNamespace(list=self.list_models)
+        self.time_scale = time_scale
+        self.items = items
+        self.jitter = jitter
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._content = {kind: json.dumps({kind: canned_items(kind, items)})
+                         for kind in ("preferences", "emotional_patterns", "facts")}
+    
+    def content(self, kind: str) -> str:
+        return self._content.get(kind, REPLY)
+    
+    def delay(self, model: str, input_tokens: int, output_tokens: int) -> float:
+        latency = SMALL if model == SMALL_MODEL else LARGE
+        noise = self._random.lognormvariate(0, self.jitter) if self.jitter else 1.0
+        return latency.seconds(input_tokens, output_tokens) * noise * self.time_scale
+    
+    async def list_models(self):
+        return SimpleNamespace(data=[])
+    
+    async def close(self):
+        pass
+    
+    async def create(self, model: str, messages: list[dict], stream: bool = False, **request):
+        self.calls += 1
+        kind = KINDS.get(messages[0]["content"], "respond")
+        content = self.content(kind)
+        input_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+        output_tokens = estimate_tokens(content)
+        finish_reason = "stop"
+        max_tokens = request.get("max_tokens")
+        if max_tokens and output_tokens > max_tokens:
+            content, output_tokens, finish_reason = content[:max_tokens * 4], max_tokens, "length"
+        total = self.delay(model, input_tokens, output_tokens)
+        if not stream:
+            await asyncio.sleep(total)
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason=finish_reason)],
+                usage=SimpleNamespace(prompt_tokens=input_tokens, completion_tokens=output_tokens),
+            )
+        
+        # Prefill before the response starts, decode spread over the chunks
+        decode = total * output_tokens / max(1, input_tokens + output_tokens)
+        await asyncio.sleep(total - decode)
+        chunk_size = 16
+        chunks = -(-len(content) // chunk_size)
+        return SimulatedStream(content, chunk_size, decode / chunks)
+
+
+def simulated_client(llm: SimulatedLLM, max_concurrency: int = 8) -> GroqClient:
+    """GroqClient wired to `llm`, with its own dispatcher."""
+    client = GroqClient(
+        api_key="simulated",
+        dispatcher=LLMDispatcher(max_concurrency=max_concurrency, metrics=MetricsRegistry()),
+    )
+    client.client = llm
+    return client
@@ -0,0 +1,325 @@
+"""
+Seeded synthetic conversations and memories for scale testing.
+
+Generates users with a persona (age, job, city, interests, relations,
+stress triggers), an emotional arc over time, and a chat history mixing
+English and Hinglish: explicit facts and preferences the rule extractor
+can pick up, mood messages that follow the arc, filler ("ok", "lol",
+emoji) the pre-filter should drop, and occasional long rambles. Each user
+comes with a UserMemory matching what was said, with source_message_ids
+pointing at the messages that said it, optionally padded to a target
+size for serialization and store benchmarks.
+
+Every user is derived from (seed, user index) alone, so runs are
+repeatable and any slice of users can be regenerated independently.
+Output is JSONL, one user per line, written as it is generated; read it
+back lazily with iter_users().
+
+Usage:
+    python -m benchmarks.synthetic --users 10000 --messages 20 200 --output users.jsonl
+    python -m benchmarks.synthetic --users 10 --messages 10000 --memory-items 5000 --output long.jsonl
+    python -m benchmarks.synthetic --users 3 --messages 15 --hinglish 0.8 --parts messages
+"""
+import argparse
+import json
+import math
+import random
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator, TextIO
+from src.models.memory import EmotionalPattern, Fact, Preference, UserMemory
+from src.models.messages import ChatMessage
+
+ACTIVITIES = (
+    "hiking", "cooking", "cricket", "chess", "photography", "yoga", "painting", "gaming",
+    "cycling", "reading fantasy novels", "baking", "badminton", "gardening", "playing guitar",
+    "swimming", "watching anime", "running", "board games", "dancing", "travelling solo",
+)
+DISLIKES = ("small talk", "crowded malls", "long meetings", "spicy food", "early mornings", "horror movies")
+JOBS = ("software engineer", "teacher", "designer", "nurse", "data analyst", "product manager", "chef", "lawyer")
+CITIES = ("Mumbai", "Bangalore", "Delhi", "Pune", "Hyderabad", "Chennai", "Kolkata", "Jaipur")
+RELATIONS = ("sister", "brother", "mom", "dad", "best friend", "partner")
+EVENTS = ("wedding", "birthday", "graduation", "surgery", "job interview", "housewarming")
+TRIGGERS = ("deadlines", "exams", "money", "family pressure", "my manager", "health", "the commute")
+
+MOODS = {
+    "negative": ("stressed", "anxious", "sad", "frustrated"),
+    "neutral": ("tired", "calm"),
+    "positive": ("happy", "excited", "grateful"),
+}
+
+FACT_TEMPLATES = {
+    "age": ("I'm {age} and honestly still figuring things out.", "Umar ka kya hai, I'm {age} and still figuring things out."),
+    "job": ("I work as a {job}. It pays the bills.", "Yaar I work as a {job}, kaam bahut hai."),
+    "city": ("I live in {city}. The traffic is unreal.", "I live in {city}, yahan ka weather pagal hai."),
+    "relation": ("My {relation}'s {event} is next month, so much to plan.",
+                 "My {relation}'s {event} is next month, ghar pe sab busy hain."),
+}
+PREFERENCE_TEMPLATES = {
+    "like": ("I love {activity}, it's the only thing that clears my head.",
+             "I love {activity}, weekend pe bas wahi karta hoon."),
+    "dislike": ("I can't stand {dislike}, it drains me.", "Sach bolun toh I can't stand {dislike}."),
+}
+MOOD_TEMPLATES = {
+    "negative": ("Feeling really {mood} today, {trigger} again.", "Aaj bahut {mood} feel ho raha hai, {trigger} ki wajah se.",
+                 "Can't sleep, too {mood} about {trigger}.", "Pata nahi kyun itna {mood} hoon, {trigger} is too much."),
+    "neutral": ("Pretty {mood} day, nothing much happened.", "Aaj ka din theek tha, bas thoda {mood}."),
+    "positive": ("So {mood} right now! Did some {activity} and it was amazing.", "Aaj mood ekdum {mood} hai, {activity} kiya finally!",
+                 "Honestly feeling {mood}, things are looking up."),
+}
+FILLER = ("ok", "lol", "haha", "hmm", "acha", "theek hai", "👍", "😂😂", "k", "sahi hai", "ya", "brb")
+RAMBLE = (
+    "Also I was thinking about {activity} again and how I never get time for it anymore.",
+    "Kal raat bhi yahi soch raha tha ki {trigger} ka kya karun.",
+    "Anyway my {relation} called and we talked for like an hour about random stuff.",
+    "Office mein sab log {trigger} ke baare mein hi baat karte rehte hain.",
+    "Maybe I should plan something this weekend, kuch naya try karna hai.",
+    "It's weird how one bad day can make the whole week feel heavy.",
+)
+ASSISTANT = ("That sounds like a lot. How are you holding up?", "Nice! Tell me more about that.",
+             "I'm here if you want to talk it through.")
+
+# Arc: valence in [-1, 1] as a function of position in the history (0-1)
+ARCS = {
+    "steady": lambda p: 0.1,
+    "rising": lambda p: -0.8 + 1.6 * p,
+    "falling": lambda p: 0.8 - 1.6 * p,
+    "recovery": lambda p: -0.8 * math.sin(math.pi * p),
+    "volatile": lambda p: 0.9 * math.sin(6 * math.pi * p),
+}
+
+
+@dataclass
+class SyntheticConfig:
+    """
+    Shape of the generated users.
+    
+    Args:
+        messages: (min, max) messages per user, drawn log-uniformly
+        hinglish: Average share of Hinglish messages
+        assistant_share: Share of assistant turns interleaved in histories
+        memory_items: Pad each memory to at least this many items
+        arcs: Emotional arcs to draw from
+    """
+    messages: tuple[int, int] = (30, 30)
+    hinglish: float = 0.4
+    assistant_share: float = 0.0
+    memory_items: int = 0
+    arcs: tuple[str, ...] = tuple(ARCS)
+
+
+@dataclass
+class Persona:
+    age: int
+    job: str
+    city: str
+    activities: list[str]
+    dislikes: list[str]
+    relation: str
+    event: str
+    triggers: list[str]
+    arc: str
+    hinglish: float
+    # Where each memory item was stated: key -> message indices
+    sources: dict[tuple, list[int]] = field(default_factory=dict)
+    # Moods expressed per emotional key
+    moods: dict[tuple, set[str]] = field(default_factory=dict)
+
+
+def make_persona(rng: random.Random, config: SyntheticConfig) -> Persona:
+    return Persona(
+        age=rng.randint(18, 45),
+        job=rng.choice(JOBS),
+        city=rng.choice(CITIES),
+        activities=rng.sample(ACTIVITIES, rng.randint(3, 6)),
+        dislikes=rng.sample(DISLIKES, rng.randint(1, 2)),
+        relation=rng.choice(RELATIONS),
+        event=rng.choice(EVENTS),
+        triggers=rng.sample(TRIGGERS, rng.randint(1, 3)),
+        arc=rng.choice(config.arcs),
+        hinglish=min(1.0, max(0.0, rng.gauss(config.hinglish, 0.15))),
+    )
+
+
+def _message_count(rng: random.Random, config: SyntheticConfig) -> int:
+    low, high = config.messages
+    return round(math.exp(rng.uniform(math.log(low), math.log(high)))) if high > low else low
+
+
+def generate_messages(rng: random.Random, persona: Persona, count: int, config: SyntheticConfig) -> list[dict]:
+    """`count` ChatMessage dicts following the persona and its arc; fills persona.sources."""
+    pending = [("age",), ("job",), ("city",), ("relation",)]
+    pending += [("like", a) for a in persona.activities] + [("dislike", d) for d in persona.dislikes]
+    rng.shuffle(pending)
+    # Spread explicit statements over the history, leaving the rest to moods and filler
+    statement_at = set(rng.sample(range(count), min(len(pending), max(1, count // 3))))
+    when = datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(days=rng.randint(0, 300))
+    arc = ARCS[persona.arc]
+    messages = []
+    
+    for i in range(count):
+        when += timedelta(minutes=rng.expovariate(1 / 90))
+        hinglish = rng.random() < persona.hinglish
+        if i > 0 and rng.random() < config.assistant_share:
+            messages.append({"role": "assistant", "content": rng.choice(ASSISTANT), "timestamp": when.isoformat()})
+            continue
+        
+        if i in statement_at and pending:
+            key = pending.pop()
+            persona.sources.setdefault(key, []).append(i)
+            if key[0] in PREFERENCE_TEMPLATES:
+                template = PREFERENCE_TEMPLATES[key[0]][hinglish]
+            else:
+                template = FACT_TEMPLATES[key[0]][hinglish]
+            content = template.format(
+                age=persona.age, job=persona.job, city=persona.city, relation=persona.relation,
+                event=persona.event, activity=key[-1], dislike=key[-1],
+            )
+        elif rng.random() < 0.15:
+            content = rng.choice(FILLER)
+        else:
+            valence = arc(i / max(1, count - 1)) + rng.gauss(0, 0.25)
+            tone = "negative" if valence < -0.3 else "positive" if valence > 0.3 else "neutral"
+            mood = rng.choice(MOODS[tone])
+            trigger = rng.choice(persona.triggers)
+            templates = MOOD_TEMPLATES[tone]
+            half = len(templates) // 2 or 1
+            pool = templates[half:] if hinglish and len(templates) > 1 else templates[:half]
+            content = rng.choice(pool).format(mood=mood, trigger=trigger, activity=rng.choice(persona.activities))
+            if tone != "neutral":
+                key = ("mood", tone, trigger if tone == "negative" else "")
+                persona.sources.setdefault(key, []).append(i)
+                persona.moods.setdefault(key, set()).add(mood)
+            # Long tail of rambling messages
+            extra = int(rng.lognormvariate(0, 1.0)) if rng.random() < 0.2 else 0
+            for _ in range(extra):
+                content += " " + rng.choice(RAMBLE).format(
+                    activity=rng.choice(persona.activities), trigger=trigger, relation=persona.relation,
+                )
+        messages.append({"role": "user", "content": content, "timestamp": when.isoformat()})
+    return messages
+
+
+def build_memory(rng: random.Random, persona: Persona, messages: list[dict], config: SyntheticConfig) -> UserMemory:
+    """Memory matching what the persona said, padded to config.memory_items."""
+    facts, preferences, patterns = [], [], []
+    for key, ids in persona.sources.items():
+        if key[0] == "age":
+            facts.append(Fact(category="personal", fact=f"Is {persona.age} years old", importance="high",
+                              confidence=1.0, source_message_ids=ids))
+        elif key[0] == "job":
+            facts.append(Fact(category="professional", fact=f"Works as a {persona.job}", importance="high",
+                              confidence=1.0, source_message_ids=ids))
+        elif key[0] == "city":
+            facts.append(Fact(category="personal", fact=f"Lives in {persona.city}", importance="high",
+                              confidence=1.0, source_message_ids=ids))
+        elif key[0] == "relation":
+            facts.append(Fact(category="relational", fact=f"{persona.relation.capitalize()}'s {persona.event} is next month",
+                              importance="medium", confidence=0.9, source_message_ids=ids))
+        elif key[0] == "like":
+            preferences.append(Preference(category="interests", description=f"Enjoys {key[1]}", confidence=1.0,
+                                          source_message_ids=ids, evidence=messages[ids[0]]["content"][:120]))
+        elif key[0] == "dislike":
+            preferences.append(Preference(category="values", description=f"Dislikes {key[1]}", confidence=1.0,
+                                          source_message_ids=ids, evidence=messages[ids[0]]["content"][:120]))
+        elif key[0] == "mood" and len(ids) >= 2:
+            _, tone, trigger = key
+            moods = sorted(persona.moods[key])
+            if tone == "negative":
+                pattern, triggers = f"Gets {' and '.join(moods[:2])} about {trigger}", [trigger]
+            else:
+                pattern, triggers = "Lifts their mood through hobbies", persona.activities[:3]
+            patterns.append(EmotionalPattern(
+                pattern=pattern, triggers=triggers,
+                frequency="frequent" if len(ids) > 10 else "occasional",
+                emotional_range=moods, source_message_ids=ids[:50],
+            ))
+    
+    # Padding: plausible extra items citing random messages
+    for n in range(len(facts) + len(preferences) + len(patterns), config.memory_items):
+        ids = sorted(rng.sample(range(len(messages)), min(len(messages), rng.randint(1, 3))))
+        if n % 2:
+            activity = rng.choice(ACTIVITIES)
+            preferences.append(Preference(category="interests", description=f"Mentions {activity} (note {n})",
+                                          confidence=round(rng.uniform(0.5, 0.9), 2), source_message_ids=ids,
+                                          evidence=messages[ids[0]]["content"][:120]))
+        else:
+            facts.append(Fact(category=rng.choice(("personal", "professional", "relational", "temporal")),
+                              fact=f"Mentioned {rng.choice(TRIGGERS)} on day {n}", importance=rng.choice(("low", "medium")),
+                              confidence=round(rng.uniform(0.5, 0.9), 2), source_message_ids=ids))
+    return UserMemory(preferences=preferences, emotional_patterns=patterns, facts=facts,
+                      extracted_at=messages[-1]["timestamp"], message_count=len(messages))
+
+
+def generate_user(index: int, seed: int = 0, config: SyntheticConfig | None = None) -> dict:
+    """One synthetic user as a JSON-ready dict; depends only on (seed, index, config)."""
+    config = config or SyntheticConfig()
+    rng = random.Random(f"{seed}:{index}")
+    persona = make_persona(rng, config)
+    messages = generate_messages(rng, persona, _message_count(rng, config), config)
+    memory = build_memory(rng, persona, messages, config)
+    return {
+        "user_id": f"user-{seed}-{index}",
+        "arc": persona.arc,
+        "messages": messages,
+        "memory": memory.model_dump(mode="json"),
+    }
+
+
+def generate_users(count: int, seed: int = 0, config: SyntheticConfig | None = None, start: int = 0) -> Iterator[dict]:
+    for index in range(start, start + count):
+        yield generate_user(index, seed, config)
+
+
+def write_jsonl(users: Iterator[dict], out: TextIO, parts: tuple[str, ...] = ("messages", "memory")) -> int:
+    """Write users one line at a time; returns the number written."""
+    written = 0
+    for user in users:
+        record = {k: v for k, v in user.items() if k not in ("messages", "memory") or k in parts}
+        out.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        written += 1
+    return written
+
+
+def iter_users(path: Path) -> Iterator[tuple[str, list[ChatMessage], UserMemory | None]]:
+    """Lazily read (user_id, messages, memory) back from a generated file."""
+    with Path(path).open(encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            messages = [ChatMessage.model_validate(m) for m in record.get("messages", [])]
+            memory = UserMemory.model_validate(record["memory"]) if "memory" in record else None
+            yield record["user_id"], messages, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--start", type=int, default=0, help="index of the first user")
+    parser.add_argument("--messages", type=int, nargs="+", default=[30], help="messages per user: N, or MIN MAX")
+    parser.add_argument("--hinglish", type=float, default=0.4, help="average share of Hinglish messages")
+    parser.add_argument("--assistant-share", type=float, default=0.0)
+    parser.add_argument("--memory-items", type=int, default=0, help="pad memories to this many items")
+    parser.add_argument("--arcs", nargs="+", choices=list(ARCS), default=list(ARCS))
+    parser.add_argument("--parts", nargs="+", choices=("messages", "memory"), default=["messages", "memory"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="JSONL file (default stdout)")
+    args = parser.parse_args()
+    
+    low, high = args.messages[0], args.messages[-1]
+    config = SyntheticConfig(
+        messages=(low, high), hinglish=args.hinglish, assistant_share=args.assistant_share,
+        memory_items=args.memory_items, arcs=tuple(args.arcs),
+    )
+    users = generate_users(args.users, args.seed, config, args.start)
+    if args.output is None:
+        write_jsonl(users, sys.stdout, tuple(args.parts))
+        return
+    with args.output.open("w", encoding="utf-8") as out:
+        written = write_jsonl(users, out, tuple(args.parts))
+    print(f"Wrote {written} users to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
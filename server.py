@@ -2,14 +2,19 @@
 FastAPI server entry point.
 Run with: uvicorn server:app --reload --port 8000
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from src.api.resources import lifespan
 from src.api.routes import router
+from src.observability.metrics import METRICS
+from src.observability.profiling import PROFILE_SAMPLE_RATE, PROFILE_TOKEN, ProfilingMiddleware
+from src.observability.traces import TRACE_LOG, TraceRecorder
 
 app = FastAPI(
     title="GuppShupp Memory & Personality API",
     description="AI-powered memory extraction and personality transformation for companion AI",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware for frontend integration
@@ -21,6 +26,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in traffic recording for benchmarks/replay.py (TRACE_LOG=path)
+if TRACE_LOG:
+    app.add_middleware(TraceRecorder, path=TRACE_LOG)
+
+# On-demand request profiling: X-Profile header with PROFILE_TOKEN, or PROFILE_SAMPLE_RATE
+if PROFILE_TOKEN or PROFILE_SAMPLE_RATE:
+    app.add_middleware(ProfilingMiddleware)
+
 # Include API routes
 app.include_router(router, prefix="/api")
 
@@ -33,13 +46,32 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "extract": "POST /api/extract - Extract memory from messages",
+            "extract_quick": "POST /api/extract/quick - Rule-based memory without LLM calls",
+            "extract_stream": "POST /api/extract/stream - Stream memory items as NDJSON",
             "respond": "POST /api/respond - Generate personality response",
             "compare": "POST /api/compare - Compare all personalities",
+            "metrics": "GET /metrics - In-process metrics snapshot",
         }
     }
 
 
 @app.get("/health")
-async def health():
-    """Health check endpoint."""
-    return {"status": "ok"}
+async def health(request: Request):
+    """
+    Health check endpoint.
+    
+    Reports "degraded" while the LLM circuit breaker is open or probing;
+    requests are still served, with fallback results. Before the worker's
+    resources are set up the breaker state is "unknown".
+    """
+    resources = getattr(request.app.state, "resources", None)
+    client = getattr(resources, "groq_client", None)
+    circuit = getattr(client, "breaker", None)
+    breaker = circuit.snapshot() if circuit is not None else {"state": "unknown"}
+    return {"status": "ok" if breaker["state"] == "closed" else "degraded", "llm": breaker}
+
+
+@app.get("/metrics")
+async def metrics():
+    """Counters, gauges and histograms for this worker process."""
+    return METRICS.snapshot()
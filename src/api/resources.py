@@ -0,0 +1,109 @@
+"""
+Shared per-worker resources and FastAPI lifespan management.
+Startup builds the pooled Groq client, orchestrator and engine once per
+worker process; shutdown drains in-flight LLM calls before closing.
+"""
+import os
+import time
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+import httpx
+from fastapi import FastAPI, Request
+from groq import DefaultAsyncHttpxClient
+from src.extractors.orchestrator import MemoryOrchestrator
+from src.llm.client import GroqClient
+from src.llm.dispatcher import LLMDispatcher
+from src.models.memory import UserMemory
+from src.observability.loop_monitor import LoopMonitor
+from src.observability.metrics import METRICS
+from src.personality.engine import PersonalityEngine
+
+logger = logging.getLogger(__name__)
+
+# Tunables (per worker process)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+SHUTDOWN_DRAIN_TIMEOUT = float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT", "20"))
+
+
+@dataclass
+class AppResources:
+    """Long-lived objects shared by every request handled by one worker."""
+    groq_client: GroqClient
+    memory_orchestrator: MemoryOrchestrator
+    personality_engine: PersonalityEngine
+    loop_monitor: LoopMonitor
+    
+    @classmethod
+    def create(cls, groq_client: GroqClient | None = None) -> "AppResources":
+        """Build resources around a pooled GroqClient (or the one given)."""
+        if groq_client is None:
+            http_client = DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=LLM_MAX_CONCURRENCY * 2,
+                    max_keepalive_connections=LLM_MAX_CONCURRENCY,
+                ),
+            )
+            groq_client = GroqClient(
+                dispatcher=LLMDispatcher(max_concurrency=LLM_MAX_CONCURRENCY),
+                http_client=http_client,
+            )
+        return cls(
+            groq_client=groq_client,
+            memory_orchestrator=MemoryOrchestrator(groq_client),
+            personality_engine=PersonalityEngine(groq_client),
+            loop_monitor=LoopMonitor(),
+        )
+    
+    async def warm_up(self) -> None:
+        """Open connections, preload profiles and warm model serializers."""
+        started = time.perf_counter()
+        profiles = self.personality_engine.preload_profiles()
+        self.personality_engine.profiles.start()
+        UserMemory.model_validate_json(UserMemory().model_dump_json())
+        connected = await self.groq_client.warm_up()
+        # Startup work blocks by design; watch the loop from here on
+        self.loop_monitor.start()
+        METRICS.observe("lifespan.warm_up_seconds", time.perf_counter() - started)
+        logger.info(
+            "Worker %d ready: %d profiles, Groq connection %s",
+            os.getpid(), len(profiles), "warm" if connected else "cold",
+        )
+    
+    async def shutdown(self, drain_timeout: float = SHUTDOWN_DRAIN_TIMEOUT) -> bool:
+        """
+        Wait for in-flight LLM calls, then close pooled connections.
+        
+        Returns:
+            True if every in-flight call finished within `drain_timeout`
+        """
+        pending = self.groq_client.active_calls
+        drained = await self.groq_client.drain(drain_timeout)
+        if not drained:
+            logger.warning(
+                "Shutdown drain timed out after %.1fs with %d LLM calls in flight",
+                drain_timeout, self.groq_client.active_calls,
+            )
+        elif pending:
+            logger.info("Drained %d in-flight LLM calls", pending)
+        await self.personality_engine.profiles.stop()
+        await self.loop_monitor.stop()
+        await self.groq_client.aclose()
+        return drained
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared resources at worker startup and drain them at shutdown."""
+    resources = AppResources.create()
+    await resources.warm_up()
+    app.state.resources = resources
+    try:
+        yield
+    finally:
+        await resources.shutdown()
+
+
+def get_resources(request: Request) -> AppResources:
+    """FastAPI dependency returning the worker's shared resources."""
+    return request.app.state.resources
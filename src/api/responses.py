@@ -0,0 +1,24 @@
+"""
+Fast JSON responses for Pydantic payloads.
+"""
+from typing import Any
+from fastapi.responses import JSONResponse
+from src.models.adapters import type_adapter
+
+
+class PydanticJSONResponse(JSONResponse):
+    """
+    Serialize models (or typed containers of models) with pydantic-core.
+    
+    Returning a Response from a route skips FastAPI's response_model
+    re-validation and jsonable_encoder pass: the payload was built from
+    validated models, so it is dumped straight to JSON bytes in one step.
+    `response_model` on the route still documents the schema.
+    """
+    
+    def __init__(self, content: Any, annotation: Any = None, **kwargs):
+        self.annotation = annotation or type(content)
+        super().__init__(content, **kwargs)
+    
+    def render(self, content: Any) -> bytes:
+        return type_adapter(self.annotation).dump_json(content)
@@ -1,7 +1,10 @@
 """
 FastAPI routes for memory extraction and personality generation.
 """
-from fastapi import APIRouter, HTTPException
+import asyncio
+from typing import AsyncIterator, Awaitable, TypeVar
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from src.models.memory import UserMemory
 from src.models.messages import ChatMessage
@@ -9,34 +12,90 @@ from src.models.personality import PersonalityResponse
 from src.extractors.orchestrator import MemoryOrchestrator
 from src.personality.engine import PersonalityEngine
 from src.llm.client import GroqClient
+from src.api.resources import AppResources, get_resources
+from src.api.responses import PydanticJSONResponse
+from src.llm.deadline import Deadline, DeadlineExceeded
+from src.observability.metrics import METRICS
 
 router = APIRouter()
 
-# Initialize clients (singleton pattern)
-_groq_client = None
-_memory_orchestrator = None
-_personality_engine = None
+R = TypeVar("R")
 
+# Per-route deadline (seconds) used when the client sends no timeout header
+ROUTE_TIMEOUTS = {"extract": 30.0, "respond": 15.0, "compare": 20.0}
+MAX_REQUEST_TIMEOUT = 60.0
+TIMEOUT_HEADER = "X-Request-Timeout-Ms"
+DISCONNECT_POLL_INTERVAL = 0.25
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
 
-def get_groq_client() -> GroqClient:
-    global _groq_client
-    if _groq_client is None:
-        _groq_client = GroqClient()
-    return _groq_client
 
+# Dependencies: shared per-worker resources built by the app lifespan
+def get_groq_client(resources: AppResources = Depends(get_resources)) -> GroqClient:
+    return resources.groq_client
 
-def get_memory_orchestrator() -> MemoryOrchestrator:
-    global _memory_orchestrator
-    if _memory_orchestrator is None:
-        _memory_orchestrator = MemoryOrchestrator(get_groq_client())
-    return _memory_orchestrator
 
+def get_memory_orchestrator(resources: AppResources = Depends(get_resources)) -> MemoryOrchestrator:
+    return resources.memory_orchestrator
 
-def get_personality_engine() -> PersonalityEngine:
-    global _personality_engine
-    if _personality_engine is None:
-        _personality_engine = PersonalityEngine(get_groq_client())
-    return _personality_engine
+
+def get_personality_engine(resources: AppResources = Depends(get_resources)) -> PersonalityEngine:
+    return resources.personality_engine
+
+
+def request_deadline(http_request: Request, route: str) -> Deadline:
+    """
+    Build the request deadline from the X-Request-Timeout-Ms header.
+    
+    Falls back to the route default and is capped at MAX_REQUEST_TIMEOUT.
+    """
+    seconds = ROUTE_TIMEOUTS[route]
+    header = http_request.headers.get(TIMEOUT_HEADER)
+    if header is not None:
+        try:
+            seconds = float(header) / 1000
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid {TIMEOUT_HEADER} header: {header!r}")
+        if seconds <= 0:
+            raise HTTPException(status_code=400, detail=f"{TIMEOUT_HEADER} must be positive")
+    return Deadline.after(min(seconds, MAX_REQUEST_TIMEOUT))
+
+
+def streaming_media_type(http_request: Request) -> str | None:
+    """Streaming format requested via the Accept header, if any."""
+    accept = http_request.headers.get("accept", "")
+    for media_type in (SSE_MEDIA_TYPE, NDJSON_MEDIA_TYPE):
+        if media_type in accept:
+            return media_type
+    return None
+
+
+async def encode_events(events: AsyncIterator[BaseModel], media_type: str) -> AsyncIterator[str]:
+    """Serialize streamed events as NDJSON lines or SSE messages."""
+    async for event in events:
+        data = event.model_dump_json(exclude_none=True)
+        if media_type == SSE_MEDIA_TYPE:
+            yield f"event: {event.type}\ndata: {data}\n\n"
+        else:
+            yield data + "\n"
+
+
+async def run_until_disconnect(http_request: Request, work: Awaitable[R]) -> R:
+    """
+    Await `work`, cancelling it (and its in-flight LLM calls) if the
+    client disconnects before it finishes.
+    """
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                METRICS.inc("api.client_disconnects", route=http_request.url.path)
+                raise HTTPException(status_code=499, detail="Client disconnected")
+    finally:
+        task.cancel()
 
 
 # Request/Response Models
@@ -57,24 +116,76 @@ class CompareRequest(BaseModel):
 
 # Routes
 @router.post("/extract", response_model=UserMemory)
-async def extract_memory(request: ExtractRequest):
+async def extract_memory(
+    request: ExtractRequest,
+    http_request: Request,
+    orchestrator: MemoryOrchestrator = Depends(get_memory_orchestrator),
+):
     """
     Extract user memory from conversation history.
     
-    Uses parallel extraction with asyncio.gather for:
+    Uses parallel extraction for:
     - Preferences
     - Emotional patterns
     - Facts
+    
+    Sections that miss the request deadline are listed in
+    extraction_errors; the finished ones are still returned.
     """
     try:
-        orchestrator = get_memory_orchestrator()
-        return await orchestrator.extract_all(request.messages)
+        deadline = request_deadline(http_request, "extract")
+        memory = await run_until_disconnect(
+            http_request,
+            orchestrator.extract_all(request.messages, deadline=deadline),
+        )
+        return PydanticJSONResponse(memory)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/extract/quick", response_model=UserMemory)
+async def quick_extract_memory(
+    request: ExtractRequest,
+    orchestrator: MemoryOrchestrator = Depends(get_memory_orchestrator),
+):
+    """
+    Rule-based first-pass memory: explicit facts and preferences only.
+    
+    Runs in microseconds without any LLM call; use /extract or
+    /extract/stream for implicit signals and emotional patterns.
+    """
+    return PydanticJSONResponse(orchestrator.quick_extract(request.messages))
+
+
+@router.post("/extract/stream")
+async def stream_memory(
+    request: ExtractRequest,
+    http_request: Request,
+    orchestrator: MemoryOrchestrator = Depends(get_memory_orchestrator),
+):
+    """
+    Stream extracted memory as NDJSON, one MemoryStreamEvent per line
+    (or as server-sent events with `Accept: text/event-stream`).
+    
+    Each preference, emotional pattern and fact is sent as soon as its
+    JSON object completes in the LLM output, so clients can render
+    memory progressively. The final line is a "done" event with the
+    assembled UserMemory. Disconnecting cancels the extraction.
+    """
+    deadline = request_deadline(http_request, "extract")
+    media_type = streaming_media_type(http_request) or NDJSON_MEDIA_TYPE
+    events = orchestrator.stream_all(request.messages, deadline=deadline)
+    return StreamingResponse(encode_events(events, media_type), media_type=media_type)
+
+
 @router.post("/respond", response_model=PersonalityResponse)
-async def generate_response(request: RespondRequest):
+async def generate_response(
+    request: RespondRequest,
+    http_request: Request,
+    engine: PersonalityEngine = Depends(get_personality_engine),
+):
     """
     Generate a personality-adjusted response.
     
@@ -82,30 +193,62 @@ async def generate_response(request: RespondRequest):
     Returns a response tailored to that personality.
     """
     try:
-        engine = get_personality_engine()
-        return await engine.generate_response(
-            query=request.query,
-            memory=request.memory,
-            profile_id=request.personality_id,
+        deadline = request_deadline(http_request, "respond")
+        response = await run_until_disconnect(
+            http_request,
+            engine.generate_response(
+                query=request.query,
+                memory=request.memory,
+                profile_id=request.personality_id,
+                deadline=deadline,
+            ),
         )
+        return PydanticJSONResponse(response)
+    except HTTPException:
+        raise
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/compare")
-async def compare_personalities(request: CompareRequest):
+@router.post("/compare", response_model=dict[str, PersonalityResponse])
+async def compare_personalities(
+    request: CompareRequest,
+    http_request: Request,
+    engine: PersonalityEngine = Depends(get_personality_engine),
+):
     """
     Generate responses from all personalities for comparison.
     
     Returns a dict mapping personality_id to PersonalityResponse.
+    
+    With `Accept: application/x-ndjson` or `Accept: text/event-stream`,
+    the generic baseline and every personality run concurrently and each
+    ComparisonEvent is streamed as soon as its call finishes, ending with
+    a "done" event.
     """
     try:
-        engine = get_personality_engine()
-        return await engine.generate_comparison(
-            query=request.query,
-            memory=request.memory,
+        deadline = request_deadline(http_request, "compare")
+        media_type = streaming_media_type(http_request)
+        if media_type is not None:
+            events = engine.stream_comparison(request.query, request.memory, deadline=deadline)
+            return StreamingResponse(encode_events(events, media_type), media_type=media_type)
+        
+        responses = await run_until_disconnect(
+            http_request,
+            engine.generate_comparison(
+                query=request.query,
+                memory=request.memory,
+                deadline=deadline,
+            ),
         )
+        return PydanticJSONResponse(responses, annotation=dict[str, PersonalityResponse])
+    except HTTPException:
+        raise
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
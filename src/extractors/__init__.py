@@ -1,4 +1,5 @@
 # extractors package
 from src.extractors.orchestrator import MemoryOrchestrator
+from src.extractors.registry import CostClass, ExtractorRegistry, ExtractorSpec, default_registry
 
-__all__ = ["MemoryOrchestrator"]
+__all__ = ["MemoryOrchestrator", "CostClass", "ExtractorRegistry", "ExtractorSpec", "default_registry"]
@@ -0,0 +1,154 @@
+"""
+Token-budgeted transcript compaction for extraction input.
+Bounds the prompt every extractor receives: whitespace and repeated text
+are collapsed, oversized messages are cut to their head and tail, and if
+the transcript still exceeds the budget the lowest-priority messages
+(older, lower pre-filter score) are left out. Kept messages retain their
+original [index].
+"""
+import os
+import re
+from dataclasses import dataclass
+from src.extractors.prefilter import FilteredMessages
+from src.llm.tokens import estimate_tokens
+from src.models.messages import ChatMessage
+from src.observability.metrics import METRICS, MetricsRegistry
+
+# Tunables: the budget applies to the transcript each extractor receives
+EXTRACTION_TOKEN_BUDGET = int(os.getenv("EXTRACTION_TOKEN_BUDGET", "6000"))
+MAX_MESSAGE_TOKENS = int(os.getenv("EXTRACTION_MAX_MESSAGE_TOKENS", "300"))
+
+# Share of a message's priority that comes from recency (the rest is signal score)
+RECENCY_WEIGHT = 0.5
+
+_REPEATED_CHARS = re.compile(r"([^\s\d]{1,3}?)\1{3,}")
+_REPEATED_PHRASE = re.compile(r"\b(\w+(?:\W+\w+){0,3}?)(?:\W+\1\b){2,}", re.IGNORECASE)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def collapse_repeats(text: str) -> str:
+    """Collapse whitespace, character runs, repeated phrases and repeated sentences."""
+    text = " ".join(text.split())
+    text = _REPEATED_CHARS.sub(r"\1\1\1", text)
+    seen = set()
+    sentences = []
+    for sentence in _SENTENCE_END.split(text):
+        key = sentence.lower()
+        if key not in seen:
+            seen.add(key)
+            sentences.append(sentence)
+    return _REPEATED_PHRASE.sub(r"\1 \1", " ".join(sentences))
+
+
+def truncate(text: str, max_tokens: int) -> tuple[str, bool]:
+    """
+    Keep the head and tail of a message that exceeds `max_tokens`.
+    
+    Returns:
+        (text, whether it was truncated)
+    """
+    tokens = estimate_tokens(text)
+    if tokens <= max_tokens:
+        return text, False
+    chars_per_token = len(text) / tokens
+    head = int(max_tokens * 2 / 3 * chars_per_token)
+    tail = int(max_tokens / 3 * chars_per_token)
+    # Cut on word boundaries when there are any
+    head = text.rfind(" ", 0, head) if " " in text[:head] else head
+    tail_start = text.find(" ", len(text) - tail) if " " in text[len(text) - tail:] else len(text) - tail
+    omitted = estimate_tokens(text[head:tail_start])
+    return f"{text[:head]} … [{omitted} tokens truncated] … {text[tail_start:].lstrip()}", True
+
+
+@dataclass
+class CompactedTranscript:
+    """Extractor input plus what compaction did to produce it."""
+    text: str
+    tokens_before: int
+    tokens_after: int
+    truncated: list[int]
+    omitted: list[int]
+    
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.tokens_before - self.tokens_after)
+
+
+class TranscriptCompactor:
+    """
+    Enforces a per-extractor token budget on the formatted transcript.
+    
+    Each message is cleaned and capped at `max_message_tokens`; if the
+    whole transcript is still over `budget_tokens`, messages are kept in
+    priority order (pre-filter signal score blended with recency) until
+    the budget is used, then rendered back in chronological order.
+    """
+    
+    def __init__(
+        self,
+        budget_tokens: int = EXTRACTION_TOKEN_BUDGET,
+        max_message_tokens: int = MAX_MESSAGE_TOKENS,
+        metrics: MetricsRegistry = METRICS,
+    ):
+        self.budget_tokens = budget_tokens
+        self.max_message_tokens = max_message_tokens
+        self.metrics = metrics
+    
+    def compact(
+        self,
+        messages: list[ChatMessage],
+        filtered: FilteredMessages | None = None,
+    ) -> CompactedTranscript:
+        """
+        Build the extractor transcript for `messages`.
+        
+        Args:
+            messages: Original message list (the baseline for tokens saved)
+            filtered: Pre-filter output; every message is kept when omitted
+        
+        Returns:
+            CompactedTranscript with the text and token accounting
+        """
+        if filtered is None:
+            filtered = FilteredMessages(kept=list(enumerate(messages)))
+        tokens_before = sum(estimate_tokens(f"[{i}] {m.content}") + 1 for i, m in enumerate(messages))
+        
+        lines: dict[int, str] = {}
+        truncated = []
+        for i, msg in filtered.kept:
+            content, was_truncated = truncate(collapse_repeats(msg.content), self.max_message_tokens)
+            if was_truncated:
+                truncated.append(i)
+            lines[i] = filtered.line(i, content)
+        
+        costs = {i: estimate_tokens(line) + 1 for i, line in lines.items()}
+        omitted = []
+        if sum(costs.values()) > self.budget_tokens:
+            last = max(len(messages) - 1, 1)
+            priority = {
+                i: (1 - RECENCY_WEIGHT) * filtered.scores.get(i, 1.0) + RECENCY_WEIGHT * i / last
+                for i in lines
+            }
+            remaining = self.budget_tokens
+            selected = set()
+            for i in sorted(lines, key=priority.__getitem__, reverse=True):
+                if costs[i] <= remaining:
+                    selected.add(i)
+                    remaining -= costs[i]
+            omitted = sorted(set(lines) - selected)
+            lines = {i: line for i, line in lines.items() if i in selected}
+        
+        text = "\n".join(lines[i] for i in sorted(lines))
+        transcript = CompactedTranscript(
+            text=text,
+            tokens_before=tokens_before,
+            tokens_after=estimate_tokens(text),
+            truncated=truncated,
+            omitted=omitted,
+        )
+        self.metrics.observe("extraction.input_tokens", transcript.tokens_after)
+        self.metrics.observe("extraction.tokens_saved", transcript.tokens_saved)
+        self.metrics.inc("extraction.tokens_saved_total", transcript.tokens_saved)
+        self.metrics.inc("extraction.messages_truncated", len(truncated))
+        self.metrics.inc("extraction.messages_omitted", len(omitted))
+        return transcript
@@ -2,7 +2,10 @@
 Emotional pattern extractor module.
 Identifies recurring emotional patterns, triggers, and frequency.
 """
+from typing import AsyncIterator
 from src.models.memory import EmotionalPattern, EmotionalPatternList
+from src.llm.deadline import Deadline
+from src.llm.routing import Complexity
 from src.llm.prompts import EMOTION_EXTRACTION_PROMPT
 
 
@@ -12,13 +15,20 @@ class EmotionalPatternExtractor:
     def __init__(self, groq_client):
         self.client = groq_client
     
-    async def extract(self, formatted_messages: str) -> list[EmotionalPattern]:
+    async def extract(
+        self,
+        formatted_messages: str,
+        deadline: Deadline | None = None,
+        complexity: Complexity | None = None,
+    ) -> list[EmotionalPattern]:
         """
         Extract emotional patterns from formatted messages.
         
         Args:
             formatted_messages: Messages formatted as "[index] content"
-            
+            deadline: Optional request deadline passed to the LLM call
+            complexity: Transcript size and signal, used to pick the model
+        
         Returns:
             List of EmotionalPattern objects
         """
@@ -26,5 +36,35 @@ class EmotionalPatternExtractor:
             system_prompt=EMOTION_EXTRACTION_PROMPT,
             user_content=formatted_messages,
             response_model=EmotionalPatternList,
+            deadline=deadline,
+            route="emotional_patterns",
+            complexity=complexity,
         )
         return result.emotional_patterns
+    
+    async def stream(
+        self,
+        formatted_messages: str,
+        deadline: Deadline | None = None,
+        complexity: Complexity | None = None,
+    ) -> AsyncIterator[EmotionalPattern]:
+        """
+        Stream emotional patterns as soon as each one is complete in the LLM output.
+        
+        Args:
+            formatted_messages: Messages formatted as "[index] content"
+            deadline: Optional request deadline passed to the LLM call
+            complexity: Transcript size and signal, used to pick the model
+        
+        Yields:
+            EmotionalPattern objects in completion order
+        """
+        async for pattern in self.client.stream_structured(
+            system_prompt=EMOTION_EXTRACTION_PROMPT,
+            user_content=formatted_messages,
+            response_model=EmotionalPatternList,
+            deadline=deadline,
+            route="emotional_patterns",
+            complexity=complexity,
+        ):
+            yield pattern
@@ -2,7 +2,10 @@
 Fact extractor module.
 Extracts factual information about the user with importance ranking.
 """
+from typing import AsyncIterator
 from src.models.memory import Fact, FactList
+from src.llm.deadline import Deadline
+from src.llm.routing import Complexity
 from src.llm.prompts import FACT_EXTRACTION_PROMPT
 
 
@@ -12,13 +15,20 @@ class FactExtractor:
     def __init__(self, groq_client):
         self.client = groq_client
     
-    async def extract(self, formatted_messages: str) -> list[Fact]:
+    async def extract(
+        self,
+        formatted_messages: str,
+        deadline: Deadline | None = None,
+        complexity: Complexity | None = None,
+    ) -> list[Fact]:
         """
         Extract facts from formatted messages.
         
         Args:
             formatted_messages: Messages formatted as "[index] content"
-            
+            deadline: Optional request deadline passed to the LLM call
+            complexity: Transcript size and signal, used to pick the model
+        
         Returns:
             List of Fact objects with importance ranking
         """
@@ -26,5 +36,35 @@ class FactExtractor:
             system_prompt=FACT_EXTRACTION_PROMPT,
             user_content=formatted_messages,
             response_model=FactList,
+            deadline=deadline,
+            route="facts",
+            complexity=complexity,
         )
         return result.facts
+    
+    async def stream(
+        self,
+        formatted_messages: str,
+        deadline: Deadline | None = None,
+        complexity: Complexity | None = None,
+    ) -> AsyncIterator[Fact]:
+        """
+        Stream facts as soon as each one is complete in the LLM output.
+        
+        Args:
+            formatted_messages: Messages formatted as "[index] content"
+            deadline: Optional request deadline passed to the LLM call
+            complexity: Transcript size and signal, used to pick the model
+        
+        Yields:
+            Fact objects in completion order
+        """
+        async for fact in self.client.stream_structured(
+            system_prompt=FACT_EXTRACTION_PROMPT,
+            user_content=formatted_messages,
+            response_model=FactList,
+            deadline=deadline,
+            route="facts",
+            complexity=complexity,
+        ):
+            yield fact
@@ -1,76 +1,351 @@
 """
 Memory extraction orchestrator.
-Coordinates parallel extraction of all memory components using asyncio.gather.
+Coordinates parallel extraction of all memory components using asyncio tasks.
 """
 import asyncio
-from src.models.memory import UserMemory
+import hashlib
+import os
+from collections import OrderedDict
+from typing import AsyncIterator
+from src.llm.breaker import CircuitOpen
+from src.llm.deadline import Deadline, DeadlineExceeded
+from src.llm.routing import Complexity
+from src.models.memory import MemoryStreamEvent, UserMemory
 from src.models.messages import ChatMessage
-from src.extractors.preferences import PreferenceExtractor
-from src.extractors.emotions import EmotionalPatternExtractor
-from src.extractors.facts import FactExtractor
+from src.extractors.compaction import TranscriptCompactor
+from src.extractors.prefilter import MessagePrefilter
+from src.extractors.registry import ExtractorRegistry, ExtractorSpec, default_registry
+from src.extractors.rules import RuleExtractor, is_duplicate
+from src.extractors.scheduler import ExtractionScheduler
+from src.observability.metrics import METRICS
+
+# Tunables (seconds): hard cap per extractor call, and the overall
+# extract_all deadline used when the caller passes none
+EXTRACTOR_TIMEOUT = float(os.getenv("EXTRACTOR_TIMEOUT", "20"))
+EXTRACTION_DEADLINE = float(os.getenv("EXTRACTION_DEADLINE", "30"))
+
+# Tunable: extractor results kept per orchestrator, keyed by input hash
+EXTRACTION_CACHE_SIZE = int(os.getenv("EXTRACTION_CACHE_SIZE", "256"))
 
 
 class MemoryOrchestrator:
     """
     Coordinates parallel extraction of all memory components.
     
-    Uses asyncio.gather with return_exceptions=True for fault tolerance.
-    If one extractor fails, the others still return results.
+    Extractors run as concurrent tasks and are collected individually for
+    fault tolerance: if one extractor fails or misses the request deadline,
+    the others still return results.
+    
+    Which extractors run comes from an ExtractorRegistry, and results are
+    put into UserMemory by field name. Runs share the scheduler's
+    concurrency budget and are cached by input hash, so an extractor whose
+    transcript hasn't changed since its last run is not called again.
     """
     
-    def __init__(self, groq_client):
-        self.preference_extractor = PreferenceExtractor(groq_client)
-        self.emotion_extractor = EmotionalPatternExtractor(groq_client)
-        self.fact_extractor = FactExtractor(groq_client)
+    def __init__(
+        self,
+        groq_client,
+        prefilter: MessagePrefilter | None = None,
+        compactor: TranscriptCompactor | None = None,
+        extractor_timeouts: dict[str, float] | None = None,
+        registry: ExtractorRegistry | None = None,
+        scheduler: ExtractionScheduler | None = None,
+        cache_size: int = EXTRACTION_CACHE_SIZE,
+    ):
+        # Snapshot: later changes to the registry don't affect this orchestrator
+        self.registry = (registry or default_registry()).copy()
+        self.extractors = {spec.name: spec.factory(groq_client) for spec in self.registry.specs}
+        self.scheduler = scheduler or ExtractionScheduler()
+        self.prefilter = prefilter or MessagePrefilter()
+        self.compactor = compactor or TranscriptCompactor()
+        self.rule_extractor = RuleExtractor()
+        self.extractor_timeouts = {
+            spec.name: spec.timeout or EXTRACTOR_TIMEOUT for spec in self.registry.specs
+        }
+        self.extractor_timeouts.update(extractor_timeouts or {})
+        self.cache_size = cache_size
+        self._cache: OrderedDict[tuple[str, str, str], list] = OrderedDict()
     
-    def _format_messages(self, messages: list[ChatMessage]) -> str:
-        """Format messages with indices for source attribution."""
-        return "\n".join(
-            f"[{i}] {msg.content}" for i, msg in enumerate(messages)
-        )
+    @property
+    def sections(self) -> tuple[str, ...]:
+        """UserMemory fields filled by the registered extractors, in scheduling order."""
+        return self.registry.names
+    
+    def _format_messages(self, messages: list[ChatMessage]) -> tuple[str, Complexity]:
+        """
+        Format messages with indices for source attribution.
+        
+        Content-free messages are dropped and duplicates collapsed by the
+        pre-filter, then the transcript is compacted to the per-extractor
+        token budget. Indices always refer to the original message list.
+        
+        Returns:
+            (transcript, its size and total signal score for model routing)
+        """
+        filtered = self.prefilter.apply(messages)
+        transcript = self.compactor.compact(messages, filtered)
+        signal = sum(score for i, score in filtered.scores.items() if i not in transcript.omitted)
+        return transcript.text, Complexity(tokens=transcript.tokens_after, signal=signal)
+    
+    def quick_extract(self, messages: list[ChatMessage]) -> UserMemory:
+        """
+        Instant first-pass memory from the rule-based extractor alone.
+        
+        Covers explicit statements only ("I'm 28", "I love cooking");
+        no LLM call is made.
+        """
+        preferences, facts = self.rule_extractor.extract(messages)
+        METRICS.inc("extraction.rule_items", len(preferences), section="preferences")
+        METRICS.inc("extraction.rule_items", len(facts), section="facts")
+        return UserMemory(preferences=preferences, facts=facts, message_count=len(messages))
+    
+    @staticmethod
+    def _restates_rule(item, rule_items: list, section: str) -> bool:
+        """True (and counted) if an LLM item repeats a rule-based item."""
+        if any(is_duplicate(rule_item, item) for rule_item in rule_items):
+            METRICS.inc("extraction.rule_duplicates", section=section)
+            return True
+        return False
+    
+    def _merge(self, rule_items: list, llm_items: list, section: str) -> list:
+        """Rule items first, then LLM items that don't restate one of them."""
+        return rule_items + [item for item in llm_items if not self._restates_rule(item, rule_items, section)]
+    
+    def _section_deadline(self, section: str, deadline: Deadline | None) -> Deadline:
+        """The section's own timeout, capped by the request deadline if given."""
+        return Deadline.after(self.extractor_timeouts[section]).earliest(deadline)
+    
+    @staticmethod
+    def _cache_key(spec: ExtractorSpec, formatted: str) -> tuple[str, str, str]:
+        return spec.name, spec.version, hashlib.sha256(formatted.encode()).hexdigest()
+    
+    def _cached(self, spec: ExtractorSpec, formatted: str) -> list | None:
+        """Items from an earlier run of `spec` on the same transcript, if cached."""
+        key = self._cache_key(spec, formatted)
+        items = self._cache.get(key)
+        METRICS.inc("extraction.cache", extractor=spec.name, outcome="miss" if items is None else "hit")
+        if items is None:
+            return None
+        self._cache.move_to_end(key)
+        return list(items)
+    
+    def _store(self, spec: ExtractorSpec, formatted: str, items: list) -> None:
+        if self.cache_size <= 0:
+            return
+        self._cache[self._cache_key(spec, formatted)] = list(items)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+    
+    async def _run_extractor(
+        self,
+        spec: ExtractorSpec,
+        formatted: str,
+        complexity: Complexity,
+        deadline: Deadline,
+    ) -> list:
+        """One extractor run: served from cache when the input is unchanged, else under a scheduler slot."""
+        items = self._cached(spec, formatted)
+        if items is not None:
+            return items
+        async with self.scheduler.slot(spec.name, spec.cost.slots, spec.priority, deadline):
+            items = await self.extractors[spec.name].extract(formatted, deadline, complexity)
+        self._store(spec, formatted, items)
+        return items
+    
+    async def _stream_extractor(
+        self,
+        spec: ExtractorSpec,
+        formatted: str,
+        complexity: Complexity,
+        deadline: Deadline,
+    ) -> AsyncIterator:
+        """Streaming counterpart of _run_extractor; cache hits are replayed item by item."""
+        items = self._cached(spec, formatted)
+        if items is not None:
+            for item in items:
+                yield item
+            return
+        items = []
+        async with self.scheduler.slot(spec.name, spec.cost.slots, spec.priority, deadline):
+            async for item in self.extractors[spec.name].stream(formatted, deadline, complexity):
+                items.append(item)
+                yield item
+        self._store(spec, formatted, items)
     
-    async def extract_all(self, messages: list[ChatMessage]) -> UserMemory:
+    def _start_extractors(
+        self,
+        formatted: str,
+        complexity: Complexity,
+        deadlines: dict[str, Deadline],
+    ) -> dict[str, asyncio.Task]:
+        return {
+            spec.name: asyncio.create_task(self._run_extractor(spec, formatted, complexity, deadlines[spec.name]))
+            for spec in self.registry.specs
+        }
+    
+    async def extract_all(
+        self,
+        messages: list[ChatMessage],
+        deadline: Deadline | None = None,
+    ) -> UserMemory:
         """
-        Run all extractors in parallel using asyncio.gather.
+        Run all extractors in parallel.
         
         This is a key differentiator from sequential approaches.
         Reduces extraction latency from ~3s to ~0.8s on Groq.
         
+        Rule-based items (explicit statements, confidence 1.0) are merged
+        in front of the LLM results; LLM items restating them are dropped.
+        
+        Each extractor has its own timeout (extractor_timeouts), and the
+        whole call is bounded by `deadline` (EXTRACTION_DEADLINE seconds
+        when not given), so one hung Groq call cannot hang the request.
+        While the LLM circuit breaker is open, uncached sections fail fast
+        with CircuitOpen and the result degrades to rule-based items plus
+        any cached sections.
+        
         Args:
             messages: List of ChatMessage objects
-            
+            deadline: Optional request deadline. Sections that have not
+                finished when it passes are reported in extraction_errors;
+                finished sections are still returned.
+        
         Returns:
             Complete UserMemory with all extracted components
         """
-        if not messages:
-            return UserMemory(message_count=0)
+        quick = self.quick_extract(messages)
+        formatted, complexity = self._format_messages(messages)
+        if not formatted:
+            # Nothing for the LLM: skip the calls entirely
+            return quick
         
-        formatted = self._format_messages(messages)
+        deadline = deadline or Deadline.after(EXTRACTION_DEADLINE)
+        deadlines = {section: self._section_deadline(section, deadline) for section in self.sections}
         
         # Parallel extraction - key for high-throughput
-        results = await asyncio.gather(
-            self.preference_extractor.extract(formatted),
-            self.emotion_extractor.extract(formatted),
-            self.fact_extractor.extract(formatted),
-            return_exceptions=True  # Fault tolerance: don't fail if one extractor fails
-        )
+        tasks = self._start_extractors(formatted, complexity, deadlines)
+        try:
+            await asyncio.wait(tasks.values(), timeout=deadline.remaining())
+        except asyncio.CancelledError:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        
+        # Deadline passed: stop paying for stragglers
+        for task in tasks.values():
+            if not task.done():
+                task.cancel()
+        
+        # Fault tolerance: don't fail if one extractor fails or times out
+        results = {section: self._section_result(task, section) for section, task in tasks.items()}
         
         # Handle partial failures gracefully
-        preferences = results[0] if not isinstance(results[0], Exception) else []
-        emotions = results[1] if not isinstance(results[1], Exception) else []
-        facts = results[2] if not isinstance(results[2], Exception) else []
+        sections = {
+            section: result if not isinstance(result, Exception) else []
+            for section, result in results.items()
+        }
         
         # Track errors for debugging without crashing
-        errors = [
-            f"{type(r).__name__}: {str(r)}" 
-            for r in results 
-            if isinstance(r, Exception)
-        ]
+        errors = {}
+        for section, result in results.items():
+            if not isinstance(result, Exception):
+                continue
+            if isinstance(result, DeadlineExceeded):
+                METRICS.inc("extraction.timeouts", section=section)
+            elif isinstance(result, CircuitOpen):
+                METRICS.inc("extraction.degraded", section=section)
+            errors[section] = f"{type(result).__name__}: {str(result)}"
         
+        # Filled by field name: rule items first, then each registered section
+        fields = {"preferences": quick.preferences, "facts": quick.facts}
+        for section, items in sections.items():
+            fields[section] = self._merge(getattr(quick, section), items, section)
         return UserMemory(
-            preferences=preferences,
-            emotional_patterns=emotions,
-            facts=facts,
+            **fields,
             message_count=len(messages),
-            extraction_errors=errors,
+            extraction_errors=list(errors.values()),
         )
+    
+    async def stream_all(
+        self,
+        messages: list[ChatMessage],
+        deadline: Deadline | None = None,
+    ) -> AsyncIterator[MemoryStreamEvent]:
+        """
+        Run all extractors in parallel, yielding each item as it arrives.
+        
+        Rule-based items are yielded first, before any LLM output; items
+        from the registered LLM extractors follow interleaved in completion
+        order, minus those restating a rule item. A failing or late
+        section (past its own timeout or the deadline) yields an "error"
+        event; the stream always ends with a "done" event carrying the
+        assembled UserMemory.
+        
+        Args:
+            messages: List of ChatMessage objects
+            deadline: Optional request deadline shared by all extractors
+                (EXTRACTION_DEADLINE seconds when not given)
+        
+        Yields:
+            MemoryStreamEvent objects
+        """
+        memory = self.quick_extract(messages)
+        rule_items = {"preferences": list(memory.preferences), "facts": list(memory.facts)}
+        formatted, complexity = self._format_messages(messages)
+        
+        deadline = deadline or Deadline.after(EXTRACTION_DEADLINE)
+        streams = {} if not formatted else {
+            spec.name: self._stream_extractor(
+                spec, formatted, complexity, self._section_deadline(spec.name, deadline)
+            )
+            for spec in self.registry.specs
+        }
+        queue: asyncio.Queue[MemoryStreamEvent | None] = asyncio.Queue()
+        
+        async def pump(section: str, stream: AsyncIterator) -> None:
+            try:
+                async for item in stream:
+                    await queue.put(MemoryStreamEvent(type="item", section=section, item=item))
+            except Exception as e:
+                if isinstance(e, DeadlineExceeded):
+                    METRICS.inc("extraction.timeouts", section=section)
+                elif isinstance(e, CircuitOpen):
+                    METRICS.inc("extraction.degraded", section=section)
+                await queue.put(MemoryStreamEvent(
+                    type="error", section=section, error=f"{type(e).__name__}: {str(e)}"
+                ))
+            finally:
+                await queue.put(None)  # section finished
+        
+        tasks = [asyncio.create_task(pump(section, stream)) for section, stream in streams.items()]
+        try:
+            # First pass while the LLM calls are in flight
+            for section, items in rule_items.items():
+                for item in items:
+                    yield MemoryStreamEvent(type="item", section=section, item=item)
+            
+            remaining = len(tasks)
+            while remaining:
+                event = await queue.get()
+                if event is None:
+                    remaining -= 1
+                    continue
+                if event.type == "item":
+                    if self._restates_rule(event.item, rule_items.get(event.section, []), event.section):
+                        continue
+                    getattr(memory, event.section).append(event.item)
+                else:
+                    memory.extraction_errors.append(event.error)
+                yield event
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        yield MemoryStreamEvent(type="done", memory=memory)
+    
+    @staticmethod
+    def _section_result(task: asyncio.Task, section: str):
+        """Result of a finished extractor task, or the exception explaining why not."""
+        if not task.done() or task.cancelled():
+            return DeadlineExceeded(f"{section} extraction did not finish before the deadline")
+        return task.exception() or task.result()
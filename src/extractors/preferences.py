@@ -2,7 +2,10 @@
 Preference extractor module.
 Extracts user preferences with confidence scoring and source attribution.
 """
+from typing import AsyncIterator
 from src.models.memory import Preference, PreferenceList
+from src.llm.deadline import Deadline
+from src.llm.routing import Complexity
 from src.llm.prompts import PREFERENCE_EXTRACTION_PROMPT
 
 
@@ -12,13 +15,20 @@ class PreferenceExtractor:
     def __init__(self, groq_client):
         self.client = groq_client
     
-    async def extract(self, formatted_messages: str) -> list[Preference]:
+    async def extract(
+        self,
+        formatted_messages: str,
+        deadline: Deadline | None = None,
+        complexity: Complexity | None = None,
+    ) -> list[Preference]:
         """
         Extract preferences from formatted messages.
         
         Args:
             formatted_messages: Messages formatted as "[index] content"
-            
+            deadline: Optional request deadline passed to the LLM call
+            complexity: Transcript size and signal, used to pick the model
+        
         Returns:
             List of Preference objects with confidence scores
         """
@@ -26,5 +36,35 @@ class PreferenceExtractor:
             system_prompt=PREFERENCE_EXTRACTION_PROMPT,
             user_content=formatted_messages,
             response_model=PreferenceList,
+            deadline=deadline,
+            route="preferences",
+            complexity=complexity,
         )
         return result.preferences
+    
+    async def stream(
+        self,
+        formatted_messages: str,
+        deadline: Deadline | None = None,
+        complexity: Complexity | None = None,
+    ) -> AsyncIterator[Preference]:
+        """
+        Stream preferences as soon as each one is complete in the LLM output.
+        
+        Args:
+            formatted_messages: Messages formatted as "[index] content"
+            deadline: Optional request deadline passed to the LLM call
+            complexity: Transcript size and signal, used to pick the model
+        
+        Yields:
+            Preference objects in completion order
+        """
+        async for preference in self.client.stream_structured(
+            system_prompt=PREFERENCE_EXTRACTION_PROMPT,
+            user_content=formatted_messages,
+            response_model=PreferenceList,
+            deadline=deadline,
+            route="preferences",
+            complexity=complexity,
+        ):
+            yield preference
@@ -0,0 +1,170 @@
+"""
+Local pre-filter for extraction input.
+Scores every message for extractable signal with a few lexical features
+and a tiny bundled logistic model, then drops content-free messages
+("ok", "lol", emoji-only) and collapses duplicates before anything is
+sent to the three LLM extractors. Original indices are kept so
+source_message_ids still point into the caller's message list.
+"""
+import re
+from dataclasses import dataclass, field
+import numpy as np
+from src.models.messages import ChatMessage
+from src.observability.metrics import METRICS, MetricsRegistry
+
+_TOKEN = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+_EDGE_PUNCTUATION = re.compile(r"^[\W_]+|[\W_]+$")
+
+FILLER_WORDS = frozenset({
+    "ok", "okay", "k", "kk", "lol", "lmao", "rofl", "haha", "hahaha", "hehe",
+    "hmm", "hm", "mm", "yeah", "yep", "yup", "yes", "ya", "no", "nope", "nah",
+    "sure", "cool", "nice", "thanks", "thank", "thx", "ty", "oh", "ah", "omg",
+    "wow", "hi", "hey", "hello", "bye", "gn", "gm", "true", "right", "same",
+    "ikr", "idk", "np", "great", "fine", "alright", "you", "u", "too",
+    "good", "morning", "night", "sounds", "brb", "ttyl", "gtg",
+})
+
+FIRST_PERSON = frozenset({
+    "i", "i'm", "i've", "i'd", "i'll", "im", "ive", "me", "my", "mine", "myself",
+    "we", "we're", "our", "ours",
+})
+
+# Words that tend to introduce a preference, feeling or personal fact
+SIGNAL_WORDS = frozenset({
+    "love", "like", "hate", "prefer", "enjoy", "favorite", "favourite", "want",
+    "need", "wish", "can't", "cannot", "never", "always", "usually", "every",
+    "feel", "feeling", "felt", "stressed", "stress", "anxious", "happy", "sad",
+    "lonely", "excited", "worried", "grateful", "tired", "angry",
+    "work", "job", "working", "startup", "office", "manager", "boss", "promotion",
+    "live", "living", "moved", "moving", "home", "apartment",
+    "sister", "brother", "mom", "dad", "parents", "wife", "husband", "friend",
+    "friends", "family", "kids", "dog", "cat", "married", "wedding",
+    "started", "learning", "studying", "reading", "allergic", "vegan",
+    "vegetarian", "born", "years", "birthday", "value",
+})
+
+FEATURES = (
+    "log_words",       # log1p of the word count
+    "alpha_ratio",     # share of characters that are letters
+    "first_person",    # mentions the speaker
+    "signal_words",    # lexicon hits, capped at 3
+    "has_digit",       # ages, dates, durations
+    "filler_ratio",    # share of words that are conversational filler
+    "no_letters",      # emoji / punctuation only
+)
+
+# Bundled logistic model: hand-set weights, one per entry in FEATURES,
+# checked against benchmarks/prefilter_corpus.jsonl
+WEIGHTS = np.array([1.2, 1.0, 1.5, 1.2, 0.5, -4.0, -4.0])
+BIAS = -2.0
+
+
+@dataclass
+class FilteredMessages:
+    """Messages that survived the pre-filter, keyed by their original index."""
+    kept: list[tuple[int, ChatMessage]]
+    duplicates: dict[int, list[int]] = field(default_factory=dict)  # kept index -> repeat indices
+    dropped: list[int] = field(default_factory=list)
+    scores: dict[int, float] = field(default_factory=dict)  # kept index -> signal score
+    
+    def line(self, index: int, content: str) -> str:
+        """Render one kept message as "[index] content", noting collapsed repeats."""
+        line = f"[{index}] {content}"
+        if index in self.duplicates:
+            line += " (repeated as " + ", ".join(f"[{d}]" for d in self.duplicates[index]) + ")"
+        return line
+    
+    def format(self) -> str:
+        """Render kept messages with their original indices for source attribution."""
+        return "\n".join(self.line(i, msg.content) for i, msg in self.kept)
+
+
+class MessagePrefilter:
+    """
+    Drops low-signal messages and collapses duplicates before extraction.
+    
+    Features are computed per message and scored in a single vectorized
+    pass: sigmoid(features @ WEIGHTS + BIAS). Messages scoring below
+    `threshold` are dropped; threshold=0 keeps every message while still
+    collapsing duplicates.
+    """
+    
+    def __init__(
+        self,
+        threshold: float = 0.5,
+        weights: np.ndarray = WEIGHTS,
+        bias: float = BIAS,
+        metrics: MetricsRegistry = METRICS,
+    ):
+        self.threshold = threshold
+        self.weights = weights
+        self.bias = bias
+        self.metrics = metrics
+    
+    @staticmethod
+    def _features(text: str) -> list[float]:
+        words = [w.lower() for w in _TOKEN.findall(text)]
+        letters = sum(ch.isalpha() for ch in text)
+        return [
+            len(words),
+            letters / len(text) if text else 0.0,
+            any(w in FIRST_PERSON for w in words),
+            sum(w in SIGNAL_WORDS for w in words),
+            any(ch.isdigit() for ch in text),
+            sum(w in FILLER_WORDS for w in words) / len(words) if words else 0.0,
+            letters == 0,
+        ]
+    
+    def features(self, messages: list[ChatMessage]) -> np.ndarray:
+        """Feature matrix of shape (len(messages), len(FEATURES))."""
+        matrix = np.array(
+            [self._features(msg.content.strip()) for msg in messages],
+            dtype=float,
+        ).reshape(len(messages), len(FEATURES))
+        matrix[:, 0] = np.log1p(matrix[:, 0])
+        matrix[:, 3] = np.minimum(matrix[:, 3], 3)
+        return matrix
+    
+    def score(self, messages: list[ChatMessage]) -> np.ndarray:
+        """Probability that each message carries extractable signal."""
+        logits = self.features(messages) @ self.weights + self.bias
+        return 1.0 / (1.0 + np.exp(-logits))
+    
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return _EDGE_PUNCTUATION.sub("", " ".join(text.lower().split()))
+    
+    def apply(self, messages: list[ChatMessage]) -> FilteredMessages:
+        """
+        Filter `messages`, keeping original indices.
+        
+        Returns:
+            FilteredMessages with kept messages, collapsed duplicates and
+            the indices of dropped messages
+        """
+        result = FilteredMessages(kept=[])
+        if not messages:
+            return result
+        
+        scores = self.score(messages)
+        keep = scores >= self.threshold
+        first_seen: dict[str, int] = {}
+        for i, msg in enumerate(messages):
+            if not keep[i]:
+                result.dropped.append(i)
+                continue
+            key = self._normalize(msg.content)
+            if key in first_seen:
+                result.duplicates.setdefault(first_seen[key], []).append(i)
+                continue
+            first_seen[key] = i
+            result.kept.append((i, msg))
+            result.scores[i] = float(scores[i])
+        
+        removed = result.dropped + [d for dups in result.duplicates.values() for d in dups]
+        collapsed = len(removed) - len(result.dropped)
+        self.metrics.inc("extraction.prefilter_messages", len(result.kept), outcome="kept")
+        self.metrics.inc("extraction.prefilter_messages", len(result.dropped), outcome="dropped")
+        self.metrics.inc("extraction.prefilter_messages", collapsed, outcome="collapsed")
+        self.metrics.inc("extraction.prefilter_chars_saved", sum(len(messages[i].content) for i in removed))
+        return result
@@ -0,0 +1,112 @@
+"""
+Extractor registry.
+Each LLM extractor is declared once with the UserMemory field it fills,
+its item schema, cost class and priority. The orchestrator builds and
+schedules whatever is registered, so adding an extractor (goals,
+routines, ...) means adding a UserMemory field, a prompt and a spec.
+"""
+from dataclasses import dataclass
+from enum import Enum
+from typing import AsyncIterator, Callable, Protocol, Type
+from pydantic import BaseModel
+from src.extractors.emotions import EmotionalPatternExtractor
+from src.extractors.facts import FactExtractor
+from src.extractors.preferences import PreferenceExtractor
+from src.llm.deadline import Deadline
+from src.llm.routing import Complexity
+from src.llm.repair import list_item_model
+from src.models.memory import EmotionalPattern, Fact, Preference, UserMemory
+
+
+class Extractor(Protocol):
+    """What the orchestrator needs from an extractor instance."""
+    
+    async def extract(
+        self,
+        formatted_messages: str,
+        deadline: Deadline | None = None,
+        complexity: Complexity | None = None,
+    ) -> list: ...
+    
+    def stream(
+        self,
+        formatted_messages: str,
+        deadline: Deadline | None = None,
+        complexity: Complexity | None = None,
+    ) -> AsyncIterator: ...
+
+
+class CostClass(str, Enum):
+    """Relative cost of one extractor run; sets its share of the concurrency budget."""
+    CHEAP = "cheap"
+    STANDARD = "standard"
+    EXPENSIVE = "expensive"
+    
+    @property
+    def slots(self) -> int:
+        return {"cheap": 1, "standard": 2, "expensive": 4}[self.value]
+
+
+@dataclass(frozen=True)
+class ExtractorSpec:
+    """Declaration of one extractor."""
+    name: str  # UserMemory field the results go into
+    factory: Callable[..., Extractor]  # called with the GroqClient
+    item_model: Type[BaseModel]
+    cost: CostClass = CostClass.STANDARD
+    priority: int = 0  # lower is scheduled first
+    timeout: float | None = None  # seconds; None uses EXTRACTOR_TIMEOUT
+    version: str = "1"  # bump to invalidate cached results after prompt changes
+
+
+class ExtractorRegistry:
+    """Ordered collection of extractor specs, validated against UserMemory."""
+    
+    def __init__(self, specs: list[ExtractorSpec] | None = None):
+        self._specs: dict[str, ExtractorSpec] = {}
+        for spec in specs or []:
+            self.register(spec)
+    
+    def register(self, spec: ExtractorSpec) -> ExtractorSpec:
+        """
+        Add or replace an extractor.
+        
+        Raises:
+            ValueError: If UserMemory has no list field `spec.name` holding
+                `spec.item_model` items
+        """
+        field = UserMemory.model_fields.get(spec.name)
+        if field is None or list_item_model(field.annotation) is not spec.item_model:
+            raise ValueError(
+                f"Extractor {spec.name!r} needs a UserMemory field "
+                f"'{spec.name}: list[{spec.item_model.__name__}]'"
+            )
+        self._specs[spec.name] = spec
+        return spec
+    
+    def unregister(self, name: str) -> None:
+        self._specs.pop(name, None)
+    
+    def get(self, name: str) -> ExtractorSpec:
+        return self._specs[name]
+    
+    @property
+    def specs(self) -> list[ExtractorSpec]:
+        """Specs in scheduling order (priority, then registration order)."""
+        return sorted(self._specs.values(), key=lambda spec: spec.priority)
+    
+    @property
+    def names(self) -> tuple[str, ...]:
+        return tuple(spec.name for spec in self.specs)
+    
+    def copy(self) -> "ExtractorRegistry":
+        return ExtractorRegistry(list(self._specs.values()))
+
+
+def default_registry() -> ExtractorRegistry:
+    """The built-in preference, emotional pattern and fact extractors."""
+    return ExtractorRegistry([
+        ExtractorSpec("preferences", PreferenceExtractor, Preference, priority=0),
+        ExtractorSpec("facts", FactExtractor, Fact, priority=0),
+        ExtractorSpec("emotional_patterns", EmotionalPatternExtractor, EmotionalPattern, priority=1),
+    ])
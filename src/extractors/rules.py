@@ -0,0 +1,227 @@
+"""
+Rule-based extractor.
+Deterministic regex patterns for explicit statements ("I'm 28",
+"I love cooking", "my sister's wedding is next month") that run in
+microseconds and need no LLM call. Matches are emitted with
+confidence=1.0 and give an instant first-pass memory; the LLM
+extractors still run for implicit signals and their results are merged,
+with duplicates of rule items dropped.
+"""
+import re
+from dataclasses import dataclass
+from typing import Callable
+from src.models.memory import Fact, Preference
+from src.models.messages import ChatMessage
+
+# An object phrase ends at punctuation or a clause-joining conjunction
+_END = r"(?=\s*(?:[.,!?;:)]|\s(?:but|and|because|so|though|when)\s|$))"
+_OBJECT = r"([\w'’ -]{2,60}?)"
+
+_TIME_WORDS = re.compile(
+    r"\b(today|tomorrow|tonight|yesterday|next|last|this (?:week|month|year)|"
+    r"monday|tuesday|wednesday|thursday|friday|saturday|sunday|"
+    r"january|february|march|april|may|june|july|august|september|october|november|december)\b",
+    re.IGNORECASE,
+)
+_COMMUNICATION_WORDS = re.compile(
+    r"\b(talk|talks|conversations?|direct|people|texting|calls?|messages?|small talk|honest)\b",
+    re.IGNORECASE,
+)
+_VAGUE_OBJECTS = re.compile(r"^(?:it|that|this|those|these|them|when|how|what|to be|you|him|her)\b", re.IGNORECASE)
+# A place is a proper noun ("Pune", "the UK") or names a kind of place
+_PROPER_NOUN = re.compile(r"(?:the\s+)?[A-Z]")
+_PLACE_NOUNS = re.compile(
+    r"\b(?:city|town|village|country|state|suburbs?|neighbou?rhood|area|apartment|flat|house|hostel|dorm)\b",
+    re.IGNORECASE,
+)
+# Family events worth remembering ("my sister's wedding ...")
+_EVENT_NOUNS = (
+    r"(?:wedding|birthday|engagement|anniversary|graduation|funeral|surgery|operation|"
+    r"exam|interview|party|baby shower|retirement|visit|trip)"
+)
+_CONTENT_WORD = re.compile(r"[a-z']{3,}|\d+")
+_STOPWORDS = frozenset({
+    "the", "and", "for", "with", "about", "their", "they", "them", "has", "have",
+    "enjoys", "prefers", "dislikes", "values", "lives", "works", "years", "old",
+})
+
+
+@dataclass(frozen=True)
+class FactRule:
+    """
+    Regex producing a Fact; `template` is formatted with the match groups.
+    If `accept` is set, a match whose last group it rejects is skipped.
+    """
+    pattern: re.Pattern
+    category: str
+    importance: str
+    template: str
+    accept: Callable[[str], bool] | None = None
+
+
+@dataclass(frozen=True)
+class PreferenceRule:
+    """Regex producing a Preference; `template` is formatted with the match groups."""
+    pattern: re.Pattern
+    category: str | None  # None: infer from the matched object
+    template: str
+
+
+def _rx(pattern: str) -> re.Pattern:
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def is_place(obj: str) -> bool:
+    """True if an object phrase names a place rather than a state ("fear", "work")."""
+    return bool(_PROPER_NOUN.match(obj) or _PLACE_NOUNS.search(obj))
+
+
+FACT_RULES = (
+    FactRule(
+        _rx(rf"\bI(?:'m|’m| am)\s+(\d{{1,2}})(?:\s*(?:years?|yrs?)(?:\s*old)?)?{_END}"),
+        "personal", "high", "Is {0} years old",
+    ),
+    FactRule(_rx(rf"\bI(?:'m|’m| am) turning (\d{{1,2}})\b(.*?){_END}"), "temporal", "high", "Turning {0} {1}"),
+    FactRule(_rx(rf"\bI work as an? {_OBJECT}{_END}"), "professional", "high", "Works as a {0}"),
+    FactRule(
+        _rx(rf"\bI(?:'ve|’ve| have) been (?:at|with) (?:this|my|the) {_OBJECT} for (\d+\+? \w+)"),
+        "professional", "medium", "Has been at their {0} for {1}",
+    ),
+    FactRule(_rx(rf"\bI live in {_OBJECT}{_END}"), "personal", "high", "Lives in {0}", is_place),
+    FactRule(_rx(rf"\bI(?:'m|’m| am) from {_OBJECT}{_END}"), "personal", "high", "Is from {0}", is_place),
+    FactRule(
+        _rx(rf"\bI(?:'m|’m| am| just| have|'ve|’ve)? (mov(?:ed|ing)) to {_OBJECT}{_END}"),
+        "temporal", "high", "{0} to {1}", is_place,
+    ),
+    FactRule(_rx(rf"\bI(?:'m|’m| am) allergic to {_OBJECT}{_END}"), "personal", "high", "Allergic to {0}"),
+    FactRule(
+        _rx(
+            r"\bmy (sister|brother|mom|mother|dad|father|parents|wife|husband|partner|girlfriend|boyfriend|"
+            rf"son|daughter|best friend|friend|boss|manager)('s|’s|'|’) ({_EVENT_NOUNS}\b[\w'’ -]{{0,60}}?){_END}"
+        ),
+        "relational", "medium", "{0}{1} {2}",
+    ),
+)
+
+PREFERENCE_RULES = (
+    PreferenceRule(_rx(rf"\bI (?:really |absolutely |just )?(?:love|enjoy|adore) {_OBJECT}{_END}"), None, "Enjoys {0}"),
+    PreferenceRule(_rx(rf"\bI (?:really )?prefer {_OBJECT}(?: over {_OBJECT})?{_END}"), None, "Prefers {0}"),
+    PreferenceRule(_rx(rf"\bI (?:really )?(?:hate|dislike|can't stand|can’t stand) {_OBJECT}{_END}"), None, "Dislikes {0}"),
+    PreferenceRule(_rx(rf"\bI value {_OBJECT}{_END}"), "values", "Values {0}"),
+    PreferenceRule(_rx(r"\bI(?:'m|’m| am) an? ((?:morning|night|early) (?:person|owl|bird|riser))"), "lifestyle", "Is a {0}"),
+    PreferenceRule(_rx(r"\bI(?:'m|’m| am) (vegan|vegetarian|pescatarian|teetotal)\b"), "lifestyle", "Is {0}"),
+)
+
+
+def _clean(value: str | None) -> str:
+    return (value or "").strip(" -")
+
+
+def _preference_category(obj: str, rule: PreferenceRule) -> str:
+    if rule.category:
+        return rule.category
+    if _COMMUNICATION_WORDS.search(obj):
+        return "communication"
+    return "values" if rule.template.startswith("Dislikes") else "interests"
+
+
+def content_words(text: str) -> set[str]:
+    """Numbers and lower-cased words of 3+ letters, without filler and template words."""
+    return {w for w in _CONTENT_WORD.findall(text.lower()) if w not in _STOPWORDS}
+
+
+def is_duplicate(rule_item: Fact | Preference, other: Fact | Preference) -> bool:
+    """
+    True if `other` restates `rule_item`: they share a source message and
+    every content word of the rule item appears in the other's text.
+    """
+    if type(rule_item) is not type(other):
+        return False
+    if not set(rule_item.source_message_ids) & set(other.source_message_ids):
+        return False
+    text = (lambda item: item.fact if isinstance(item, Fact) else item.description)
+    words = content_words(text(rule_item))
+    return bool(words) and words <= content_words(text(other))
+
+
+class RuleExtractor:
+    """
+    Extracts explicit facts and preferences from user messages with regexes.
+    
+    Only user messages are scanned, so assistant turns are never
+    attributed to the user.
+    """
+    
+    def __init__(
+        self,
+        fact_rules: tuple[FactRule, ...] = FACT_RULES,
+        preference_rules: tuple[PreferenceRule, ...] = PREFERENCE_RULES,
+    ):
+        self.fact_rules = fact_rules
+        self.preference_rules = preference_rules
+    
+    def extract(self, messages: list[ChatMessage]) -> tuple[list[Preference], list[Fact]]:
+        """
+        Run every rule over the user messages.
+        
+        Args:
+            messages: Original message list; indices become source_message_ids
+        
+        Returns:
+            (preferences, facts), each with confidence=1.0 and one item per
+            distinct statement
+        """
+        preferences: dict[str, Preference] = {}
+        facts: dict[str, Fact] = {}
+        
+        for i, msg in enumerate(messages):
+            if msg.role != "user":
+                continue
+            content = msg.content
+            
+            for rule in self.fact_rules:
+                for match in rule.pattern.finditer(content):
+                    groups = [_clean(g) for g in match.groups()]
+                    if rule.accept and not rule.accept(groups[-1]):
+                        continue
+                    if rule.category == "relational" and _TIME_WORDS.search(groups[-1]):
+                        category = "temporal"
+                    else:
+                        category = rule.category
+                    text = " ".join(rule.template.format(*groups).split())
+                    text = text[0].upper() + text[1:]
+                    self._add(facts, text, i, lambda: Fact(
+                        category=category,
+                        fact=text,
+                        importance=rule.importance,
+                        confidence=1.0,
+                        source_message_ids=[i],
+                    ))
+            
+            for rule in self.preference_rules:
+                for match in rule.pattern.finditer(content):
+                    obj, *rest = [_clean(g) for g in match.groups()]
+                    if _VAGUE_OBJECTS.match(obj):
+                        continue
+                    text = rule.template.format(obj)
+                    if rest and rest[0]:
+                        text += f" over {rest[0]}"
+                    self._add(preferences, text, i, lambda: Preference(
+                        category=_preference_category(obj, rule),
+                        description=text,
+                        confidence=1.0,
+                        source_message_ids=[i],
+                        evidence=f"User said '{match.group(0)}'",
+                    ))
+        
+        return list(preferences.values()), list(facts.values())
+    
+    @staticmethod
+    def _add(items: dict, text: str, index: int, build) -> None:
+        """Add a new item, or attribute a repeated statement to one more message."""
+        key = text.lower()
+        if key in items:
+            if index not in items[key].source_message_ids:
+                items[key].source_message_ids.append(index)
+        else:
+            items[key] = build()
@@ -0,0 +1,115 @@
+"""
+Concurrency budget for extractor runs.
+All requests served by one orchestrator share a budget of slots; each
+extractor takes slots according to its cost class and queued runs are
+admitted in priority order.
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+
+from src.llm.deadline import Deadline
+from src.observability.metrics import METRICS, MetricsRegistry
+
+# Tunable: slots shared by all extractor runs of one worker
+EXTRACTOR_CONCURRENCY = int(os.getenv("EXTRACTOR_CONCURRENCY", "12"))
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    sequence: int
+    weight: int = field(compare=False)
+    name: str = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(default_factory=time.monotonic, compare=False)
+
+
+class ExtractionScheduler:
+    """
+    Weighted, priority-ordered admission for extractor runs.
+    
+    A run needs `weight` free slots out of `capacity`. Waiters are admitted
+    strictly in (priority, arrival) order, so a heavy extractor at the head
+    of the queue is never overtaken indefinitely by lighter ones.
+    """
+    
+    def __init__(self, capacity: int = EXTRACTOR_CONCURRENCY, metrics: MetricsRegistry = METRICS):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.metrics = metrics
+        self._in_use = 0
+        self._queue: list[_Waiter] = []
+        self._sequence = itertools.count()
+    
+    @property
+    def in_use(self) -> int:
+        """Slots currently held by running extractors."""
+        return self._in_use
+    
+    @property
+    def queued(self) -> int:
+        return sum(1 for w in self._queue if not w.future.done())
+    
+    @asynccontextmanager
+    async def slot(
+        self,
+        name: str,
+        weight: int = 1,
+        priority: int = 0,
+        deadline: Deadline | None = None,
+    ) -> AsyncIterator[None]:
+        """
+        Hold `weight` slots for the duration of one extractor run.
+        
+        Raises:
+            DeadlineExceeded: If `deadline` passes while still queued
+        """
+        weight = min(weight, self.capacity)
+        acquire = self._acquire(name, weight, priority)
+        await (deadline.run(acquire, what=f"{name} extraction slot") if deadline else acquire)
+        try:
+            yield
+        finally:
+            self._release(weight)
+    
+    async def _acquire(self, name: str, weight: int, priority: int) -> None:
+        waiter = _Waiter(priority, next(self._sequence), weight, name, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queue, waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted and cancelled in the same tick: hand the slots back
+                self._release(weight)
+            else:
+                waiter.future.cancel()
+                self._dispatch()
+            raise
+        
+        self.metrics.observe("extraction.queue_time_seconds", time.monotonic() - waiter.enqueued_at, extractor=name)
+    
+    def _release(self, weight: int) -> None:
+        self._in_use -= weight
+        self._dispatch()
+    
+    def _dispatch(self) -> None:
+        while self._queue:
+            head = self._queue[0]
+            if head.future.done():
+                heapq.heappop(self._queue)  # cancelled while queued
+                continue
+            if self._in_use + head.weight > self.capacity:
+                break
+            heapq.heappop(self._queue)
+            self._in_use += head.weight
+            head.future.set_result(None)
+        self.metrics.set_gauge("extraction.slots_in_use", self._in_use)
+        self.metrics.set_gauge("extraction.queued", self.queued)
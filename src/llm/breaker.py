@@ -0,0 +1,178 @@
+"""
+Circuit breaker for calls to the LLM provider.
+After too many failed or slow calls the breaker opens and calls fail
+immediately with CircuitOpen instead of waiting for a timeout; callers
+serve degraded results. After a cool-down a few probe calls are let
+through (half-open) to decide whether to close again.
+"""
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import Enum
+from typing import AsyncIterator
+import httpx
+from groq import APIConnectionError, APIStatusError
+from src.observability.metrics import METRICS, MetricsRegistry
+
+# Tunables (per worker process)
+BREAKER_WINDOW = int(os.getenv("BREAKER_WINDOW", "20"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+BREAKER_FAILURE_RATE = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_SLOW_CALL_SECONDS = float(os.getenv("BREAKER_SLOW_CALL_SECONDS", "10"))
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "15"))
+
+
+class CircuitOpen(RuntimeError):
+    """Raised instead of calling the provider while the breaker is open."""
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+
+# Gauge values for llm.breaker_state
+_STATE_LEVEL = {BreakerState.CLOSED: 0, BreakerState.HALF_OPEN: 1, BreakerState.OPEN: 2}
+
+
+def is_provider_failure(error: BaseException) -> bool:
+    """
+    True if an error says the provider is unhealthy: a transport error or
+    timeout, a 5xx, or a 429. Other 4xx errors (bad request, validation)
+    mean the provider answered and say nothing about its health.
+    """
+    if isinstance(error, APIStatusError):
+        return error.status_code >= 500 or error.status_code == 429
+    return isinstance(error, (APIConnectionError, httpx.TransportError, TimeoutError))
+
+
+class CircuitBreaker:
+    """
+    Error- and latency-triggered breaker over a window of recent calls.
+    
+    A call fails if it raises a provider failure (see is_provider_failure)
+    or takes longer than `slow_call_seconds`. A call cancelled sooner (a
+    deadline or disconnect) is not recorded at all; a cancelled probe just
+    frees its slot for the next one. The breaker
+    opens once at least `min_calls` of the last `window` calls were seen
+    and the failure share reaches `failure_rate`. After `open_seconds` it
+    lets `probes` calls through; one success closes it, one failure
+    opens it again.
+    """
+    
+    def __init__(
+        self,
+        window: int = BREAKER_WINDOW,
+        min_calls: int = BREAKER_MIN_CALLS,
+        failure_rate: float = BREAKER_FAILURE_RATE,
+        slow_call_seconds: float = BREAKER_SLOW_CALL_SECONDS,
+        open_seconds: float = BREAKER_OPEN_SECONDS,
+        probes: int = 1,
+        metrics: MetricsRegistry = METRICS,
+    ):
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.probes = probes
+        self.metrics = metrics
+        
+        self._outcomes: deque[bool] = deque(maxlen=window)  # True = failed
+        self._state = BreakerState.CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self.metrics.set_gauge("llm.breaker_state", _STATE_LEVEL[self._state])
+    
+    @property
+    def state(self) -> BreakerState:
+        if self._state is BreakerState.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._transition(BreakerState.HALF_OPEN)
+        return self._state
+    
+    def snapshot(self) -> dict:
+        """State and recent call outcomes, for /health."""
+        state = self.state
+        failures = sum(self._outcomes)
+        return {
+            "state": state.value,
+            "recent_calls": len(self._outcomes),
+            "recent_failures": failures,
+            "retry_in_seconds": (
+                round(max(0.0, self._opened_at + self.open_seconds - time.monotonic()), 3)
+                if state is BreakerState.OPEN else None
+            ),
+        }
+    
+    def check(self) -> None:
+        """
+        Fail fast before queueing for a call.
+        
+        Raises:
+            CircuitOpen: If the breaker is open
+        """
+        if self.state is BreakerState.OPEN:
+            self.metrics.inc("llm.breaker_rejected")
+            raise CircuitOpen("LLM provider circuit is open; serving degraded results")
+    
+    @asynccontextmanager
+    async def call(self) -> AsyncIterator[None]:
+        """
+        Guard one provider call, recording its outcome.
+        
+        Raises:
+            CircuitOpen: If the breaker is open, or half-open with all
+                probe calls already in flight
+        """
+        self.check()
+        probe = self._state is BreakerState.HALF_OPEN
+        if probe:
+            if self._probes_in_flight >= self.probes:
+                self.metrics.inc("llm.breaker_rejected")
+                raise CircuitOpen("LLM provider circuit is half-open; probe already in flight")
+            self._probes_in_flight += 1
+        
+        started = time.monotonic()
+        failed: bool | None = True
+        try:
+            yield
+            failed = time.monotonic() - started > self.slow_call_seconds
+        except BaseException as e:
+            slow = time.monotonic() - started > self.slow_call_seconds
+            if isinstance(e, Exception):
+                failed = slow or is_provider_failure(e)
+            else:
+                # Cancelled (deadline or disconnect): only recorded if it was already slow
+                failed = True if slow else None
+            raise
+        finally:
+            if probe:
+                self._probes_in_flight -= 1
+            if failed is not None:
+                self._record(failed, probe)
+    
+    def _record(self, failed: bool, probe: bool) -> None:
+        self.metrics.inc("llm.breaker_calls", outcome="failed" if failed else "ok")
+        if probe:
+            self._outcomes.clear()
+            self._transition(BreakerState.OPEN if failed else BreakerState.CLOSED)
+            return
+        if self._state is not BreakerState.CLOSED:
+            return  # started before the breaker opened
+        self._outcomes.append(failed)
+        if (
+            len(self._outcomes) >= self.min_calls
+            and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate
+        ):
+            self._outcomes.clear()
+            self._transition(BreakerState.OPEN)
+    
+    def _transition(self, state: BreakerState) -> None:
+        if state is BreakerState.OPEN:
+            self._opened_at = time.monotonic()
+        if state is self._state:
+            return
+        self._state = state
+        self.metrics.inc("llm.breaker_transitions", state=state.value)
+        self.metrics.set_gauge("llm.breaker_state", _STATE_LEVEL[state])
@@ -3,37 +3,206 @@ Groq client abstraction with JSON mode support and error handling.
 """
 import os
 import json
-from typing import TypeVar, Type
-from pydantic import BaseModel
-from groq import Groq
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack, contextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Iterator, TypeVar, Type
+import httpx
+from pydantic import BaseModel, ValidationError
+from groq import AsyncGroq
 from dotenv import load_dotenv
+from src.llm.breaker import CircuitBreaker
+from src.llm.deadline import Deadline
+from src.llm.dispatcher import LLMDispatcher, Priority
+from src.llm.repair import count_repairs, list_item_model, repair_item, validate_with_repair
+from src.llm.routing import LARGE_MODEL, Complexity, ModelRouter
+from src.llm.streaming import IncrementalItemParser
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 T = TypeVar("T", bound=BaseModel)
+R = TypeVar("R")
+
+
+@dataclass(frozen=True)
+class Generation:
+    """One generated reply with the provider's accounting."""
+    text: str
+    completion_tokens: int | None  # None when the response carries no usage
+    finish_reason: str | None  # "length" means max_tokens cut the reply
 
 
 class GroqClient:
     """
-    Async-ready Groq client with structured output support.
+    Async Groq client with structured output support.
     
     Uses Groq's JSON object mode for reliable structured extraction.
-    Compatible with llama-3.3-70b-versatile for best performance.
+    The model for each call is chosen by a ModelRouter from its route
+    (call type) and input complexity; llama-3.3-70b-versatile is the
+    default large model.
+    
+    Every call goes through an LLMDispatcher so interactive generation
+    is admitted ahead of background extraction on the shared quota, and
+    honours an optional request Deadline (queueing time included).
+    
+    Pass a shared `http_client` to pool keep-alive connections; in-flight
+    calls are tracked so shutdown can drain them.
+    
+    Provider calls go through a CircuitBreaker: while it is open, calls
+    raise CircuitOpen immediately instead of queueing and timing out.
     """
     
-    def __init__(self, api_key: str | None = None):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        dispatcher: LLMDispatcher | None = None,
+        http_client: httpx.AsyncClient | None = None,
+        router: ModelRouter | None = None,
+        breaker: CircuitBreaker | None = None,
+    ):
         self.api_key = api_key or os.getenv("GROQ_API_KEY")
         if not self.api_key:
             raise ValueError("GROQ_API_KEY not found. Set it in .env or pass directly.")
         
-        self.client = Groq(api_key=self.api_key)
-        self.model = "llama-3.3-70b-versatile"
+        self.client = AsyncGroq(api_key=self.api_key, http_client=http_client)
+        self.model = LARGE_MODEL
+        self.dispatcher = dispatcher or LLMDispatcher()
+        self.router = router or ModelRouter()
+        self.breaker = breaker or CircuitBreaker()
+        
+        self._active_calls = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+    
+    @property
+    def active_calls(self) -> int:
+        """LLM calls currently queued or in flight."""
+        return self._active_calls
+    
+    async def warm_up(self) -> bool:
+        """
+        Open a pooled connection to the Groq API ahead of the first request.
+        
+        Failures are logged, not raised: a cold connection is slower,
+        not broken.
+        """
+        try:
+            await self.client.models.list()
+            return True
+        except Exception as e:
+            logger.warning("Groq warm-up failed: %s: %s", type(e).__name__, e)
+            return False
+    
+    async def drain(self, timeout: float) -> bool:
+        """
+        Wait up to `timeout` seconds for in-flight calls to finish.
+        
+        Returns:
+            True if the client went idle, False if calls were still running
+        """
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    async def aclose(self) -> None:
+        """Close pooled HTTP connections."""
+        await self.client.close()
+    
+    @contextmanager
+    def _track(self) -> Iterator[None]:
+        """Count a call as in flight so shutdown can drain it."""
+        self._active_calls += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self._active_calls -= 1
+            if not self._active_calls:
+                self._idle.set()
+    
+    @staticmethod
+    async def _within(deadline: Deadline | None, awaitable: Awaitable[R]) -> R:
+        if deadline is None:
+            return await awaitable
+        return await deadline.run(awaitable, what="LLM call")
+    
+    async def _create(
+        self,
+        priority: Priority,
+        deadline: Deadline | None,
+        route: str,
+        model: str,
+        **request,
+    ):
+        """Run one chat completion under the breaker, dispatcher and deadline."""
+        self.breaker.check()
+        
+        async def call():
+            async with self.dispatcher.slot(priority):
+                started = time.monotonic()
+                async with self.breaker.call():
+                    response = await self.client.chat.completions.create(
+                        model=model,
+                        **request,
+                    )
+                self.router.record_latency(route, model, time.monotonic() - started)
+                return response
+        
+        with self._track():
+            return await self._within(deadline, call())
+    
+    async def _stream(
+        self,
+        priority: Priority,
+        deadline: Deadline | None,
+        route: str,
+        model: str,
+        **request,
+    ) -> AsyncIterator[str]:
+        """
+        Stream one chat completion's text deltas.
+        
+        The dispatcher slot is held until the stream is exhausted or
+        closed; the deadline bounds queueing and every chunk wait. The
+        breaker sees the time to the first response only.
+        """
+        self.breaker.check()
+        with self._track():
+            async with AsyncExitStack() as stack:
+                await self._within(deadline, stack.enter_async_context(self.dispatcher.slot(priority)))
+                started = time.monotonic()
+                async with self.breaker.call():
+                    stream = await self._within(deadline, self.client.chat.completions.create(
+                        model=model,
+                        stream=True,
+                        **request,
+                    ))
+                stack.push_async_callback(stream.close)
+                chunks = stream.__aiter__()
+                while True:
+                    try:
+                        chunk = await self._within(deadline, chunks.__anext__())
+                    except StopAsyncIteration:
+                        break
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+                self.router.record_latency(route, model, time.monotonic() - started)
     
     async def extract_structured(
         self,
         system_prompt: str,
         user_content: str,
         response_model: Type[T],
+        priority: Priority = Priority.BACKGROUND,
+        deadline: Deadline | None = None,
+        route: str = "default",
+        complexity: Complexity | None = None,
     ) -> T:
         """
         Extract structured data using Groq's JSON object mode.
@@ -42,26 +211,150 @@ class GroqClient:
             system_prompt: Instructions for the extraction task
             user_content: The content to extract from
             response_model: Pydantic model to validate response
-            
+            priority: Scheduling class (extraction is background by default)
+            deadline: Cancel the call if it has not finished by then
+            route: Call type used to pick the model (e.g. "facts")
+            complexity: Input size and signal; estimated from
+                `user_content` when omitted
+        
         Returns:
-            Validated Pydantic model instance
+            Validated Pydantic model instance. Output from a small model
+            that fails validation is retried on the route's large model;
+            otherwise malformed output is repaired locally and only items
+            that cannot be repaired are dropped.
         """
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_content}
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.3,  # Lower temperature for consistent extraction
-        )
+        model = self.router.choose(route, complexity or Complexity.of(user_content))
+        while True:
+            response = await self._create(
+                priority,
+                deadline,
+                route,
+                model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_content}
+                ],
+                response_format={"type": "json_object"},
+                temperature=0.3,  # Lower temperature for consistent extraction
+            )
+            
+            content = response.choices[0].message.content
+            try:
+                if not content:
+                    raise ValueError("Empty response from Groq API")
+                # Fast path: parse and validate in a single pass (no intermediate dict)
+                result = response_model.model_validate_json(content)
+                self.router.record_validation(route, model, "valid")
+                return result
+            except ValueError:  # includes ValidationError
+                fallback = self.router.fallback_model(route, model)
+                if fallback is not None or not content:
+                    self.router.record_validation(route, model, "invalid")
+                    if fallback is None:
+                        raise
+                    model = fallback
+                    continue
+            
+            # Keep the valid items we already paid for instead of re-calling
+            try:
+                result = validate_with_repair(content, response_model)
+            except ValueError:
+                self.router.record_validation(route, model, "invalid")
+                raise
+            self.router.record_validation(route, model, "repaired")
+            return result
+    
+    async def stream_structured(
+        self,
+        system_prompt: str,
+        user_content: str,
+        response_model: Type[BaseModel],
+        priority: Priority = Priority.BACKGROUND,
+        deadline: Deadline | None = None,
+        route: str = "default",
+        complexity: Complexity | None = None,
+    ) -> AsyncIterator[BaseModel]:
+        """
+        Stream structured extraction, yielding items as they complete.
+        
+        `response_model` is a list wrapper such as PreferenceList; each
+        element of its list field is validated (and repaired if needed)
+        and yielded as soon as its JSON object closes in the stream.
         
-        content = response.choices[0].message.content
-        if not content:
-            raise ValueError("Empty response from Groq API")
+        A small-model stream that fails validation before yielding any
+        item is restarted on the route's large model; once items have
+        been yielded the stream is never restarted.
         
-        parsed = json.loads(content)
-        return response_model.model_validate(parsed)
+        Args:
+            system_prompt: Instructions for the extraction task
+            user_content: The content to extract from
+            response_model: Wrapper model with exactly one list-of-model field
+            priority: Scheduling class (extraction is background by default)
+            deadline: Cancel the stream if it has not finished by then
+            route: Call type used to pick the model (e.g. "facts")
+            complexity: Input size and signal; estimated from
+                `user_content` when omitted
+        
+        Yields:
+            Validated item models (e.g. Preference) in completion order
+        """
+        (key, field), = response_model.model_fields.items()
+        item_model = list_item_model(field.annotation)
+        model = self.router.choose(route, complexity or Complexity.of(user_content))
+        
+        while True:
+            parser = IncrementalItemParser(key)
+            repairs: list[str] = []
+            text: list[str] = []
+            yielded = 0
+            error: ValueError | None = None
+            
+            try:
+                async for delta in self._stream(
+                    priority,
+                    deadline,
+                    route,
+                    model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_content}
+                    ],
+                    response_format={"type": "json_object"},
+                    temperature=0.3,
+                ):
+                    text.append(delta)
+                    for raw in parser.feed(delta):
+                        try:
+                            item = item_model.model_validate_json(raw)
+                        except ValidationError:
+                            if (item := repair_item(_loads_or_none(raw), item_model, repairs)) is None:
+                                continue
+                        yielded += 1
+                        yield item
+                
+                if not parser.found_array and "".join(text).strip():
+                    # Unexpected shape (no "<key>": [...] array): fall back to whole-document repair
+                    try:
+                        items = getattr(validate_with_repair("".join(text), response_model), key)
+                    except ValueError as e:
+                        error = e
+                        items = []
+                    for item in items:
+                        yielded += 1
+                        yield item
+            finally:
+                count_repairs(repairs, response_model)
+            
+            if error is None and (yielded or "dropped_item" not in repairs):
+                self.router.record_validation(route, model, "repaired" if repairs else "valid")
+                return
+            self.router.record_validation(route, model, "invalid")
+            fallback = None if yielded else self.router.fallback_model(route, model)
+            if fallback is None:
+                if error is not None:
+                    raise error
+                return
+            model = fallback
     
     async def generate_response(
         self,
@@ -69,6 +362,9 @@ class GroqClient:
         user_message: str,
         temperature: float = 0.7,
         max_tokens: int = 500,
+        priority: Priority = Priority.INTERACTIVE,
+        deadline: Deadline | None = None,
+        route: str = "default",
     ) -> str:
         """
         Generate a natural language response.
@@ -78,18 +374,68 @@ class GroqClient:
             user_message: The user's query
             temperature: Creativity level (0.0-1.0)
             max_tokens: Maximum response length
-            
+            priority: Scheduling class (a user is waiting by default)
+            deadline: Cancel the call if it has not finished by then
+            route: Call type used to pick the model (e.g. "generic")
+        
         Returns:
             Generated response text
         """
-        response = self.client.chat.completions.create(
-            model=self.model,
+        generation = await self.generate(
+            system_prompt,
+            user_message,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            priority=priority,
+            deadline=deadline,
+            route=route,
+        )
+        return generation.text
+    
+    async def generate(
+        self,
+        system_prompt: str,
+        user_message: str,
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        stop: tuple[str, ...] = (),
+        priority: Priority = Priority.INTERACTIVE,
+        deadline: Deadline | None = None,
+        route: str = "default",
+    ) -> Generation:
+        """
+        Generate a response and report how it ended.
+        
+        Same as generate_response, plus `stop` sequences that end the
+        reply early; returns the completion token count and finish reason
+        along with the text.
+        """
+        request = {"stop": list(stop)} if stop else {}
+        response = await self._create(
+            priority,
+            deadline,
+            route,
+            self.router.choose(route, Complexity.of(user_message)),
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_message}
             ],
             temperature=temperature,
             max_tokens=max_tokens,
+            **request,
         )
-        
-        return response.choices[0].message.content or ""
+        choice = response.choices[0]
+        usage = getattr(response, "usage", None)
+        return Generation(
+            text=choice.message.content or "",
+            completion_tokens=getattr(usage, "completion_tokens", None),
+            finish_reason=getattr(choice, "finish_reason", None),
+        )
+
+
+def _loads_or_none(raw: str):
+    """Decode one streamed item, or None if it is not valid JSON."""
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return None
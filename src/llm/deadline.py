@@ -0,0 +1,64 @@
+"""
+Per-request deadlines.
+A Deadline is created at the API edge and passed down through the
+orchestrator and personality engine into every GroqClient call.
+"""
+import asyncio
+import time
+from typing import Awaitable, TypeVar
+
+R = TypeVar("R")
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when work is abandoned because its request deadline passed."""
+
+
+class Deadline:
+    """
+    An absolute point in time (monotonic clock) by which work must finish.
+    
+    Deadlines are immutable and cheap to pass around; child work simply
+    shares the parent's deadline.
+    """
+    
+    def __init__(self, expires_at: float):
+        self.expires_at = expires_at
+    
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        """Deadline `seconds` from now."""
+        return cls(time.monotonic() + seconds)
+    
+    def remaining(self) -> float:
+        """Seconds left before expiry (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+    
+    def earliest(self, other: "Deadline | None") -> "Deadline":
+        """Whichever of this deadline and `other` expires first."""
+        if other is None or self.expires_at <= other.expires_at:
+            return self
+        return other
+    
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+    
+    async def run(self, awaitable: Awaitable[R], what: str = "operation") -> R:
+        """
+        Await `awaitable`, cancelling it if the deadline passes first.
+        
+        Raises:
+            DeadlineExceeded: If the deadline expired before completion
+        """
+        if self.expired:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise DeadlineExceeded(f"{what} skipped: deadline already passed")
+        try:
+            return await asyncio.wait_for(awaitable, timeout=self.remaining())
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"{what} did not finish before the deadline") from None
+    
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f}s)"
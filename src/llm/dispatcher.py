@@ -0,0 +1,154 @@
+"""
+Priority-aware dispatcher for LLM calls.
+Interactive generation is admitted ahead of queued background extraction.
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import AsyncIterator
+
+from src.observability.metrics import METRICS, MetricsRegistry
+
+
+class Priority(str, Enum):
+    """Scheduling class of an LLM call."""
+    INTERACTIVE = "interactive"  # /api/respond, /api/compare - a user is waiting
+    BACKGROUND = "background"    # memory extraction - can absorb queueing delay
+
+
+@dataclass
+class _Waiter:
+    priority: Priority
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class LLMDispatcher:
+    """
+    Admission control for the shared Groq quota.
+    
+    All calls share `max_concurrency` slots. Queued interactive calls are
+    always admitted before queued background calls, and background calls
+    may never occupy the last `reserved_interactive` slots, so a burst of
+    extraction cannot lock chat replies out.
+    
+    Starvation protection: a background call that has been queued for
+    longer than `starvation_timeout` seconds is admitted ahead of
+    interactive calls and may use a reserved slot.
+    """
+    
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        reserved_interactive: int = 2,
+        starvation_timeout: float = 5.0,
+        metrics: MetricsRegistry = METRICS,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if not 0 <= reserved_interactive < max_concurrency:
+            raise ValueError("reserved_interactive must be in [0, max_concurrency)")
+        
+        self.max_concurrency = max_concurrency
+        self.reserved_interactive = reserved_interactive
+        self.starvation_timeout = starvation_timeout
+        self.metrics = metrics
+        
+        self._queues: dict[Priority, deque[_Waiter]] = {p: deque() for p in Priority}
+        self._in_flight: dict[Priority, int] = {p: 0 for p in Priority}
+    
+    @property
+    def in_flight(self) -> int:
+        """Number of calls currently holding a slot."""
+        return sum(self._in_flight.values())
+    
+    def queue_depth(self, priority: Priority) -> int:
+        return sum(1 for w in self._queues[priority] if not w.future.done())
+    
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.INTERACTIVE) -> AsyncIterator[None]:
+        """Hold one concurrency slot for the duration of an LLM call."""
+        await self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release(priority)
+    
+    async def _acquire(self, priority: Priority) -> None:
+        waiter = _Waiter(priority, asyncio.get_running_loop().create_future())
+        self._queues[priority].append(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted and cancelled in the same tick: hand the slot back
+                self._release(priority)
+            else:
+                self._discard(waiter)
+            raise
+        
+        self.metrics.observe(
+            "llm.queue_time_seconds",
+            time.monotonic() - waiter.enqueued_at,
+            priority=priority.value,
+        )
+    
+    def _release(self, priority: Priority) -> None:
+        self._in_flight[priority] -= 1
+        self._dispatch()
+    
+    def _discard(self, waiter: _Waiter) -> None:
+        try:
+            self._queues[waiter.priority].remove(waiter)
+        except ValueError:
+            pass
+        self._report()
+    
+    def _next_waiter(self) -> _Waiter | None:
+        """Pick the next waiter to admit, or None if nobody may run yet."""
+        interactive = self._queues[Priority.INTERACTIVE]
+        background = self._queues[Priority.BACKGROUND]
+        for queue in (interactive, background):
+            while queue and queue[0].future.done():
+                queue.popleft()  # cancelled while queued
+        
+        if background and time.monotonic() - background[0].enqueued_at >= self.starvation_timeout:
+            self.metrics.inc("llm.starvation_promotions")
+            return background.popleft()
+        if interactive:
+            return interactive.popleft()
+        background_limit = self.max_concurrency - self.reserved_interactive
+        if background and self.in_flight < background_limit:
+            return background.popleft()
+        return None
+    
+    def _dispatch(self) -> None:
+        while self.in_flight < self.max_concurrency:
+            waiter = self._next_waiter()
+            if waiter is None:
+                break
+            self._in_flight[waiter.priority] += 1
+            waiter.future.set_result(None)
+        self._report()
+    
+    def _report(self) -> None:
+        for priority in Priority:
+            self.metrics.set_gauge("llm.in_flight", self._in_flight[priority], priority=priority.value)
+            self.metrics.set_gauge("llm.queue_depth", self.queue_depth(priority), priority=priority.value)
+    
+    def stats(self) -> dict[str, dict]:
+        """Per-priority queue depth, in-flight count and queue-time distribution."""
+        return {
+            priority.value: {
+                "in_flight": self._in_flight[priority],
+                "queued": self.queue_depth(priority),
+                "queue_time_seconds": self.metrics.histogram(
+                    "llm.queue_time_seconds", priority=priority.value
+                ),
+            }
+            for priority in Priority
+        }
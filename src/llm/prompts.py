@@ -209,3 +209,6 @@ GENERIC_RESPONSE_PROMPT = """You are a helpful AI assistant responding to a user
 Provide a friendly, helpful response to their message.
 Keep your response natural and conversational.
 Do not reference any prior context or memory about the user."""
+
+# Served instead of the generic response while the LLM provider is unavailable
+GENERIC_FALLBACK_RESPONSE = "Sorry, I can't reply right now. Please try again in a moment."
@@ -0,0 +1,259 @@
+"""
+Tolerant validation for LLM extraction output.
+
+When the strict single-pass parse fails, the completion is repaired
+locally instead of discarding the whole extractor's result:
+- markdown code fences and trailing commas are stripped
+- truncated JSON is cut back to the last complete item and closed
+- recoverable fields are clamped or coerced (confidence 1.2 -> 1.0,
+  "Interest" -> "interests", "0, 2" -> [0, 2])
+- items that still fail validation are dropped individually
+
+Every repair is counted in METRICS under `llm.repairs{kind=...}`.
+"""
+import difflib
+import json
+import re
+from typing import Any, Literal, Type, TypeVar, get_args, get_origin
+from pydantic import BaseModel, ValidationError
+from src.observability.metrics import METRICS, MetricsRegistry
+
+T = TypeVar("T", bound=BaseModel)
+M = TypeVar("M", bound=BaseModel)
+
+_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+_INT = re.compile(r"-?\d+")
+_CLOSERS = {"{": "}", "[": "]"}
+# A Literal value this short can't be told apart from junk by prefix
+_MIN_LITERAL_PREFIX = 3
+
+
+def repair_json(text: str) -> tuple[str, list[str]]:
+    """
+    Make a best-effort syntactically valid JSON document out of `text`.
+    
+    Returns:
+        (repaired text, list of repair kinds applied)
+    """
+    repairs = []
+    stripped = _FENCE.sub("", text)
+    if stripped != text:
+        repairs.append("code_fence")
+    
+    start = min((i for i in (stripped.find("{"), stripped.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        return stripped, repairs
+    if stripped[:start].strip():
+        repairs.append("leading_text")
+    
+    out: list[str] = []
+    stack: list[str] = []
+    # Positions in `out` where the document can be cut and closed cleanly
+    cut_points: list[tuple[int, tuple[str, ...]]] = []
+    in_string = escaped = False
+    
+    for ch in stripped[start:]:
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        
+        if ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(ch)
+        elif ch in "}]":
+            if not stack:
+                break  # trailing garbage after the document
+            # Trailing comma before a closer: {"a": 1,}
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+                repairs.append("trailing_comma")
+            stack.pop()
+            out.append(ch)
+            cut_points.append((len(out), tuple(stack)))
+            if not stack:
+                break
+            continue
+        elif ch == ",":
+            cut_points.append((len(out), tuple(stack)))
+        out.append(ch)
+    
+    if stack:
+        repairs.append("truncated")
+        if cut_points:
+            position, open_brackets = cut_points[-1]
+            del out[position:]
+        else:
+            open_brackets = tuple(stack[:1])
+            del out[1:]
+        out.extend(_CLOSERS[b] for b in reversed(open_brackets))
+    
+    return "".join(out), repairs
+
+
+def list_item_model(annotation: Any) -> Type[BaseModel] | None:
+    """Return X for annotations of the form list[X] where X is a model."""
+    if get_origin(annotation) is list:
+        (item,) = get_args(annotation) or (None,)
+        if isinstance(item, type) and issubclass(item, BaseModel):
+            return item
+    return None
+
+
+def _bounds(field) -> tuple[float | None, float | None]:
+    low = high = None
+    for constraint in field.metadata:
+        low = getattr(constraint, "ge", low)
+        high = getattr(constraint, "le", high)
+    return low, high
+
+
+def _match_literal(value: str, choices: list[str]) -> str | None:
+    """
+    The one choice `value` plausibly means ("Interest" -> "interests"), or
+    None if it is too short or ambiguous to say.
+    """
+    normalized = value.strip().lower().replace(" ", "_")
+    if normalized in choices:
+        return normalized
+    if len(normalized) < _MIN_LITERAL_PREFIX:
+        return None
+    prefixed = [c for c in choices if c.startswith(normalized) or normalized.startswith(c)]
+    if prefixed:
+        return prefixed[0] if len(prefixed) == 1 else None
+    return next(iter(difflib.get_close_matches(normalized, choices, n=1, cutoff=0.75)), None)
+
+
+def _coerce_item(item: dict, model: Type[BaseModel], repairs: list[str]) -> dict:
+    """Clamp and coerce recoverable fields of one raw item in place."""
+    for name, field in model.model_fields.items():
+        if name not in item:
+            continue
+        value = item[name]
+        annotation = field.annotation
+        
+        if annotation is float:
+            if isinstance(value, str) and value.strip().endswith("%"):
+                try:
+                    value = float(value.strip().rstrip("%")) / 100
+                    repairs.append("coerced_percent")
+                except ValueError:
+                    pass
+            low, high = _bounds(field)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                clamped = value
+                if low is not None and clamped < low:
+                    clamped = low
+                if high is not None and clamped > high:
+                    clamped = high
+                if clamped != value:
+                    repairs.append("clamped")
+                value = clamped
+        
+        elif get_origin(annotation) is Literal and isinstance(value, str):
+            choices = [str(c) for c in get_args(annotation)]
+            if value not in choices:
+                match = _match_literal(value, choices)
+                if match is not None:
+                    value = match
+                    repairs.append("coerced_literal")
+        
+        elif get_origin(annotation) is list:
+            (inner,) = get_args(annotation) or (None,)
+            if inner is int and isinstance(value, str):
+                value = [int(n) for n in _INT.findall(value)]
+                repairs.append("coerced_list")
+            elif not isinstance(value, list) and value is not None:
+                value = [value]
+                repairs.append("wrapped_list")
+        
+        item[name] = value
+    return item
+
+
+def repair_item(raw: Any, item_model: Type[M], repairs: list[str]) -> M | None:
+    """
+    Validate one raw extracted item, coercing recoverable fields.
+    
+    Returns:
+        The validated item, or None (recorded as "dropped_item") if it
+        cannot be repaired
+    """
+    if not isinstance(raw, dict):
+        repairs.append("dropped_item")
+        return None
+    try:
+        return item_model.model_validate(_coerce_item(dict(raw), item_model, repairs))
+    except ValidationError:
+        repairs.append("dropped_item")
+        return None
+
+
+def count_repairs(repairs: list[str], model: Type[BaseModel], metrics: MetricsRegistry = METRICS) -> None:
+    """Record each applied repair under llm.repairs{kind,model}."""
+    for kind in repairs:
+        metrics.inc("llm.repairs", kind=kind, model=model.__name__)
+
+
+def validate_with_repair(
+    content: str,
+    response_model: Type[T],
+    metrics: MetricsRegistry = METRICS,
+) -> T:
+    """
+    Validate `content` against `response_model`, repairing what can be repaired.
+    
+    Only list-of-model fields are validated item by item; an invalid item
+    is dropped without affecting its siblings.
+    
+    Raises:
+        ValueError: If nothing usable can be recovered from the content
+    """
+    repairs: list[str] = []
+    text, syntax_repairs = repair_json(content)
+    repairs.extend(syntax_repairs)
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        metrics.inc("llm.repair_failures", model=response_model.__name__)
+        raise ValueError(f"Unrepairable JSON from LLM: {e}") from e
+    
+    list_fields = {
+        name: item_model
+        for name, field in response_model.model_fields.items()
+        if (item_model := list_item_model(field.annotation)) is not None
+    }
+    if isinstance(data, list) and len(list_fields) == 1:
+        # Bare array instead of {"facts": [...]}
+        data = {next(iter(list_fields)): data}
+        repairs.append("wrapped_root")
+    if not isinstance(data, dict):
+        metrics.inc("llm.repair_failures", model=response_model.__name__)
+        raise ValueError(f"Expected a JSON object from LLM, got {type(data).__name__}")
+    
+    for name, item_model in list_fields.items():
+        raw_items = data.get(name)
+        if raw_items is None:
+            continue
+        if not isinstance(raw_items, list):
+            raw_items = [raw_items]
+            repairs.append("wrapped_list")
+        items = (repair_item(raw, item_model, repairs) for raw in raw_items)
+        data[name] = [item for item in items if item is not None]
+    
+    try:
+        result = response_model.model_validate(data)
+    except ValidationError:
+        metrics.inc("llm.repair_failures", model=response_model.__name__)
+        raise
+    
+    count_repairs(repairs, response_model, metrics)
+    return result
@@ -0,0 +1,121 @@
+"""
+Model routing for LLM calls.
+Each call type (route) picks between a small, fast model and the large
+model based on the size and signal density of its input. Structured
+output from the small model that fails validation is retried on the
+large model.
+"""
+import json
+import os
+from dataclasses import dataclass, replace
+from src.llm.tokens import estimate_tokens
+from src.observability.metrics import METRICS, MetricsRegistry
+
+SMALL_MODEL = os.getenv("LLM_SMALL_MODEL", "llama-3.1-8b-instant")
+LARGE_MODEL = os.getenv("LLM_LARGE_MODEL", "llama-3.3-70b-versatile")
+
+
+@dataclass(frozen=True)
+class Complexity:
+    """How demanding one call's input is."""
+    tokens: int
+    signal: float = 0.0  # summed pre-filter scores: roughly how many messages carry information
+    
+    @classmethod
+    def of(cls, text: str) -> "Complexity":
+        """Size-only estimate for calls without pre-filter scores."""
+        return cls(tokens=estimate_tokens(text))
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """Model choice for one call type."""
+    model: str = LARGE_MODEL
+    small_model: str | None = SMALL_MODEL  # None: always use `model`
+    max_small_tokens: int = 1500  # larger inputs go to `model`
+    max_small_signal: float = 10.0  # inputs with more signal go to `model`
+    fallback: bool = True  # retry on `model` when small-model output fails validation
+
+
+# Emotional patterns and persona replies need the large model's nuance;
+# preferences, facts and the generic baseline are fine on the small one
+# for short inputs.
+ROUTES: dict[str, ModelRoute] = {
+    "preferences": ModelRoute(max_small_signal=6.0),
+    "facts": ModelRoute(max_small_tokens=2000),
+    "emotional_patterns": ModelRoute(small_model=None),
+    "generic": ModelRoute(max_small_tokens=300),
+    "personality": ModelRoute(small_model=None),
+}
+DEFAULT_ROUTE = ModelRoute(small_model=None)
+
+
+def load_overrides(raw: str | None) -> dict[str, dict]:
+    """
+    Parse per-route overrides, e.g. '{"facts": {"small_model": null}}'.
+    
+    Raises:
+        ValueError: If `raw` is not a JSON object of objects
+    """
+    if not raw:
+        return {}
+    overrides = json.loads(raw)
+    if not isinstance(overrides, dict) or not all(isinstance(v, dict) for v in overrides.values()):
+        raise ValueError("LLM_ROUTE_OVERRIDES must map route names to objects")
+    return overrides
+
+
+class ModelRouter:
+    """
+    Picks the model for each call and records per-model outcomes.
+    
+    A call goes to the route's small model when its input is at most
+    `max_small_tokens` and its signal at most `max_small_signal`;
+    everything else, and every route without a small model, uses the
+    large model.
+    """
+    
+    def __init__(
+        self,
+        routes: dict[str, ModelRoute] | None = None,
+        overrides: dict[str, dict] | None = None,
+        metrics: MetricsRegistry = METRICS,
+    ):
+        self.routes = dict(ROUTES if routes is None else routes)
+        if overrides is None:
+            overrides = load_overrides(os.getenv("LLM_ROUTE_OVERRIDES"))
+        for name, fields in overrides.items():
+            self.routes[name] = replace(self.routes.get(name, DEFAULT_ROUTE), **fields)
+        self.metrics = metrics
+    
+    def route(self, name: str) -> ModelRoute:
+        return self.routes.get(name, DEFAULT_ROUTE)
+    
+    def choose(self, name: str, complexity: Complexity) -> str:
+        """Model for one call on route `name`."""
+        route = self.route(name)
+        if (
+            route.small_model
+            and complexity.tokens <= route.max_small_tokens
+            and complexity.signal <= route.max_small_signal
+        ):
+            model = route.small_model
+        else:
+            model = route.model
+        self.metrics.inc("llm.routed", route=name, model=model)
+        return model
+    
+    def fallback_model(self, name: str, model: str) -> str | None:
+        """Model to retry on after `model` produced invalid output, if any."""
+        route = self.route(name)
+        if route.fallback and model != route.model:
+            self.metrics.inc("llm.fallbacks", route=name, model=model)
+            return route.model
+        return None
+    
+    def record_latency(self, name: str, model: str, seconds: float) -> None:
+        self.metrics.observe("llm.latency_seconds", seconds, route=name, model=model)
+    
+    def record_validation(self, name: str, model: str, outcome: str) -> None:
+        """Count one structured output as "valid", "repaired" or "invalid"."""
+        self.metrics.inc("llm.validation", route=name, model=model, outcome=outcome)
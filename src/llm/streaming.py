@@ -0,0 +1,77 @@
+"""
+Incremental JSON parsing for streamed extraction output.
+Emits each element of the extraction array as soon as its object closes,
+long before the completion's closing bracket arrives.
+"""
+import json
+
+
+class IncrementalItemParser:
+    """
+    Scan a streamed JSON document of the form {"<key>": [{...}, {...}]}
+    (or a bare top-level array) and return each array element's raw
+    text as soon as it is complete.
+    
+    Only brackets and string state are tracked, so feeding is O(n) in
+    the completion length and never re-parses earlier chunks.
+    """
+    
+    def __init__(self, key: str):
+        self.key = key
+        self.found_array = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_chars: list[str] | None = None  # top-level object keys
+        self._last_string: str | None = None
+        self._current_key: str | None = None
+        self._target_depth: int | None = None  # depth inside the target array
+        self._item_chars: list[str] | None = None
+    
+    def feed(self, chunk: str) -> list[str]:
+        """Consume a chunk and return the raw text of every item it completed."""
+        completed = []
+        for ch in chunk:
+            if self._item_chars is not None:
+                self._item_chars.append(ch)
+            
+            if self._in_string:
+                if self._string_chars is not None:
+                    self._string_chars.append(ch)
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._string_chars is not None:
+                        try:
+                            self._last_string = json.loads("".join(self._string_chars))
+                        except json.JSONDecodeError:
+                            self._last_string = None  # malformed escape: matches no key
+                        self._string_chars = None
+                continue
+            
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._target_depth is None:
+                    self._string_chars = [ch]
+            elif ch == ":" and self._depth == 1:
+                self._current_key = self._last_string
+            elif ch in "{[":
+                self._depth += 1
+                if ch == "[" and self._target_depth is None and (
+                    self._depth == 1 or (self._depth == 2 and self._current_key == self.key)
+                ):
+                    self._target_depth = self._depth
+                    self.found_array = True
+                elif ch == "{" and self._depth == (self._target_depth or -1) + 1 and self._item_chars is None:
+                    self._item_chars = [ch]
+            elif ch in "}]":
+                if self._item_chars is not None and self._depth == self._target_depth + 1:
+                    completed.append("".join(self._item_chars))
+                    self._item_chars = None
+                if self._depth == self._target_depth:
+                    self._target_depth = -1  # target array closed; ignore the rest
+                self._depth -= 1
+        return completed
@@ -0,0 +1,16 @@
+"""
+Token estimation shared by extraction compaction and model routing.
+"""
+import math
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate without a tokenizer.
+    
+    About 4 characters per token for ASCII text; non-ASCII characters
+    (Devanagari, CJK, emoji) are counted as one token each, which is
+    close to how BPE vocabularies split them.
+    """
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return math.ceil((len(text) - non_ascii) / 4) + non_ascii
@@ -0,0 +1,14 @@
+"""
+Cached Pydantic TypeAdapters.
+Building an adapter compiles a validator/serializer, so each type is
+compiled once per process and reused on every request.
+"""
+from functools import lru_cache
+from typing import Any
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def type_adapter(annotation: Any) -> TypeAdapter:
+    """Return the process-wide TypeAdapter for `annotation`."""
+    return TypeAdapter(annotation)
@@ -67,3 +67,15 @@ class UserMemory(BaseModel):
     extracted_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     message_count: int = 0
     extraction_errors: list[str] = Field(default_factory=list)
+
+
+class MemoryStreamEvent(BaseModel):
+    """One incremental update from streaming memory extraction."""
+    type: Literal["item", "error", "done"]
+    section: Literal["preferences", "emotional_patterns", "facts"] | None = None
+    item: Preference | EmotionalPattern | Fact | None = None
+    error: str | None = None
+    memory: UserMemory | None = Field(
+        default=None,
+        description="Complete memory, sent once on the final 'done' event"
+    )
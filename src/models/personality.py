@@ -1,10 +1,40 @@
 """
 Pydantic models for personality profiles and response generation.
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Literal
 
 
+QueryKind = Literal["greeting", "question", "venting", "statement"]
+
+
+class OutputPolicy(BaseModel):
+    """How long a profile's replies may get, adapted to each query."""
+    base_tokens: int = Field(default=250, ge=1, description="Reply budget for a short statement")
+    tokens_per_query_token: float = Field(
+        default=1.0,
+        ge=0.0,
+        description="Extra budget per token of the user's message: long messages get room for long replies"
+    )
+    kind_scale: dict[QueryKind, float] = Field(
+        default_factory=lambda: {"greeting": 0.4, "question": 1.0, "venting": 1.3, "statement": 1.0},
+        description="Budget multiplier per query kind; kinds left out use 1.0"
+    )
+    min_tokens: int = Field(default=48, ge=1)
+    max_tokens: int = Field(default=500, ge=1, le=4096)
+    stop: list[str] = Field(
+        default_factory=lambda: ["\nUser:"],
+        max_length=4,
+        description="Stop sequences that end generation early (the API accepts up to 4)"
+    )
+    
+    @model_validator(mode="after")
+    def check_bounds(self) -> "OutputPolicy":
+        if self.min_tokens > self.max_tokens:
+            raise ValueError("min_tokens must not exceed max_tokens")
+        return self
+
+
 class PersonalityProfile(BaseModel):
     """Configuration for a personality type."""
     id: str
@@ -15,6 +45,11 @@ class PersonalityProfile(BaseModel):
     formality_level: int = Field(default=5, ge=1, le=10)
     humor_level: int = Field(default=5, ge=1, le=10)
     empathy_level: int = Field(default=5, ge=1, le=10)
+    fallback_response: str = Field(
+        default="Sorry, I can't reply properly right now. Please try again in a moment.",
+        description="Canned reply served while the LLM provider is unavailable"
+    )
+    output: OutputPolicy = Field(default_factory=OutputPolicy)
 
 
 class PersonalityResponse(BaseModel):
@@ -22,6 +57,27 @@ class PersonalityResponse(BaseModel):
     personality_id: str
     personality_name: str
     response: str
+    degraded: bool = Field(
+        default=False,
+        description="True if this is the profile's canned fallback, not a generated reply"
+    )
+    cached: bool = Field(
+        default=False,
+        description="True if this reply was generated earlier for an equivalent request"
+    )
+
+
+class ComparisonEvent(BaseModel):
+    """One result from a streamed comparison, sent as soon as it is ready."""
+    type: Literal["generic", "personality", "error", "done"]
+    personality_id: str | None = None
+    response: PersonalityResponse | None = None
+    generic: str | None = None
+    error: str | None = None
+    elapsed_ms: float | None = Field(
+        default=None,
+        description="Time from the start of the comparison until this result"
+    )
 
 
 class ComparisonResult(BaseModel):
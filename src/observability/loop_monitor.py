@@ -0,0 +1,150 @@
+"""
+Event loop health monitor.
+A probe task measures scheduling lag (how late a sleep wakes up) into
+the loop.lag_seconds histogram, and a watchdog thread catches callbacks
+that hold the loop longer than a threshold, capturing the offending
+stack while it is still blocking. As an async context manager it raises
+LoopBlocked on exit, so tests can assert that a code path never blocks.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from src.observability.metrics import METRICS, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+# Tunables: probe interval (0 disables the monitor) and how long a single
+# callback may hold the loop before it is reported
+LOOP_MONITOR_INTERVAL = float(os.getenv("LOOP_MONITOR_INTERVAL", "0.1"))
+LOOP_BLOCK_THRESHOLD = float(os.getenv("LOOP_BLOCK_THRESHOLD", "0.1"))
+
+
+@dataclass
+class BlockedCall:
+    """One stretch of time the loop spent in a single callback."""
+    started: float
+    stack: str
+    duration: float | None = None  # Set once the loop runs again
+
+
+class LoopBlocked(AssertionError):
+    """Raised in test mode when code blocked the event loop."""
+    
+    def __init__(self, block: BlockedCall):
+        self.block = block
+        duration = f"{block.duration * 1e3:.0f} ms" if block.duration is not None else "still blocked"
+        super().__init__(f"Event loop blocked ({duration}) at:\n{block.stack}")
+
+
+class LoopMonitor:
+    """
+    Measures event loop lag and reports blocking calls with their stack.
+    
+    Args:
+        interval: Seconds between lag probes
+        threshold: Block length (beyond the probe interval) that is reported
+        keep: Recent blocked calls kept in `blocks`
+    """
+    
+    def __init__(
+        self,
+        interval: float = LOOP_MONITOR_INTERVAL,
+        threshold: float = LOOP_BLOCK_THRESHOLD,
+        keep: int = 20,
+        metrics: MetricsRegistry = METRICS,
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.metrics = metrics
+        self.blocks: deque[BlockedCall] = deque(maxlen=keep)
+        self._lock = threading.Lock()
+        self._beat = time.monotonic()
+        self._current: BlockedCall | None = None
+        self._probe: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopping = threading.Event()
+        self._loop_thread = 0
+    
+    @property
+    def running(self) -> bool:
+        return self._probe is not None
+    
+    def start(self) -> None:
+        """Start probing the running loop (no-op if `interval` is 0)."""
+        if self.interval <= 0 or self._probe is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopping.clear()
+        self._probe = asyncio.create_task(self._run_probe(), name="loop-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+    
+    async def stop(self) -> None:
+        if self._probe is None:
+            return
+        self._stopping.set()
+        self._probe.cancel()
+        try:
+            await self._probe
+        except asyncio.CancelledError:
+            pass
+        self._probe = None
+        self._finish_block(time.monotonic())
+        await asyncio.to_thread(self._watchdog.join)
+        self._watchdog = None
+    
+    async def _run_probe(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.metrics.observe("loop.lag_seconds", max(0.0, now - expected))
+            self._finish_block(now)
+    
+    def _finish_block(self, now: float) -> None:
+        """Runs on the loop: record the length of a block the watchdog caught."""
+        with self._lock:
+            self._beat = now
+            block, self._current = self._current, None
+        if block is not None:
+            block.duration = now - block.started
+            self.metrics.observe("loop.block_seconds", block.duration)
+            logger.warning("Event loop was blocked for %.0f ms", block.duration * 1e3)
+    
+    def _watch(self) -> None:
+        """Watchdog thread: capture the loop thread's stack while it is stuck."""
+        while not self._stopping.wait(self.threshold / 4):
+            with self._lock:
+                stalled = time.monotonic() - self._beat - self.interval
+                if stalled <= self.threshold or self._current is not None:
+                    continue
+                frame = sys._current_frames().get(self._loop_thread)
+                stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+                self._current = BlockedCall(started=self._beat + self.interval, stack=stack)
+                self.blocks.append(self._current)
+            self.metrics.inc("loop.blocked")
+            logger.warning("Event loop blocked for over %.0f ms at:\n%s", stalled * 1e3, stack)
+    
+    def assert_not_blocked(self) -> None:
+        """
+        Raises:
+            LoopBlocked: If any blocking call was caught
+        """
+        if self.blocks:
+            raise LoopBlocked(self.blocks[0])
+    
+    async def __aenter__(self) -> "LoopMonitor":
+        self.start()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.stop()
+        if exc_type is None:
+            self.assert_not_blocked()
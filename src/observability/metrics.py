@@ -0,0 +1,123 @@
+"""
+In-process metrics registry.
+Counters, gauges and latency histograms, exposed as JSON via GET /metrics.
+"""
+import threading
+from collections import deque
+
+
+def _key(name: str, labels: dict[str, object]) -> str:
+    """Render a metric name with sorted labels: name{a=1,b=2}."""
+    if not labels:
+        return name
+    rendered = ",".join(f"{k}={labels[k]}" for k in sorted(labels))
+    return f"{name}{{{rendered}}}"
+
+
+class Histogram:
+    """
+    Streaming histogram with a bounded reservoir for percentile estimates.
+    
+    Count, sum, min and max are exact; percentiles are computed over the
+    most recent `max_samples` observations.
+    """
+    
+    def __init__(self, max_samples: int = 2048):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self._samples: deque[float] = deque(maxlen=max_samples)
+    
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self._samples.append(value)
+    
+    def percentile(self, q: float) -> float:
+        """Nearest-rank percentile, q in [0, 100]."""
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+        return ordered[index]
+    
+    def snapshot(self) -> dict[str, float]:
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of named metrics.
+    
+    Labels are passed as keyword arguments and folded into the metric key,
+    e.g. `METRICS.observe("llm.queue_time_seconds", 0.2, priority="interactive")`.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = {}
+        self._gauges: dict[str, float] = {}
+        self._histograms: dict[str, Histogram] = {}
+    
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+    
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+    
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+    
+    def counter(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(_key(name, labels), 0.0)
+    
+    def gauge(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._gauges.get(_key(name, labels), 0.0)
+    
+    def histogram(self, name: str, **labels) -> dict[str, float]:
+        with self._lock:
+            histogram = self._histograms.get(_key(name, labels))
+            return histogram.snapshot() if histogram else {"count": 0}
+    
+    def snapshot(self) -> dict[str, dict]:
+        """Point-in-time copy of every metric, suitable for JSON output."""
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "histograms": {k: h.snapshot() for k, h in self._histograms.items()},
+            }
+    
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+
+# Process-wide registry (one per worker process)
+METRICS = MetricsRegistry()
@@ -0,0 +1,270 @@
+"""
+On-demand sampling profiler for single API requests.
+ProfilingMiddleware profiles a request when it carries a valid
+X-Profile token or is picked by PROFILE_SAMPLE_RATE, and writes a
+speedscope profile and collapsed stacks (flamegraph.pl, speedscope)
+named after the request ID. The middleware is only installed when one
+of the two triggers is configured, so it costs nothing otherwise.
+"""
+import asyncio
+import hmac
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+from src.observability.metrics import METRICS, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+# Tunables: shared secret for the X-Profile header (unset disables it),
+# share of requests profiled at random, sampling interval, output directory
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.005"))
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "request-profiles"))
+
+PROFILE_HEADER = b"x-profile"
+REQUEST_ID_HEADER = b"x-request-id"
+AWAIT_FRAME = "[await]"
+
+# The profile of the request a task is working for; child tasks inherit it
+_active: ContextVar["RequestProfile | None"] = ContextVar("active_profile", default=None)
+
+
+def _frame_name(code) -> str:
+    filename = code.co_filename
+    for prefix in sys.path:
+        if prefix and filename.startswith(prefix):
+            filename = filename[len(prefix):].lstrip("/\\")
+            break
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+
+
+def _running_stack(frame) -> tuple[str, ...]:
+    """Root-first frame names, without the event loop machinery below the task step."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        # Everything under Handle._run is the loop itself
+        if code.co_name == "_run" and code.co_filename.endswith(os.path.join("asyncio", "events.py")):
+            break
+        names.append(_frame_name(code))
+        frame = frame.f_back
+    return tuple(reversed(names))
+
+
+def _awaiting_stack(task: asyncio.Task) -> tuple[str, ...]:
+    """Root-first chain of coroutines a suspended task is awaiting through."""
+    names = []
+    coro = task.get_coro()
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "ag_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        names.append(_frame_name(frame.f_code))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "ag_await", None) or getattr(coro, "gi_yieldfrom", None)
+    names.append(AWAIT_FRAME)
+    return tuple(names)
+
+
+class RequestProfile:
+    """Samples collected for one request: (stack, seconds) pairs."""
+    
+    def __init__(self, request_id: str, name: str, task: asyncio.Task):
+        self.request_id = request_id
+        self.name = name
+        self.task = task
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.samples: list[tuple[tuple[str, ...], float]] = []
+    
+    def collapsed(self) -> str:
+        """Folded stacks ("a;b;c count"), one per line, for flamegraph.pl."""
+        counts = Counter(stack for stack, _ in self.samples)
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in counts.most_common())
+    
+    def speedscope(self) -> dict:
+        """Sampled profile in speedscope's file format."""
+        frames: dict[str, int] = {}
+        samples = [[frames.setdefault(name, len(frames)) for name in stack] for stack, _ in self.samples]
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "exporter": "guppshupp",
+            "shared": {"frames": [{"name": name} for name in frames]},
+            "profiles": [{
+                "type": "sampled",
+                "name": f"{self.name} ({self.request_id})",
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": self.duration,
+                "samples": samples,
+                "weights": [seconds for _, seconds in self.samples],
+            }],
+        }
+    
+    def save(self, directory: Path) -> Path:
+        """Write <request_id>.speedscope.json and <request_id>.collapsed."""
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{self.request_id}.speedscope.json"
+        path.write_text(json.dumps(self.speedscope()))
+        (directory / f"{self.request_id}.collapsed").write_text(self.collapsed())
+        return path
+
+
+class Sampler:
+    """
+    One background thread sampling the event loop thread for every
+    profiled request in flight.
+    
+    Each tick, if the running task belongs to a profiled request, the
+    loop thread's stack is recorded for it. Profiled requests that are
+    suspended get the chain of coroutines they are awaiting through,
+    ending in an [await] frame, followed into the tasks they spawned, so
+    profiles cover wall time, LLM waits included.
+    """
+    
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._profiles: list[RequestProfile] = []
+        self._thread: threading.Thread | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread = 0
+    
+    def add(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+            self._loop = asyncio.get_running_loop()
+            self._loop_thread = threading.get_ident()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+    
+    def remove(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._profiles.remove(profile)
+    
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while True:
+            time.sleep(self.interval)
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            with self._lock:
+                if not self._profiles:
+                    self._thread = None
+                    return
+                profiles = list(self._profiles)
+                loop, loop_thread = self._loop, self._loop_thread
+            self._sample(profiles, loop, loop_thread, elapsed)
+    
+    @staticmethod
+    def _sample(profiles: list[RequestProfile], loop, loop_thread: int, elapsed: float) -> None:
+        running = asyncio.current_task(loop)
+        owner = running.get_context().get(_active) if running is not None else None
+        frame = sys._current_frames().get(loop_thread)
+        waiting = [p for p in profiles if p is not owner and not p.task.done()]
+        if owner is not None and frame is not None:
+            owner.samples.append((_running_stack(frame), elapsed))
+        if not waiting:
+            return
+        
+        # Tasks a request spawned (extractors, disconnect watchers) inherit its context
+        children: dict[RequestProfile, list[asyncio.Task]] = {p: [] for p in waiting}
+        for task in asyncio.all_tasks(loop):
+            profile = task.get_context().get(_active)
+            if profile in children and task is not profile.task:
+                children[profile].append(task)
+        for profile, tasks in children.items():
+            root = _awaiting_stack(profile.task)
+            if not tasks:
+                profile.samples.append((root, elapsed))
+                continue
+            # Concurrent awaits share the wall time between them
+            for task in tasks:
+                profile.samples.append((root[:-1] + _awaiting_stack(task), elapsed / len(tasks)))
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling requests on demand.
+    
+    A request is profiled if its X-Profile header matches `token`, or at
+    random with probability `sample_rate`. The response carries an
+    X-Profile-Id header naming the files written to `directory`.
+    
+    Args:
+        app: The wrapped ASGI app
+        token: Shared secret for the X-Profile header ("" disables it)
+        sample_rate: Share of requests profiled at random (0-1)
+        directory: Where profiles are written
+        interval: Sampling interval in seconds
+    """
+    
+    def __init__(
+        self,
+        app,
+        token: str = PROFILE_TOKEN,
+        sample_rate: float = PROFILE_SAMPLE_RATE,
+        directory: str | Path = PROFILE_DIR,
+        interval: float = PROFILE_INTERVAL,
+        metrics: MetricsRegistry = METRICS,
+    ):
+        self.app = app
+        self.token = token.encode()
+        self.sample_rate = sample_rate
+        self.directory = Path(directory)
+        self.sampler = Sampler(interval)
+        self.metrics = metrics
+    
+    def _trigger(self, scope) -> str | None:
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    if hmac.compare_digest(value, self.token):
+                        return "header"
+                    self.metrics.inc("profiling.rejected")
+                    break
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+    
+    async def __call__(self, scope, receive, send):
+        trigger = self._trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+        
+        headers = dict(scope["headers"])
+        request_id = headers.get(REQUEST_ID_HEADER, b"").decode("latin-1") or uuid.uuid4().hex
+        # The ID becomes a file name
+        request_id = "".join(c for c in request_id if c.isalnum() or c in "-_")[:64] or uuid.uuid4().hex
+        profile = RequestProfile(request_id, f"{scope['method']} {scope['path']}", asyncio.current_task())
+        
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", request_id.encode())]}
+            await send(message)
+        
+        token = _active.set(profile)
+        self.sampler.add(profile)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            self.sampler.remove(profile)
+            _active.reset(token)
+            profile.duration = time.perf_counter() - profile.started
+            self.metrics.inc("profiling.profiles", trigger=trigger)
+            try:
+                path = await asyncio.to_thread(profile.save, self.directory)
+                logger.info("Profiled %s in %.0f ms: %s", profile.name, profile.duration * 1e3, path)
+            except OSError as e:
+                logger.warning("Profile write failed: %s: %s", type(e).__name__, e)
@@ -0,0 +1,168 @@
+"""
+Opt-in request recording for trace replay.
+TraceRecorder is an ASGI middleware that appends one JSON line per API
+request (arrival time, method, path, replay-relevant headers, body,
+status, duration) to a trace file that benchmarks/replay.py can replay.
+Records are handed to a writer thread, so file I/O never blocks the
+event loop. Bodies contain user messages: only enable it where that is
+acceptable.
+"""
+import asyncio
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from pathlib import Path
+from src.observability.metrics import METRICS, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+# Tunables: trace file (unset disables recording) and share of requests recorded
+TRACE_LOG = os.getenv("TRACE_LOG", "")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+# Tunable: records waiting for the writer thread before new ones are dropped
+TRACE_QUEUE_SIZE = int(os.getenv("TRACE_QUEUE_SIZE", "10000"))
+
+TRACED_PATHS = ("/api/extract", "/api/respond", "/api/compare")
+# Headers that change how a request is served, so replay must send them too
+TRACED_HEADERS = ("accept", "x-request-timeout-ms")
+
+
+def _decode_body(body: bytes):
+    """A request body as JSON when it parses, else as text (None if empty)."""
+    if not body:
+        return None
+    try:
+        return json.loads(body)
+    except ValueError:
+        return body.decode("utf-8", "replace")
+
+
+class TraceRecorder:
+    """
+    ASGI middleware recording TRACED_PATHS requests as JSON lines.
+    
+    Requests only enqueue their record with the raw body; a writer thread
+    started on the first record decodes, serializes and appends them. If the writer falls
+    `queue_size` records behind, new records are dropped and counted in
+    traces.dropped. The file is flushed and closed at lifespan shutdown
+    or by close().
+    
+    Args:
+        app: The wrapped ASGI app
+        path: Trace file, appended to
+        sample_rate: Share of requests recorded (0-1)
+        paths: Path prefixes to record
+        queue_size: Records buffered for the writer thread
+    """
+    
+    def __init__(
+        self,
+        app,
+        path: str | Path = TRACE_LOG,
+        sample_rate: float = TRACE_SAMPLE_RATE,
+        paths: tuple[str, ...] = TRACED_PATHS,
+        queue_size: int = TRACE_QUEUE_SIZE,
+        metrics: MetricsRegistry = METRICS,
+    ):
+        self.app = app
+        self.path = Path(path)
+        self.sample_rate = sample_rate
+        self.paths = paths
+        self.metrics = metrics
+        self._queue: queue.Queue[dict | None] = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._writer: threading.Thread | None = None
+    
+    def _enqueue(self, record: dict) -> None:
+        """Hand a record to the writer thread without blocking."""
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_records, name="trace-writer", daemon=True)
+                self._writer.start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.metrics.inc("traces.dropped")
+    
+    def _write_records(self) -> None:
+        """Writer thread: append queued records until the None sentinel."""
+        file = None
+        try:
+            while (record := self._queue.get()) is not None:
+                try:
+                    if file is None:
+                        file = self.path.open("a", encoding="utf-8", buffering=1)
+                    record["body"] = _decode_body(record["body"])
+                    file.write(json.dumps(record, separators=(",", ":")) + "\n")
+                    self.metrics.inc("traces.recorded")
+                except OSError as e:
+                    self.metrics.inc("traces.write_errors")
+                    logger.warning("Trace write failed: %s: %s", type(e).__name__, e)
+        finally:
+            if file is not None:
+                file.close()
+    
+    def close(self) -> None:
+        """Write every queued record, then close the file (blocks until done)."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+            if writer is None:
+                return
+            self._queue.put(None)
+        writer.join()
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            async def send_and_close(message):
+                if message["type"] == "lifespan.shutdown.complete":
+                    await asyncio.to_thread(self.close)
+                await send(message)
+            
+            await self.app(scope, receive, send_and_close)
+            return
+        if (
+            scope["type"] != "http"
+            or not scope["path"].startswith(self.paths)
+            or random.random() >= self.sample_rate
+        ):
+            await self.app(scope, receive, send)
+            return
+        
+        arrived = time.time()
+        started = time.perf_counter()
+        body = bytearray()
+        status = None
+        
+        async def receive_and_keep():
+            message = await receive()
+            if message["type"] == "http.request":
+                body.extend(message.get("body", b""))
+            return message
+        
+        async def send_and_watch(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive_and_keep, send_and_watch)
+        finally:
+            headers = {
+                k.decode("latin-1"): v.decode("latin-1")
+                for k, v in scope["headers"] if k.decode("latin-1") in TRACED_HEADERS
+            }
+            # Raw bytes: decoding waits for the writer thread
+            self._enqueue({
+                "t": arrived,
+                "method": scope["method"],
+                "path": scope["path"],
+                "headers": headers,
+                "body": bytes(body),
+                "status": status,
+                "duration_ms": (time.perf_counter() - started) * 1e3,
+            })
@@ -1,5 +1,6 @@
 # personality package
 from src.personality.engine import PersonalityEngine
 from src.personality.profiles import PROFILES
+from src.personality.registry import ProfileRegistry, ProfileStore
 
-__all__ = ["PersonalityEngine", "PROFILES"]
+__all__ = ["PersonalityEngine", "PROFILES", "ProfileRegistry", "ProfileStore"]
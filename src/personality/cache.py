@@ -0,0 +1,156 @@
+"""
+Response cache for personality generations.
+Near-identical queries ("hi", "Hi!!") against the same prompt reuse an
+earlier reply instead of calling the LLM. Entries are keyed by the
+normalized query, profile, memory version and temperature bucket, so a
+change to the user's memory or to the profile misses the old entries.
+"""
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import NamedTuple
+from src.observability.metrics import METRICS, MetricsRegistry
+
+# Tunables: keys kept (0 disables the cache), seconds a reply stays valid,
+# replies kept per key before repeats are served, temperature bucket width
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "0"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "600"))
+RESPONSE_CACHE_VARIANTS = int(os.getenv("RESPONSE_CACHE_VARIANTS", "2"))
+RESPONSE_CACHE_TEMPERATURE_STEP = float(os.getenv("RESPONSE_CACHE_TEMPERATURE_STEP", "0.1"))
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_REPEATS = re.compile(r"([^\W\d_])\1{2,}")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Fold a query to its cache form: case, punctuation, emoji, spacing and
+    stretched letters are ignored ("Hiii!! " and "hii" match).
+    """
+    text = unicodedata.normalize("NFKC", query).casefold()
+    text = _PUNCTUATION.sub(" ", text)
+    text = _REPEATS.sub(r"\1\1", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def memory_version(memory_context: str) -> str:
+    """
+    Version of a user's memory as the prompt sees it. Memory changes that
+    don't reach the prompt (e.g. a low-confidence preference) keep it.
+    """
+    return hashlib.sha256(memory_context.encode()).hexdigest()[:16]
+
+
+class CacheKey(NamedTuple):
+    query: str
+    profile: str  # Profile ID and registry version, or "generic"
+    memory_version: str
+    temperature_bucket: int
+
+
+@dataclass
+class _Variant:
+    response: str
+    expires_at: float
+    latency: float  # Seconds the LLM call took; a hit saves this much
+
+
+@dataclass
+class _Entry:
+    variants: list[_Variant] = field(default_factory=list)
+
+
+class ResponseCache:
+    """
+    Bounded LRU of generated replies with TTLs and several variants per key.
+    
+    A key is only served from once `variants` replies have been
+    generated for it, and then a random one is returned, so repeated
+    greetings don't always get the same answer. Hits, misses and LLM time
+    saved are counted in `metrics` under personality.cache.*.
+    
+    Args:
+        size: Keys kept; 0 disables the cache
+        ttl: Seconds a reply may be served after it was generated
+        variants: Replies generated per key before it serves hits
+        temperature_step: Width of the temperature buckets
+    """
+    
+    def __init__(
+        self,
+        size: int = RESPONSE_CACHE_SIZE,
+        ttl: float = RESPONSE_CACHE_TTL,
+        variants: int = RESPONSE_CACHE_VARIANTS,
+        temperature_step: float = RESPONSE_CACHE_TEMPERATURE_STEP,
+        metrics: MetricsRegistry = METRICS,
+    ):
+        self.size = size
+        self.ttl = ttl
+        self.variants = max(1, variants)
+        self.temperature_step = temperature_step
+        self.metrics = metrics
+        self._entries: OrderedDict[CacheKey, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._lookups = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+    
+    def key(self, query: str, profile: str, memory_context: str, temperature: float) -> CacheKey:
+        bucket = round(temperature / self.temperature_step) if self.temperature_step > 0 else 0
+        return CacheKey(normalize_query(query), profile, memory_version(memory_context), bucket)
+    
+    def get(self, key: CacheKey) -> str | None:
+        """A cached reply for `key`, or None if it still needs generating."""
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            variant = None
+            if entry is not None:
+                entry.variants = [v for v in entry.variants if v.expires_at > now]
+                if not entry.variants:
+                    del self._entries[key]
+                else:
+                    self._entries.move_to_end(key)
+                    if len(entry.variants) >= self.variants:
+                        variant = random.choice(entry.variants)
+            self._lookups += 1
+            self._hits += variant is not None
+            hit_rate = self._hits / self._lookups
+        
+        self.metrics.inc("personality.cache", outcome="miss" if variant is None else "hit")
+        self.metrics.set_gauge("personality.cache.hit_rate", hit_rate)
+        if variant is None:
+            return None
+        self.metrics.inc("personality.cache.saved_seconds", variant.latency)
+        return variant.response
+    
+    def put(self, key: CacheKey, response: str, latency: float) -> None:
+        """Store a freshly generated reply as one of the key's variants."""
+        if not self.enabled:
+            return
+        variant = _Variant(response, time.monotonic() + self.ttl, latency)
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry())
+            entry.variants.append(variant)
+            # Oldest variants make way once the key has enough
+            del entry.variants[:-self.variants]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+            self.metrics.set_gauge("personality.cache.entries", len(self._entries))
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
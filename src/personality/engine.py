@@ -3,11 +3,20 @@ Personality Engine.
 Transforms responses based on personality profile and user memory context.
 """
 import asyncio
+import time
+from typing import AsyncIterator
 from src.models.memory import UserMemory
-from src.models.personality import PersonalityProfile, PersonalityResponse
-from src.personality.profiles import PROFILES
+from src.models.personality import ComparisonEvent, OutputPolicy, PersonalityResponse
+from src.personality.cache import ResponseCache
+from src.personality.generic_cache import GenericResponseCache
+from src.personality.output import GENERIC_OUTPUT, output_limits
+from src.personality.registry import ProfileRegistry, ProfileStore
+from src.llm.breaker import CircuitOpen
 from src.llm.client import GroqClient
-from src.llm.prompts import GENERIC_RESPONSE_PROMPT
+from src.llm.tokens import estimate_tokens
+from src.llm.deadline import Deadline, DeadlineExceeded
+from src.llm.prompts import GENERIC_FALLBACK_RESPONSE, GENERIC_RESPONSE_PROMPT
+from src.observability.metrics import METRICS
 
 
 class PersonalityEngine:
@@ -15,12 +24,30 @@ class PersonalityEngine:
     Transforms responses based on personality profile and user memory context.
     
     Key feature: Injects user memory as context to make responses personalized.
+    
+    Profiles come from a hot-reloaded ProfileStore; each request uses the
+    registry that was current when it started.
+    
+    With a ResponseCache enabled, a query equivalent to an earlier one for
+    the same prompt (profile and memory context) reuses that reply. The
+    generic baseline has its own GenericResponseCache, shared by all users
+    and keyed by the query's content words.
     """
     
-    def __init__(self, groq_client: GroqClient):
+    def __init__(
+        self,
+        groq_client: GroqClient,
+        profiles: ProfileStore | None = None,
+        cache: ResponseCache | None = None,
+        generic_cache: GenericResponseCache | None = None,
+    ):
         self.client = groq_client
+        self.profiles = profiles or ProfileStore()
+        self.cache = cache or ResponseCache()
+        self.generic_cache = generic_cache or GenericResponseCache()
     
-    def _build_memory_context(self, memory: UserMemory) -> str:
+    @staticmethod
+    def _build_memory_context(memory: UserMemory) -> str:
         """
         Convert memory to natural language context for prompt injection.
         
@@ -50,11 +77,26 @@ class PersonalityEngine:
         
         return "\n".join(sections) if sections else "No prior context available."
     
+    def preload_profiles(self) -> list[str]:
+        """
+        Profiles available at startup.
+        
+        Every system prompt is already compiled when the ProfileStore
+        loads, so a broken profile surfaces at boot instead of on the
+        first request.
+        
+        Returns:
+            IDs of the loaded profiles
+        """
+        return list(self.profiles.current)
+    
     async def generate_response(
         self,
         query: str,
         memory: UserMemory,
         profile_id: str,
+        deadline: Deadline | None = None,
+        registry: ProfileRegistry | None = None,
     ) -> PersonalityResponse:
         """
         Generate a personalized response using memory and personality.
@@ -63,33 +105,47 @@ class PersonalityEngine:
             query: User's current message
             memory: Extracted user memory
             profile_id: Which personality to use
-            
+            deadline: Optional request deadline passed to the LLM call
+            registry: Profiles to use (the current registry when not
+                given); callers making several calls pass the same one
+        
         Returns:
-            PersonalityResponse with the generated text
+            PersonalityResponse with the generated text, a cached reply
+            to an equivalent request (cached=True), or the profile's
+            fallback_response (degraded=True) while the LLM circuit is open
         """
-        profile = PROFILES.get(profile_id)
-        if not profile:
+        registry = registry if registry is not None else self.profiles.current
+        compiled = registry.get(profile_id)
+        if not compiled:
             raise ValueError(f"Unknown personality profile: {profile_id}")
+        profile = compiled.profile
         
         memory_context = self._build_memory_context(memory)
+        key = self.cache.key(query, f"{profile_id}@{registry.version}", memory_context, profile.temperature)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return PersonalityResponse(
+                personality_id=profile_id,
+                personality_name=profile.name,
+                response=cached,
+                cached=True,
+            )
+        system_prompt = compiled.render(memory_context)
         
-        system_prompt = f"""{profile.system_prompt}
-
-USER CONTEXT (incorporate naturally, don't force it or be creepy about it):
-{memory_context}
-
-STYLE GUIDELINES:
-- Formality Level: {profile.formality_level}/10
-- Humor Level: {profile.humor_level}/10  
-- Empathy Level: {profile.empathy_level}/10
-
-Remember: Use the context to make responses feel personal, but don't explicitly state "I know you like X" - weave it in naturally."""
-        
-        response = await self.client.generate_response(
-            system_prompt=system_prompt,
-            user_message=query,
-            temperature=profile.temperature,
-        )
+        try:
+            response, latency = await self._generate(
+                system_prompt, query, profile.output, profile.temperature, deadline, "personality", profile_id,
+            )
+        except CircuitOpen:
+            # Provider is down: answer in character instead of failing
+            METRICS.inc("personality.degraded", profile=profile_id)
+            return PersonalityResponse(
+                personality_id=profile_id,
+                personality_name=profile.name,
+                response=profile.fallback_response,
+                degraded=True,
+            )
+        self.cache.put(key, response, latency)
         
         return PersonalityResponse(
             personality_id=profile_id,
@@ -97,31 +153,171 @@ Remember: Use the context to make responses feel personal, but don't explicitly
             response=response,
         )
     
-    async def generate_generic_response(self, query: str) -> str:
+    async def generate_generic_response(
+        self,
+        query: str,
+        deadline: Deadline | None = None,
+    ) -> str:
         """
         Generate a generic response without memory or personality.
-        Used for before/after comparison.
+        Used for before/after comparison; a canned reply is returned while
+        the LLM circuit is open. The reply depends on the query alone, so
+        a reworded query from any user can be answered from generic_cache.
+        """
+        cached = self.generic_cache.get(query)
+        if cached is not None:
+            return cached
+        try:
+            response, latency = await self._generate(
+                GENERIC_RESPONSE_PROMPT, query, GENERIC_OUTPUT, 0.7, deadline, "generic", "generic",
+            )
+        except CircuitOpen:
+            METRICS.inc("personality.degraded", profile="generic")
+            return GENERIC_FALLBACK_RESPONSE
+        self.generic_cache.put(query, response, latency)
+        return response
+    
+    async def _generate(
+        self,
+        system_prompt: str,
+        query: str,
+        policy: OutputPolicy,
+        temperature: float,
+        deadline: Deadline | None,
+        route: str,
+        profile: str,
+    ) -> tuple[str, float]:
+        """
+        One reply under the output policy's length limits, recording
+        latency and tokens per profile.
+        
+        Returns:
+            (reply text, seconds the LLM call took)
         """
-        return await self.client.generate_response(
-            system_prompt=GENERIC_RESPONSE_PROMPT,
-            user_message=query,
-            temperature=0.7,
+        limits = output_limits(policy, query)
+        started = time.perf_counter()
+        generation = await self.client.generate(
+            system_prompt,
+            query,
+            temperature=temperature,
+            max_tokens=limits.max_tokens,
+            stop=limits.stop,
+            deadline=deadline,
+            route=route,
         )
+        latency = time.perf_counter() - started
+        tokens = generation.completion_tokens
+        if tokens is None:
+            tokens = estimate_tokens(generation.text)
+        METRICS.inc("personality.replies", profile=profile, kind=limits.kind)
+        METRICS.observe("personality.latency_seconds", latency, profile=profile)
+        METRICS.observe("personality.completion_tokens", tokens, profile=profile)
+        METRICS.observe("personality.max_tokens", limits.max_tokens, profile=profile)
+        if generation.finish_reason == "length":
+            # Cut off mid-reply: the budget is too tight for this profile
+            METRICS.inc("personality.length_stops", profile=profile)
+        return generation.text, latency
     
     async def generate_comparison(
         self,
         query: str,
         memory: UserMemory,
+        deadline: Deadline | None = None,
     ) -> dict[str, PersonalityResponse]:
         """
         Generate responses for all personalities for side-by-side comparison.
         
-        Uses asyncio.gather for parallel generation.
+        Uses asyncio.gather for parallel generation. All calls share the
+        request deadline and the registry current when it started, so a
+        reload mid-request can't remove a profile from under it.
         """
+        registry = self.profiles.current
         tasks = [
-            self.generate_response(query, memory, pid)
-            for pid in PROFILES.keys()
+            self.generate_response(query, memory, pid, deadline, registry)
+            for pid in registry
         ]
         responses = await asyncio.gather(*tasks)
         
         return {r.personality_id: r for r in responses}
+    
+    async def stream_comparison(
+        self,
+        query: str,
+        memory: UserMemory,
+        deadline: Deadline | None = None,
+        include_generic: bool = True,
+        registry: ProfileRegistry | None = None,
+    ) -> AsyncIterator[ComparisonEvent]:
+        """
+        Run the generic baseline and every personality concurrently,
+        yielding each result as soon as it finishes.
+        
+        Unlike generate_comparison, a slow or failing profile never holds
+        back the others: it yields an "error" event instead. Calls still
+        running when the deadline passes are cancelled and reported as
+        errors. The stream always ends with a "done" event.
+        
+        Args:
+            query: User's current message
+            memory: Extracted user memory
+            deadline: Optional request deadline shared by all calls
+            include_generic: Also generate the memory-less baseline
+            registry: Profiles to compare (the current registry when not
+                given), used for every call of the stream
+        
+        Yields:
+            ComparisonEvent objects in completion order
+        """
+        started = time.perf_counter()
+        registry = registry if registry is not None else self.profiles.current
+        tasks = {
+            asyncio.create_task(self.generate_response(query, memory, pid, deadline, registry)): pid
+            for pid in registry
+        }
+        if include_generic:
+            tasks[asyncio.create_task(self.generate_generic_response(query, deadline))] = None
+        
+        pending = set(tasks)
+        try:
+            while pending:
+                timeout = deadline.remaining() if deadline else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in done:
+                    yield self._comparison_event(task, tasks[task], started)
+            
+            for task in pending:
+                task.cancel()
+                late = DeadlineExceeded(f"{tasks[task] or 'generic'} response did not finish before the deadline")
+                yield ComparisonEvent(
+                    type="error",
+                    personality_id=tasks[task],
+                    error=f"{type(late).__name__}: {str(late)}",
+                )
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        yield ComparisonEvent(type="done", elapsed_ms=(time.perf_counter() - started) * 1000)
+    
+    @staticmethod
+    def _comparison_event(task: asyncio.Task, profile_id: str | None, started: float) -> ComparisonEvent:
+        """Turn one finished comparison task into its event."""
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        error = task.exception()
+        if error is not None:
+            return ComparisonEvent(
+                type="error",
+                personality_id=profile_id,
+                error=f"{type(error).__name__}: {str(error)}",
+                elapsed_ms=elapsed_ms,
+            )
+        if profile_id is None:
+            return ComparisonEvent(type="generic", generic=task.result(), elapsed_ms=elapsed_ms)
+        return ComparisonEvent(
+            type="personality",
+            personality_id=profile_id,
+            response=task.result(),
+            elapsed_ms=elapsed_ms,
+        )
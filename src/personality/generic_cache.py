@@ -0,0 +1,124 @@
+"""
+Cross-user cache for the memory-free generic response.
+The generic reply depends on the query alone, so rewordings that differ
+only in case, punctuation, word order or function words ("how do I deal
+with stress?", "how to deal with stress") can share one reply. Entries
+are keyed by the query's content words, negations included, so "quit a
+job" never answers "not quit a job", and queries carrying anything
+personal (first-person details, names) are never shared across users.
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from src.observability.metrics import METRICS, MetricsRegistry
+from src.personality.cache import normalize_query
+
+# Tunable: queries kept (0 disables the cache)
+GENERIC_CACHE_SIZE = int(os.getenv("GENERIC_CACHE_SIZE", "0"))
+
+
+# Words that only shape the question; every other word must match exactly
+FUNCTION_WORDS = frozenset({
+    "a", "an", "the", "i", "you", "do", "does", "can", "could", "to", "please",
+    "just", "really", "some", "any",
+})
+
+# First-person details make a query (and its reply) about one user
+PERSONAL_WORDS = frozenset({
+    "my", "mine", "me", "myself", "our", "ours", "us", "we", "i'm", "im",
+    "i've", "ive", "i'd", "i'll", "we're", "we've",
+})
+
+_WORD = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+_SENTENCE_START = re.compile(r"(?:^|[.!?]\s+)$")
+
+
+def is_personal(query: str) -> bool:
+    """
+    True if the query carries first-person details or a name ("my sister
+    Priya ..."), so its reply must not be served to another user.
+    """
+    text = query.replace("’", "'")
+    for match in _WORD.finditer(text):
+        word = match.group()
+        if word.casefold() in PERSONAL_WORDS:
+            return True
+        # A capitalised word mid-sentence is most likely a name
+        if word[0].isupper() and word != "I" and not _SENTENCE_START.search(text[:match.start()]):
+            return True
+    return False
+
+
+def content_words(normalized: str) -> frozenset[str]:
+    """Words of a normalized query that must match for a reply to be reused."""
+    return frozenset(normalized.split()) - FUNCTION_WORDS
+
+
+@dataclass
+class _Entry:
+    query: str  # Normalized query the reply was generated for
+    response: str
+    latency: float  # Seconds the LLM call took; a hit saves this much
+
+
+class GenericResponseCache:
+    """
+    LRU of generic replies keyed by the content words of their queries.
+    
+    A query hits if it has the same content words (everything but
+    FUNCTION_WORDS; "not" and "no" count) as a cached one. Personal
+    queries are neither looked up nor stored. Hits, misses and LLM time
+    saved are counted in `metrics` under generic_cache.*.
+    
+    Args:
+        size: Queries kept; 0 disables the cache
+    """
+    
+    def __init__(self, size: int = GENERIC_CACHE_SIZE, metrics: MetricsRegistry = METRICS):
+        self.size = max(0, size)
+        self.metrics = metrics
+        self._entries: OrderedDict[frozenset[str], _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+    
+    def get(self, query: str) -> str | None:
+        """The cached reply to the same or a reworded query, if any."""
+        if not self.enabled:
+            return None
+        if is_personal(query):
+            self.metrics.inc("generic_cache", outcome="personal")
+            return None
+        normalized = normalize_query(query)
+        key = content_words(normalized)
+        with self._lock:
+            entry = self._entries.get(key) if key else None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        
+        if entry is None:
+            self.metrics.inc("generic_cache", outcome="miss")
+            return None
+        self.metrics.inc("generic_cache", outcome="exact" if entry.query == normalized else "reworded")
+        self.metrics.inc("generic_cache.saved_seconds", entry.latency)
+        return entry.response
+    
+    def put(self, query: str, response: str, latency: float) -> None:
+        """Cache a generated reply, evicting the least recently used if full."""
+        if not self.enabled or is_personal(query):
+            return
+        normalized = normalize_query(query)
+        key = content_words(normalized)
+        if not key:
+            return
+        with self._lock:
+            self._entries[key] = _Entry(normalized, response, latency)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+                self.metrics.inc("generic_cache.evictions")
+            self.metrics.set_gauge("generic_cache.entries", len(self._entries))
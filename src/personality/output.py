@@ -0,0 +1,62 @@
+"""
+Output-length control for generated replies.
+Each profile's OutputPolicy turns a query into a max_tokens budget and
+stop sequences: greetings get short replies, long or emotional messages
+get room, and nothing exceeds the profile's cap. Shorter caps bound the
+tail latency of a generation, which grows with the tokens produced.
+"""
+import re
+from dataclasses import dataclass
+from src.extractors.prefilter import FILLER_WORDS, FIRST_PERSON
+from src.llm.tokens import estimate_tokens
+from src.models.personality import OutputPolicy, QueryKind
+
+# The memory-free baseline has no profile; it gets the default policy
+GENERIC_OUTPUT = OutputPolicy()
+
+_WORD = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+QUESTION_WORDS = frozenset({
+    "what", "why", "how", "when", "where", "who", "which", "should", "can",
+    "could", "would", "is", "are", "do", "does", "kya", "kaise", "kyun", "kab",
+})
+
+FEELING_WORDS = frozenset({
+    "stressed", "stress", "anxious", "anxiety", "sad", "lonely", "tired",
+    "angry", "upset", "worried", "scared", "overwhelmed", "depressed", "hurt",
+    "exhausted", "frustrated", "crying", "cried", "lost", "hate", "miss",
+})
+
+
+@dataclass(frozen=True)
+class OutputLimits:
+    """Generation limits for one reply."""
+    kind: QueryKind
+    max_tokens: int
+    stop: tuple[str, ...]
+
+
+def classify_query(query: str) -> QueryKind:
+    """
+    Rough query type from its words:
+    - greeting: a few words of pure filler ("hi", "good morning")
+    - venting: the speaker talking about how they feel
+    - question: ends in "?" or opens with a question word
+    - statement: anything else
+    """
+    words = [w.lower() for w in _WORD.findall(query)]
+    if not words or (len(words) <= 4 and all(w in FILLER_WORDS for w in words)):
+        return "greeting"
+    if any(w in FEELING_WORDS for w in words) and any(w in FIRST_PERSON for w in words):
+        return "venting"
+    if query.rstrip().endswith("?") or words[0] in QUESTION_WORDS:
+        return "question"
+    return "statement"
+
+
+def output_limits(policy: OutputPolicy, query: str) -> OutputLimits:
+    """The max_tokens budget and stop sequences `policy` gives `query`."""
+    kind = classify_query(query)
+    budget = (policy.base_tokens + policy.tokens_per_query_token * estimate_tokens(query)) * policy.kind_scale.get(kind, 1.0)
+    max_tokens = min(policy.max_tokens, max(policy.min_tokens, round(budget)))
+    return OutputLimits(kind=kind, max_tokens=max_tokens, stop=tuple(policy.stop))
@@ -1,114 +1,91 @@
 """
 Personality profile definitions with specific linguistic markers.
 Each profile has detailed style constraints for consistent tone.
+
+Profiles live in data/profiles/, one JSON file per profile (YAML too when
+PyYAML is installed), so a persona can be added or edited without a code
+change. PROFILES is the set loaded at import; the engine serves a
+hot-reloaded ProfileRegistry instead (see src/personality/registry.py).
+Both skip an invalid file with a warning, so one bad file can't stop a
+worker from booting.
 """
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Mapping
 from src.models.personality import PersonalityProfile
 
+logger = logging.getLogger(__name__)
 
-PROFILES: dict[str, PersonalityProfile] = {
-    "calm-mentor": PersonalityProfile(
-        id="calm-mentor",
-        name="🧘 Calm Mentor",
-        description="Warm, patient guide who uses Socratic questioning",
-        system_prompt="""You are a calm, wise mentor. Your communication style is warm and patient.
+PROFILES_DIR = Path(os.getenv("PROFILES_DIR", Path(__file__).resolve().parents[2] / "data" / "profiles"))
+PROFILE_SUFFIXES = (".json", ".yaml", ".yml")
 
-CORE APPROACH:
-- Guide through questions rather than direct answers
-- Acknowledge emotions before offering perspective
-- Help them discover insights themselves
-- Use gentle, encouraging language
 
-LINGUISTIC MARKERS (MUST FOLLOW):
-1. SENTENCE STRUCTURE: Use longer, flowing sentences. Avoid choppy phrasing.
-2. QUESTIONS: Ask open-ended Socratic questions that start with "What", "How", or "I wonder..."
-3. HEDGING: Use phrases like "perhaps", "it seems", "I notice" - never speak in absolutes
-4. VALIDATION: Always acknowledge their feeling BEFORE any advice: "That sounds challenging..."
-5. PACING: Use ellipses (...) sparingly to create thoughtful pauses
-6. NO EMOJIS: Never use emojis - maintain gravitas
-7. NO EXCLAMATION MARKS: Avoid ! - keep tone measured and calm
-8. METAPHORS: Use nature or journey metaphors when explaining concepts
+def profile_files(directory: Path) -> list[Path]:
+    """Profile files in `directory`, in load order."""
+    return sorted(p for p in Path(directory).iterdir() if p.suffix in PROFILE_SUFFIXES and p.is_file())
 
-EXAMPLE PHRASES:
-- "I notice there's a lot on your mind..."
-- "What might happen if you approached this differently?"
-- "It sounds like you're navigating something important here."
-- "Perhaps there's another way to look at this..."
-- "How does that sit with you when you think about it?" """,
-        temperature=0.6,
-        formality_level=6,
-        humor_level=2,
-        empathy_level=8,
-    ),
-    
-    "witty-friend": PersonalityProfile(
-        id="witty-friend",
-        name="😄 Witty Friend",
-        description="Playful companion who uses humor and cultural references",
-        system_prompt="""You are a witty, supportive friend. Your vibe is playful and quick.
 
-CORE APPROACH:
-- Use humor and light sarcasm (never mean-spirited)
-- Reference pop culture, memes, and shared experiences
-- Keep things fun while still being helpful
-- Be the friend who makes them laugh but also has their back
+def load_profile_file(path: Path) -> PersonalityProfile:
+    """
+    Parse and validate one profile file.
+    
+    Raises:
+        ValueError: If the file is malformed, fails validation, its `id`
+            does not match the file name, or it is YAML and PyYAML is missing
+    """
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".json":
+        data = json.loads(text)
+    else:
+        try:
+            import yaml
+        except ModuleNotFoundError:
+            raise ValueError(f"{path.name}: install PyYAML to load YAML profiles") from None
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ValueError(f"{path.name}: {e}") from e
+    profile = PersonalityProfile.model_validate(data)
+    if profile.id != path.stem:
+        raise ValueError(f"{path.name}: profile id {profile.id!r} does not match the file name")
+    return profile
 
-LINGUISTIC MARKERS (MUST FOLLOW):
-1. CASE: Use lowercase for casual vibe, except for emphasis (e.g., "okay but THIS")
-2. EMOJIS: Maximum 1 emoji per message, placed at the end
-3. SENTENCE LENGTH: Keep sentences short and punchy. Fragment sentences okay.
-4. SLANG: Use casual slang like "tbh", "lowkey", "ngl", "fr" sparingly
-5. RHETORICAL QUESTIONS: Avoid them - make statements instead
-6. EXAGGERATION: Use hyperbole for comedic effect ("literally dying", "the AUDACITY")
-7. POP CULTURE: Drop references but don't explain them
-8. CONTRACTIONS: Always use contractions (don't, won't, can't)
-9. CALLBACK: Reference their interests naturally if you know them
 
-EXAMPLE PHRASES:
-- "okay but hear me out..."
-- "not to be dramatic but this is giving main character energy"
-- "been there, have the emotional scars to prove it"
-- "that's rough buddy (avatar reference, you're welcome)"
-- "the audacity of that deadline tho" """,
-        temperature=0.8,
-        formality_level=2,
-        humor_level=9,
-        empathy_level=6,
-    ),
+def load_profiles(
+    directory: Path = PROFILES_DIR,
+    previous: Mapping[str, PersonalityProfile] | None = None,
+) -> dict[str, PersonalityProfile]:
+    """
+    Load every valid profile file in `directory`.
     
-    "therapist": PersonalityProfile(
-        id="therapist",
-        name="💜 Therapist",
-        description="Empathetic listener using reflective techniques",
-        system_prompt="""You are an empathetic therapist-style companion. Your approach is deeply validating.
-
-CORE APPROACH:
-- Use reflective listening: mirror their feelings back
-- Validate emotions before offering any perspective
-- Ask open-ended questions to explore feelings deeper
-- Never minimize or rush past their experience
-- Create a safe space for vulnerability
+    An invalid file (or a second file with the same id) is logged and
+    skipped; if `previous` has a profile with that file's id, the
+    previous version is kept in its place.
+    
+    Raises:
+        ValueError: If the directory has no valid profiles
+    """
+    profiles = {}
+    for path in profile_files(directory):
+        try:
+            profile = load_profile_file(path)
+            if profile.id in profiles:
+                raise ValueError(f"{path.name}: duplicate profile id {profile.id!r}")
+        except (OSError, ValueError) as e:
+            kept = previous.get(path.stem) if previous and path.stem not in profiles else None
+            logger.warning(
+                "Skipping profile file %s%s: %s: %s",
+                path.name, " (keeping the previous version)" if kept else "", type(e).__name__, e,
+            )
+            if kept:
+                profiles[kept.id] = kept
+            continue
+        profiles[profile.id] = profile
+    if not profiles:
+        raise ValueError(f"No valid profiles found in {directory}")
+    return profiles
 
-LINGUISTIC MARKERS (MUST FOLLOW):
-1. MIRRORING: Start responses by reflecting their words: "It sounds like...", "I hear that..."
-2. VALIDATION FIRST: Never give advice without first validating: "That must feel..."
-3. OPEN QUESTIONS: Only ask questions that cannot be answered with yes/no
-4. NO ADVICE UNLESS ASKED: Never say "you should" - instead: "some people find that..."
-5. PACE: Use short paragraphs with line breaks to create breathing room
-6. SILENCE RESPECT: End with space for them to continue: "What else comes up for you?"
-7. NO EMOJIS: Maintain professional warmth without emojis
-8. GENTLE LANGUAGE: Use "might", "perhaps", "could" instead of definitive statements
-9. SOMATIC: Reference body sensations: "Where do you feel that in your body?"
 
-EXAMPLE PHRASES:
-- "It sounds like you're carrying a lot right now."
-- "That must feel really overwhelming."
-- "Thank you for sharing that with me."
-- "What comes up for you when you sit with that feeling?"
-- "It makes sense that you'd feel that way, given everything."
-- "I'm curious what that experience was like for you..." """,
-        temperature=0.5,
-        formality_level=5,
-        humor_level=1,
-        empathy_level=10,
-    ),
-}
+PROFILES: dict[str, PersonalityProfile] = load_profiles()
@@ -0,0 +1,187 @@
+"""
+Immutable, hot-reloadable registry of compiled personality profiles.
+Each profile's system prompt is rendered once at load time, leaving only
+the memory context to splice in per request. A ProfileStore watches the
+profile directory and swaps in a new registry when files change;
+requests keep the registry they started with.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Iterable, Iterator, Mapping
+from src.models.personality import PersonalityProfile
+from src.observability.metrics import METRICS, MetricsRegistry
+from src.personality.profiles import PROFILES_DIR, load_profiles, profile_files
+
+logger = logging.getLogger(__name__)
+
+# Tunable: seconds between profile directory scans (0 disables hot reload)
+PROFILE_RELOAD_INTERVAL = float(os.getenv("PROFILE_RELOAD_INTERVAL", "2"))
+
+PROMPT_TEMPLATE = """{profile.system_prompt}
+
+USER CONTEXT (incorporate naturally, don't force it or be creepy about it):
+{memory_context}
+
+STYLE GUIDELINES:
+- Formality Level: {profile.formality_level}/10
+- Humor Level: {profile.humor_level}/10
+- Empathy Level: {profile.empathy_level}/10
+
+Remember: Use the context to make responses feel personal, but don't explicitly state "I know you like X" - weave it in naturally."""
+
+_CONTEXT_SLOT = "\x00memory_context\x00"
+
+
+@dataclass(frozen=True)
+class CompiledProfile:
+    """A profile with its system prompt pre-rendered around the memory context slot."""
+    profile: PersonalityProfile
+    prefix: str
+    suffix: str
+    
+    @classmethod
+    def compile(cls, profile: PersonalityProfile) -> "CompiledProfile":
+        prefix, suffix = PROMPT_TEMPLATE.format(profile=profile, memory_context=_CONTEXT_SLOT).split(_CONTEXT_SLOT)
+        return cls(profile=profile, prefix=prefix, suffix=suffix)
+    
+    def render(self, memory_context: str) -> str:
+        """Full system prompt for one request."""
+        return self.prefix + memory_context + self.suffix
+
+
+class ProfileRegistry(Mapping[str, CompiledProfile]):
+    """Read-only mapping of profile ID to CompiledProfile."""
+    
+    def __init__(self, profiles: Iterable[PersonalityProfile], version: str = ""):
+        self._compiled = MappingProxyType({p.id: CompiledProfile.compile(p) for p in profiles})
+        self.version = version
+    
+    @classmethod
+    def from_directory(
+        cls,
+        directory: Path = PROFILES_DIR,
+        previous: "ProfileRegistry | None" = None,
+    ) -> "ProfileRegistry":
+        """
+        Load and compile every valid profile file in `directory`; invalid
+        files are skipped as in load_profiles, keeping their version from
+        `previous` if it has one.
+        
+        Raises:
+            ValueError: If there are no valid profiles
+        """
+        digest = hashlib.sha256()
+        for path in profile_files(directory):
+            digest.update(path.name.encode())
+            digest.update(path.read_bytes())
+        profiles = load_profiles(directory, previous.profiles if previous is not None else None)
+        return cls(profiles.values(), version=digest.hexdigest()[:12])
+    
+    def __getitem__(self, profile_id: str) -> CompiledProfile:
+        return self._compiled[profile_id]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._compiled)
+    
+    def __len__(self) -> int:
+        return len(self._compiled)
+    
+    @property
+    def profiles(self) -> dict[str, PersonalityProfile]:
+        return {pid: compiled.profile for pid, compiled in self._compiled.items()}
+
+
+class ProfileStore:
+    """
+    Holds the current ProfileRegistry and hot-swaps it when files change.
+    
+    A swap is a single reference assignment, so readers see either the old
+    or the new registry, never a mix. Invalid files are logged and skipped
+    the same way at startup and on reload; on reload a broken edit keeps
+    the last good version of that profile. A reload that finds no valid
+    profiles at all is logged and the current registry stays in service.
+    """
+    
+    def __init__(
+        self,
+        directory: Path = PROFILES_DIR,
+        metrics: MetricsRegistry = METRICS,
+    ):
+        self.directory = Path(directory)
+        self.metrics = metrics
+        self._signature = self._scan()
+        self._registry = ProfileRegistry.from_directory(self.directory)
+        self._watcher: asyncio.Task | None = None
+        self.metrics.set_gauge("profiles.loaded", len(self._registry))
+    
+    @property
+    def current(self) -> ProfileRegistry:
+        """The registry to use for one request; hold on to it for the whole request."""
+        return self._registry
+    
+    def _scan(self) -> tuple:
+        """Cheap change detector: name, mtime and size of every profile file."""
+        return tuple((p.name, p.stat().st_mtime_ns, p.stat().st_size) for p in profile_files(self.directory))
+    
+    def reload(self, force: bool = False) -> bool:
+        """
+        Swap in a freshly loaded registry if the profile files changed.
+        
+        Returns:
+            True if a new registry was swapped in
+        """
+        try:
+            signature = self._scan()
+        except OSError as e:
+            logger.warning("Profile directory scan failed: %s: %s", type(e).__name__, e)
+            return False
+        if signature == self._signature and not force:
+            return False
+        
+        started = time.perf_counter()
+        try:
+            registry = ProfileRegistry.from_directory(self.directory, previous=self._registry)
+        except (OSError, ValueError) as e:
+            # Don't retry the same broken files on every poll
+            self._signature = signature
+            self.metrics.inc("profiles.reloads", outcome="failed")
+            logger.warning(
+                "Profile reload failed, keeping %d profiles: %s: %s",
+                len(self._registry), type(e).__name__, e,
+            )
+            return False
+        
+        self._registry = registry
+        self._signature = signature
+        self.metrics.observe("profiles.swap_seconds", time.perf_counter() - started)
+        self.metrics.inc("profiles.reloads", outcome="swapped")
+        self.metrics.set_gauge("profiles.loaded", len(registry))
+        logger.info("Loaded %d profiles (version %s)", len(registry), registry.version)
+        return True
+    
+    async def watch(self, interval: float = PROFILE_RELOAD_INTERVAL) -> None:
+        """Poll the profile directory every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            self.reload()
+    
+    def start(self, interval: float = PROFILE_RELOAD_INTERVAL) -> None:
+        """Start watching in the background (no-op if `interval` is 0)."""
+        if interval > 0 and self._watcher is None:
+            self._watcher = asyncio.create_task(self.watch(interval))
+    
+    async def stop(self) -> None:
+        if self._watcher is None:
+            return
+        self._watcher.cancel()
+        try:
+            await self._watcher
+        except asyncio.CancelledError:
+            pass
+        self._watcher = None
@@ -0,0 +1,132 @@
+"""
+Shared fixtures for offline tests.
+FakeLLM stands in for AsyncGroq so orchestration logic can be tested
+without network access or an API key.
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+import pytest
+from src.llm.client import GroqClient
+from src.llm.dispatcher import LLMDispatcher
+from src.llm.prompts import (
+    PREFERENCE_EXTRACTION_PROMPT,
+    EMOTION_EXTRACTION_PROMPT,
+    FACT_EXTRACTION_PROMPT,
+    GENERIC_RESPONSE_PROMPT,
+)
+from src.observability.metrics import MetricsRegistry
+
+
+EXTRACTION_KINDS = {
+    PREFERENCE_EXTRACTION_PROMPT: "preferences",
+    EMOTION_EXTRACTION_PROMPT: "emotional_patterns",
+    FACT_EXTRACTION_PROMPT: "facts",
+    GENERIC_RESPONSE_PROMPT: "generic",
+}
+
+
+def completion(content: str) -> SimpleNamespace:
+    """Minimal object shaped like a Groq chat completion."""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+    )
+
+
+class FakeStream:
+    """Stand-in for a Groq AsyncStream that yields content in small chunks."""
+    
+    def __init__(self, text: str, chunk_size: int, chunk_delay: float):
+        self.text = text
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.sent = 0
+        self.closed = False
+    
+    @property
+    def total(self) -> int:
+        return -(-len(self.text) // self.chunk_size)
+    
+    async def _chunks(self):
+        for start in range(0, len(self.text), self.chunk_size):
+            await asyncio.sleep(self.chunk_delay)
+            self.sent += 1
+            delta = SimpleNamespace(content=self.text[start:start + self.chunk_size])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+    
+    def __aiter__(self):
+        return self._chunks()
+    
+    async def close(self):
+        self.closed = True
+
+
+class FakeLLM:
+    """
+    Stand-in for AsyncGroq with canned content, latency and errors.
+    
+    Calls are keyed by kind: "preferences", "emotional_patterns", "facts",
+    "generic", or "respond" for any personality prompt.
+    """
+    
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=self)
+        self.models = SimpleNamespace(list=self.list_models)
+        self.calls: list[dict] = []
+        self.content: dict[str, str] = {}
+        self.delays: dict[str, float] = {}
+        self.errors: dict[str, Exception] = {}
+        self.cancelled: list[str] = []
+        self.streams: list[FakeStream] = []
+        self.chunk_size = 16
+        self.chunk_delay = 0.0
+        self.warmed = False
+        self.closed = False
+    
+    @staticmethod
+    def kind(request: dict) -> str:
+        return EXTRACTION_KINDS.get(request["messages"][0]["content"], "respond")
+    
+    def default_content(self, kind: str) -> str:
+        if kind in ("preferences", "emotional_patterns", "facts"):
+            return json.dumps({kind: []})
+        return f"{kind} reply"
+    
+    async def list_models(self):
+        self.warmed = True
+        return SimpleNamespace(data=[])
+    
+    async def close(self):
+        self.closed = True
+    
+    async def create(self, **request):
+        kind = self.kind(request)
+        self.calls.append(request)
+        try:
+            await asyncio.sleep(self.delays.get(kind, 0))
+        except asyncio.CancelledError:
+            self.cancelled.append(kind)
+            raise
+        if kind in self.errors:
+            raise self.errors[kind]
+        content = self.content.get(kind, self.default_content(kind))
+        if request.get("stream"):
+            self.streams.append(FakeStream(content, self.chunk_size, self.chunk_delay))
+            return self.streams[-1]
+        return completion(content)
+
+
+@pytest.fixture
+def fake_llm() -> FakeLLM:
+    return FakeLLM()
+
+
+@pytest.fixture
+def fake_client(fake_llm) -> GroqClient:
+    """GroqClient wired to FakeLLM with a private dispatcher and metrics."""
+    client = GroqClient(
+        api_key="test-key",
+        dispatcher=LLMDispatcher(metrics=MetricsRegistry()),
+    )
+    client.client = fake_llm
+    return client
@@ -0,0 +1,200 @@
+"""
+Tests for the LLM circuit breaker and degraded-mode fallbacks.
+Uses the FakeLLM backend from conftest - no API calls.
+"""
+import asyncio
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from groq import APIConnectionError, BadRequestError
+from src.api import resources as resources_module
+from src.extractors.orchestrator import MemoryOrchestrator
+from src.llm.breaker import BreakerState, CircuitBreaker, CircuitOpen
+from src.llm.prompts import GENERIC_FALLBACK_RESPONSE
+from src.models.memory import UserMemory
+from src.models.messages import ChatMessage
+from src.observability.metrics import MetricsRegistry
+from src.personality.engine import PersonalityEngine
+from src.personality.profiles import PROFILES
+
+
+@pytest.fixture
+def metrics():
+    return MetricsRegistry()
+
+
+@pytest.fixture
+def breaker(fake_client, metrics):
+    fake_client.breaker = CircuitBreaker(
+        min_calls=3, failure_rate=0.5, slow_call_seconds=0.05, open_seconds=0.05, metrics=metrics
+    )
+    return fake_client.breaker
+
+
+REQUEST = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+
+
+def provider_down() -> APIConnectionError:
+    return APIConnectionError(request=REQUEST)
+
+
+def bad_request() -> BadRequestError:
+    return BadRequestError("invalid request", response=httpx.Response(400, request=REQUEST), body=None)
+
+
+async def trip(fake_client, fake_llm, calls: int = 3) -> None:
+    """Fail enough calls to open the breaker."""
+    fake_llm.errors["respond"] = provider_down()
+    for _ in range(calls):
+        with pytest.raises(APIConnectionError):
+            await fake_client.generate_response("system", "hi")
+    del fake_llm.errors["respond"]
+
+
+class TestCircuitBreaker:
+    """Opening, failing fast and half-open probing."""
+    
+    @pytest.mark.asyncio
+    async def test_opens_after_failures_and_fails_fast(self, fake_client, fake_llm, breaker, metrics):
+        fake_llm.errors["respond"] = provider_down()
+        for _ in range(3):
+            with pytest.raises(APIConnectionError):
+                await fake_client.generate_response("system", "hi")
+        
+        assert breaker.state is BreakerState.OPEN
+        with pytest.raises(CircuitOpen):
+            await fake_client.generate_response("system", "hi")
+        assert len(fake_llm.calls) == 3
+        assert metrics.counter("llm.breaker_rejected") == 1
+        assert metrics.gauge("llm.breaker_state") == 2
+    
+    @pytest.mark.asyncio
+    async def test_slow_calls_count_as_failures(self, fake_client, fake_llm, breaker):
+        fake_llm.delays["respond"] = 0.08
+        for _ in range(3):
+            await fake_client.generate_response("system", "hi")
+        
+        assert breaker.state is BreakerState.OPEN
+    
+    @pytest.mark.asyncio
+    async def test_successes_keep_it_closed(self, fake_client, fake_llm, breaker):
+        fake_llm.errors["respond"] = provider_down()
+        with pytest.raises(APIConnectionError):
+            await fake_client.generate_response("system", "hi")
+        del fake_llm.errors["respond"]
+        for _ in range(3):
+            await fake_client.generate_response("system", "hi")
+        
+        assert breaker.state is BreakerState.CLOSED
+    
+    @pytest.mark.asyncio
+    async def test_half_open_probe(self, fake_client, fake_llm, breaker):
+        fake_llm.errors["respond"] = provider_down()
+        for _ in range(3):
+            with pytest.raises(APIConnectionError):
+                await fake_client.generate_response("system", "hi")
+        await asyncio.sleep(0.06)
+        assert breaker.state is BreakerState.HALF_OPEN
+        
+        # Failed probe: open again
+        with pytest.raises(APIConnectionError):
+            await fake_client.generate_response("system", "hi")
+        assert breaker.state is BreakerState.OPEN
+        
+        await asyncio.sleep(0.06)
+        del fake_llm.errors["respond"]
+        fake_llm.delays["respond"] = 0.01
+        probe = asyncio.create_task(fake_client.generate_response("system", "hi"))
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpen):
+            await fake_client.generate_response("system", "second probe")
+        await probe
+        
+        assert breaker.state is BreakerState.CLOSED
+        assert breaker.snapshot()["state"] == "closed"
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_is_not_recorded(self, fake_client, fake_llm, breaker, metrics):
+        await trip(fake_client, fake_llm)
+        await asyncio.sleep(0.06)
+        fake_llm.delays["respond"] = 0.02
+        probe = asyncio.create_task(fake_client.generate_response("system", "hi"))
+        await asyncio.sleep(0.005)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        
+        # Still half-open, and the slot is free for the next probe
+        assert breaker.state is BreakerState.HALF_OPEN
+        assert metrics.counter("llm.breaker_calls", outcome="ok") == 0
+        await fake_client.generate_response("system", "hi")
+        assert breaker.state is BreakerState.CLOSED
+    
+    @pytest.mark.asyncio
+    async def test_client_errors_do_not_open_it(self, fake_client, fake_llm, breaker):
+        fake_llm.errors["respond"] = bad_request()
+        for _ in range(3):
+            with pytest.raises(BadRequestError):
+                await fake_client.generate_response("system", "hi")
+        
+        assert breaker.state is BreakerState.CLOSED
+
+
+class TestDegradedMode:
+    """Fallback results while the breaker is open."""
+    
+    @pytest.mark.asyncio
+    async def test_personality_fallback(self, fake_client, fake_llm, breaker):
+        await trip(fake_client, fake_llm)
+        engine = PersonalityEngine(fake_client)
+        
+        response = await engine.generate_response("hi", UserMemory(), "witty-friend")
+        generic = await engine.generate_generic_response("hi")
+        
+        assert response.degraded
+        assert response.response == PROFILES["witty-friend"].fallback_response
+        assert generic == GENERIC_FALLBACK_RESPONSE
+        assert len(fake_llm.calls) == 3
+    
+    @pytest.mark.asyncio
+    async def test_extraction_serves_rules_and_cache(self, fake_client, fake_llm, breaker):
+        orchestrator = MemoryOrchestrator(fake_client)
+        cached = [ChatMessage(content="Hiking every weekend lately")]
+        await orchestrator.extract_all(cached)
+        await trip(fake_client, fake_llm)
+        calls = len(fake_llm.calls)
+        
+        memory = await orchestrator.extract_all([ChatMessage(content="I'm 28 and I love cooking")])
+        again = await orchestrator.extract_all(cached)
+        
+        assert len(fake_llm.calls) == calls
+        assert [f.fact for f in memory.facts] == ["Is 28 years old"]
+        assert len(memory.extraction_errors) == 3
+        assert all(e.startswith("CircuitOpen") for e in memory.extraction_errors)
+        assert again.extraction_errors == []
+    
+    def test_health_reports_breaker(self, fake_client, fake_llm, monkeypatch):
+        monkeypatch.setattr(resources_module, "GroqClient", lambda **kwargs: fake_client)
+        from server import app
+        
+        with TestClient(app) as api:
+            assert api.get("/health").json()["status"] == "ok"
+            fake_client.breaker._transition(BreakerState.OPEN)
+            health = api.get("/health").json()
+        
+        assert health["status"] == "degraded"
+        assert health["llm"]["state"] == "open"
+    
+    def test_health_before_startup(self, monkeypatch):
+        from server import app
+        
+        # Without the lifespan context no resources are set up
+        monkeypatch.delattr(app.state, "resources", raising=False)
+        health = TestClient(app).get("/health")
+        
+        assert health.status_code == 200
+        assert health.json() == {"status": "degraded", "llm": {"state": "unknown"}}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,106 @@
+"""
+Tests for token-budgeted transcript compaction.
+Uses the FakeLLM backend from conftest - no API calls.
+"""
+import pytest
+from src.extractors.compaction import TranscriptCompactor, collapse_repeats, estimate_tokens, truncate
+from src.extractors.orchestrator import MemoryOrchestrator
+from src.extractors.prefilter import MessagePrefilter
+from src.models.messages import ChatMessage
+from src.observability.metrics import MetricsRegistry
+
+
+def messages(*contents: str) -> list[ChatMessage]:
+    return [ChatMessage(content=c) for c in contents]
+
+
+class TestTextCleanup:
+    """Estimator, repeat collapsing and truncation."""
+    
+    def test_estimate_tokens(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("word " * 100) == 125
+        assert estimate_tokens("日本語") == 3
+    
+    @pytest.mark.parametrize("text, expected", [
+        ("so   tired\n\n today", "so tired today"),
+        ("noooooooo!!!!!!", "nooo!!!"),
+        ("hahahahahaha", "hahaha"),
+        ("lol lol lol lol lol", "lol lol"),
+        ("I quit. I quit. I quit. Done.", "I quit. Done."),
+        ("It costs 1000000 rupees", "It costs 1000000 rupees"),
+    ])
+    def test_collapse_repeats(self, text, expected):
+        assert collapse_repeats(text) == expected
+    
+    def test_truncate_keeps_head_and_tail(self):
+        text = "start " + "middle " * 500 + "end"
+        result, was_truncated = truncate(text, 60)
+        
+        assert was_truncated
+        assert result.startswith("start ") and result.endswith("end")
+        assert "tokens truncated" in result
+        assert estimate_tokens(result) <= 70
+    
+    def test_short_text_untouched(self):
+        assert truncate("I love hiking", 60) == ("I love hiking", False)
+
+
+class TestTranscriptCompactor:
+    """Budget enforcement and accounting."""
+    
+    def test_long_paste_is_bounded(self):
+        compactor = TranscriptCompactor(max_message_tokens=50, metrics=MetricsRegistry())
+        long_content = " ".join(f"token{i}" for i in range(2000))
+        
+        transcript = compactor.compact(messages("I love hiking", long_content))
+        
+        assert transcript.truncated == [1]
+        assert transcript.text.startswith("[0] I love hiking\n[1] token0")
+        assert transcript.tokens_after < 100 < transcript.tokens_before
+    
+    def test_budget_keeps_recent_and_high_signal(self):
+        compactor = TranscriptCompactor(budget_tokens=30, metrics=MetricsRegistry())
+        msgs = messages(
+            "I love hiking in the mountains",
+            "Went to the store for some things",
+            "The weather was fine and the bus was late",
+            "I work as a nurse at City Hospital",
+        )
+        filtered = MessagePrefilter(metrics=MetricsRegistry()).apply(msgs)
+        
+        transcript = compactor.compact(msgs, filtered)
+        
+        assert 3 not in transcript.omitted
+        assert transcript.omitted
+        assert estimate_tokens(transcript.text) <= 30
+        kept = [int(line[1:line.index("]")]) for line in transcript.text.splitlines()]
+        assert kept == sorted(kept)
+    
+    def test_metrics(self):
+        metrics = MetricsRegistry()
+        TranscriptCompactor(metrics=metrics).compact(messages("lol lol lol lol lol lol lol lol"))
+        
+        assert metrics.counter("extraction.tokens_saved_total") > 0
+        assert metrics.histogram("extraction.input_tokens")["count"] == 1
+
+
+class TestOrchestratorCompaction:
+    """Extractors receive the compacted transcript."""
+    
+    @pytest.mark.asyncio
+    async def test_extractors_receive_bounded_input(self, fake_client, fake_llm):
+        orchestrator = MemoryOrchestrator(
+            fake_client,
+            compactor=TranscriptCompactor(max_message_tokens=40, metrics=MetricsRegistry()),
+        )
+        paste = "I am pasting my whole resume here. " + " ".join(f"skill{i}" for i in range(3000))
+        
+        await orchestrator.extract_all(messages("I love hiking", paste))
+        
+        for call in fake_llm.calls:
+            assert estimate_tokens(call["messages"][1]["content"]) < 100
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,158 @@
+"""
+Tests for request deadlines and cancellation.
+Uses the FakeLLM backend from conftest - no API calls.
+"""
+import asyncio
+import json
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from src.api import routes
+from src.extractors import orchestrator as orchestrator_module
+from src.api.resources import AppResources
+from src.extractors.orchestrator import MemoryOrchestrator
+from src.llm.deadline import Deadline, DeadlineExceeded
+from src.models.memory import UserMemory
+from src.models.messages import ChatMessage
+from src.observability.metrics import METRICS
+from src.personality.engine import PersonalityEngine
+
+
+PREFERENCES = json.dumps({"preferences": [{
+    "category": "interests",
+    "description": "Enjoys hiking",
+    "confidence": 0.9,
+    "source_message_ids": [0],
+    "evidence": "I love hiking",
+}]})
+
+
+class TestDeadline:
+    """Deadline primitive."""
+    
+    def test_remaining_never_negative(self):
+        deadline = Deadline.after(-1)
+        assert deadline.expired
+        assert deadline.remaining() == 0.0
+    
+    @pytest.mark.asyncio
+    async def test_run_raises_when_deadline_passes(self):
+        with pytest.raises(DeadlineExceeded):
+            await Deadline.after(0.01).run(asyncio.sleep(1))
+
+
+class TestDeadlinePropagation:
+    """Deadlines flow from the orchestrator/engine into GroqClient."""
+    
+    @pytest.mark.asyncio
+    async def test_extract_all_returns_finished_sections(self, fake_client, fake_llm):
+        fake_llm.content["preferences"] = PREFERENCES
+        fake_llm.delays["facts"] = 5
+        orchestrator = MemoryOrchestrator(fake_client)
+        
+        memory = await orchestrator.extract_all(
+            [ChatMessage(content="I love hiking")],
+            deadline=Deadline.after(0.1),
+        )
+        
+        assert len(memory.preferences) == 1
+        assert memory.facts == []
+        assert len(memory.extraction_errors) == 1
+        assert memory.extraction_errors[0].startswith("DeadlineExceeded")
+        await asyncio.sleep(0)
+        assert "facts" in fake_llm.cancelled
+    
+    @pytest.mark.asyncio
+    async def test_expired_deadline_skips_llm_call(self, fake_client, fake_llm):
+        engine = PersonalityEngine(fake_client)
+        
+        with pytest.raises(DeadlineExceeded):
+            await engine.generate_response("hi", UserMemory(), "therapist", deadline=Deadline.after(0))
+        assert fake_llm.calls == []
+    
+    @pytest.mark.asyncio
+    async def test_comparison_shares_deadline(self, fake_client, fake_llm):
+        fake_llm.delays["respond"] = 5
+        engine = PersonalityEngine(fake_client)
+        
+        with pytest.raises(DeadlineExceeded):
+            await engine.generate_comparison("hi", UserMemory(), deadline=Deadline.after(0.05))
+
+
+class TestExtractorTimeouts:
+    """Per-extractor timeouts and the default deadline."""
+    
+    @pytest.mark.asyncio
+    async def test_per_extractor_timeout(self, fake_client, fake_llm):
+        fake_llm.content["preferences"] = PREFERENCES
+        fake_llm.delays["facts"] = 5
+        orchestrator = MemoryOrchestrator(fake_client, extractor_timeouts={"facts": 0.05})
+        before = METRICS.counter("extraction.timeouts", section="facts")
+        
+        memory = await orchestrator.extract_all([ChatMessage(content="I love hiking")])
+        
+        assert len(memory.preferences) == 1
+        assert memory.extraction_errors[0].startswith("DeadlineExceeded")
+        assert METRICS.counter("extraction.timeouts", section="facts") == before + 1
+    
+    @pytest.mark.asyncio
+    async def test_default_deadline_bounds_hung_call(self, fake_client, fake_llm, monkeypatch):
+        monkeypatch.setattr(orchestrator_module, "EXTRACTION_DEADLINE", 0.05)
+        fake_llm.delays["emotional_patterns"] = 5
+        orchestrator = MemoryOrchestrator(fake_client)
+        
+        memory = await asyncio.wait_for(
+            orchestrator.extract_all([ChatMessage(content="I love hiking")]), timeout=1
+        )
+        
+        assert len(memory.extraction_errors) == 1
+
+
+class TestRouteDeadlines:
+    """Header parsing, timeouts and disconnect handling in the API layer."""
+    
+    @pytest.fixture
+    def api(self, fake_client):
+        app = FastAPI()
+        app.state.resources = AppResources.create(fake_client)
+        app.include_router(routes.router, prefix="/api")
+        return TestClient(app)
+    
+    def test_timeout_header_maps_to_504(self, api, fake_llm):
+        fake_llm.delays["respond"] = 5
+        response = api.post(
+            "/api/respond",
+            json={"query": "hi", "memory": {}, "personality_id": "therapist"},
+            headers={"X-Request-Timeout-Ms": "50"},
+        )
+        assert response.status_code == 504
+    
+    def test_invalid_timeout_header(self, api):
+        response = api.post(
+            "/api/respond",
+            json={"query": "hi", "memory": {}, "personality_id": "therapist"},
+            headers={"X-Request-Timeout-Ms": "soon"},
+        )
+        assert response.status_code == 400
+    
+    @pytest.mark.asyncio
+    async def test_disconnect_cancels_work(self, monkeypatch):
+        monkeypatch.setattr(routes, "DISCONNECT_POLL_INTERVAL", 0.01)
+        
+        class Disconnected:
+            url = type("URL", (), {"path": "/api/respond"})()
+            
+            async def is_disconnected(self):
+                return True
+        
+        work = asyncio.ensure_future(asyncio.sleep(5))
+        with pytest.raises(HTTPException) as info:
+            await routes.run_until_disconnect(Disconnected(), work)
+        
+        assert info.value.status_code == 499
+        await asyncio.sleep(0)
+        assert work.cancelled()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,121 @@
+"""
+Unit tests for the priority-aware LLM dispatcher.
+No API calls - slots are held by plain asyncio events.
+"""
+import asyncio
+import pytest
+from src.llm.dispatcher import LLMDispatcher, Priority
+from src.observability.metrics import MetricsRegistry
+
+
+async def _hold(dispatcher, priority, release, order, name):
+    """Take a slot, record admission order, and hold it until released."""
+    async with dispatcher.slot(priority):
+        order.append(name)
+        await release.wait()
+
+
+class TestLLMDispatcher:
+    """Scheduling behaviour of LLMDispatcher."""
+    
+    @pytest.mark.asyncio
+    async def test_interactive_preempts_queued_background(self):
+        dispatcher = LLMDispatcher(max_concurrency=1, reserved_interactive=0, metrics=MetricsRegistry())
+        release, order = asyncio.Event(), []
+        
+        first = asyncio.create_task(_hold(dispatcher, Priority.BACKGROUND, release, order, "bg-1"))
+        await asyncio.sleep(0)
+        queued = [
+            asyncio.create_task(_hold(dispatcher, Priority.BACKGROUND, release, order, "bg-2")),
+            asyncio.create_task(_hold(dispatcher, Priority.INTERACTIVE, release, order, "chat")),
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first, *queued)
+        
+        assert order == ["bg-1", "chat", "bg-2"]
+    
+    @pytest.mark.asyncio
+    async def test_background_leaves_reserved_slots_free(self):
+        dispatcher = LLMDispatcher(max_concurrency=3, reserved_interactive=1, metrics=MetricsRegistry())
+        release, order = asyncio.Event(), []
+        
+        tasks = [
+            asyncio.create_task(_hold(dispatcher, Priority.BACKGROUND, release, order, f"bg-{i}"))
+            for i in range(3)
+        ]
+        await asyncio.sleep(0)
+        assert dispatcher.in_flight == 2
+        assert dispatcher.queue_depth(Priority.BACKGROUND) == 1
+        
+        tasks.append(asyncio.create_task(_hold(dispatcher, Priority.INTERACTIVE, release, order, "chat")))
+        await asyncio.sleep(0)
+        assert "chat" in order
+        
+        release.set()
+        await asyncio.gather(*tasks)
+        assert dispatcher.in_flight == 0
+    
+    @pytest.mark.asyncio
+    async def test_starved_background_is_promoted(self):
+        metrics = MetricsRegistry()
+        dispatcher = LLMDispatcher(
+            max_concurrency=1, reserved_interactive=0, starvation_timeout=0.0, metrics=metrics
+        )
+        release, order = asyncio.Event(), []
+        
+        first = asyncio.create_task(_hold(dispatcher, Priority.INTERACTIVE, release, order, "chat-1"))
+        await asyncio.sleep(0)
+        queued = [
+            asyncio.create_task(_hold(dispatcher, Priority.BACKGROUND, release, order, "bg")),
+            asyncio.create_task(_hold(dispatcher, Priority.INTERACTIVE, release, order, "chat-2")),
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first, *queued)
+        
+        assert order == ["chat-1", "bg", "chat-2"]
+        assert metrics.counter("llm.starvation_promotions") == 1
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_is_removed(self):
+        dispatcher = LLMDispatcher(max_concurrency=1, reserved_interactive=0, metrics=MetricsRegistry())
+        release, order = asyncio.Event(), []
+        
+        first = asyncio.create_task(_hold(dispatcher, Priority.INTERACTIVE, release, order, "a"))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(_hold(dispatcher, Priority.BACKGROUND, release, order, "b"))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        
+        assert dispatcher.queue_depth(Priority.BACKGROUND) == 0
+        release.set()
+        await first
+        assert dispatcher.in_flight == 0
+        assert order == ["a"]
+    
+    @pytest.mark.asyncio
+    async def test_queue_times_reported_per_priority(self):
+        dispatcher = LLMDispatcher(max_concurrency=2, reserved_interactive=1, metrics=MetricsRegistry())
+        
+        async with dispatcher.slot(Priority.INTERACTIVE):
+            pass
+        async with dispatcher.slot(Priority.BACKGROUND):
+            pass
+        
+        stats = dispatcher.stats()
+        assert stats["interactive"]["queue_time_seconds"]["count"] == 1
+        assert stats["background"]["queue_time_seconds"]["count"] == 1
+        assert stats["background"]["in_flight"] == 0
+    
+    def test_invalid_configuration(self):
+        with pytest.raises(ValueError):
+            LLMDispatcher(max_concurrency=0)
+        with pytest.raises(ValueError):
+            LLMDispatcher(max_concurrency=2, reserved_interactive=2)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,53 @@
+"""
+Tests for the hot-path microbenchmark regression gate.
+Checks the gate on hand-written results and runs every case once on
+tiny synthetic inputs; nothing is timed.
+"""
+import pytest
+from benchmarks.bench_hotpaths import CASES, Inputs, case_sizes, check
+
+
+def results(noise: float = 0.0, **normalized) -> dict:
+    return {
+        "results": {
+            key.replace("__", "/"): {"normalized": value, "noise": noise}
+            for key, value in normalized.items()
+        }
+    }
+
+
+class TestRegressionGate:
+    """Only slowdowns past the threshold fail the check."""
+    
+    def test_flags_slowdowns_past_threshold(self):
+        baseline = results(a__1=1.0, b__1=1.0, c__1=1.0)
+        current = results(a__1=1.2, b__1=1.5, c__1=0.5, d__1=9.0)
+        
+        assert check(baseline, current, threshold=0.25) == [("b/1", pytest.approx(0.5))]
+    
+    def test_noisy_cases_get_more_room(self):
+        baseline = results(noise=0.1, a__1=1.0)
+        
+        assert check(baseline, results(a__1=1.4), threshold=0.25) == []
+        assert check(baseline, results(a__1=1.5), threshold=0.25) == [("a/1", pytest.approx(0.5))]
+        # A noisy run doesn't loosen its own gate, and the widening is capped
+        assert check(baseline, results(noise=0.5, a__1=1.5), threshold=0.25) == [("a/1", pytest.approx(0.5))]
+        noisy = results(noise=0.8, a__1=1.0)
+        assert check(noisy, results(a__1=1.45), threshold=0.25) == []
+        assert check(noisy, results(a__1=2.0), threshold=0.25) == [("a/1", pytest.approx(1.0))]
+    
+    def test_case_sizes(self):
+        sizes = [1, 100, 100_000]
+        
+        assert case_sizes("prompt.render", sizes, 10_000) == [1]
+        assert case_sizes("messages.format", sizes, 10_000) == [1, 100]
+        assert case_sizes("memory.context", sizes, 10_000) == sizes
+    
+    def test_every_case_runs(self):
+        inputs = Inputs()
+        for name, case in CASES.items():
+            case(inputs, 5)()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
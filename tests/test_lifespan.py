@@ -0,0 +1,73 @@
+"""
+Tests for lifespan-managed resources and graceful shutdown drain.
+Uses the FakeLLM backend from conftest - no API calls.
+"""
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from src.api import resources as resources_module
+from src.api.resources import AppResources
+from src.models.memory import UserMemory
+
+
+class TestLifespan:
+    """Startup builds shared resources once per worker."""
+    
+    def test_startup_builds_and_warms_resources(self, fake_client, fake_llm, monkeypatch):
+        monkeypatch.setattr(resources_module, "GroqClient", lambda **kwargs: fake_client)
+        from server import app
+        
+        with TestClient(app) as api:
+            assert fake_llm.warmed
+            shared = app.state.resources
+            assert shared.groq_client is fake_client
+            
+            response = api.post(
+                "/api/respond",
+                json={"query": "hi", "memory": {}, "personality_id": "therapist"},
+            )
+            assert response.status_code == 200
+            assert app.state.resources is shared
+        
+        assert fake_llm.closed
+    
+    def test_preload_profiles(self, fake_client):
+        shared = AppResources.create(fake_client)
+        assert set(shared.personality_engine.preload_profiles()) == {
+            "calm-mentor", "witty-friend", "therapist"
+        }
+
+
+class TestShutdownDrain:
+    """Shutdown waits for in-flight LLM calls, bounded by a timeout."""
+    
+    @pytest.mark.asyncio
+    async def test_drain_waits_for_in_flight_calls(self, fake_client, fake_llm):
+        fake_llm.delays["respond"] = 0.05
+        shared = AppResources.create(fake_client)
+        call = asyncio.create_task(
+            shared.personality_engine.generate_response("hi", UserMemory(), "therapist")
+        )
+        await asyncio.sleep(0)
+        assert fake_client.active_calls == 1
+        
+        assert await shared.shutdown(drain_timeout=1.0)
+        assert call.done() and not call.cancelled()
+        assert fake_client.active_calls == 0
+    
+    @pytest.mark.asyncio
+    async def test_drain_gives_up_after_timeout(self, fake_client, fake_llm):
+        fake_llm.delays["respond"] = 5
+        shared = AppResources.create(fake_client)
+        call = asyncio.create_task(
+            shared.personality_engine.generate_response("hi", UserMemory(), "therapist")
+        )
+        await asyncio.sleep(0)
+        
+        assert not await shared.shutdown(drain_timeout=0.01)
+        assert fake_llm.closed
+        call.cancel()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
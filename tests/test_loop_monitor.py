@@ -0,0 +1,60 @@
+"""
+Tests for the event loop lag monitor.
+Uses the FakeLLM backend from conftest - no API calls.
+"""
+import asyncio
+import time
+import pytest
+from src.extractors.orchestrator import MemoryOrchestrator
+from src.models.messages import ChatMessage
+from src.observability.loop_monitor import LoopBlocked, LoopMonitor
+from src.observability.metrics import MetricsRegistry
+
+
+def monitor() -> LoopMonitor:
+    return LoopMonitor(interval=0.01, threshold=0.05, metrics=MetricsRegistry())
+
+
+async def blocking_handler():
+    time.sleep(0.3)
+
+
+class TestLoopMonitor:
+    """Lag is measured and blocking callbacks fail test mode with their stack."""
+    
+    @pytest.mark.asyncio
+    async def test_blocking_call_is_caught_with_stack(self):
+        loop_monitor = monitor()
+        with pytest.raises(LoopBlocked) as caught:
+            async with loop_monitor:
+                await asyncio.sleep(0.02)
+                await blocking_handler()
+        
+        assert "blocking_handler" in caught.value.block.stack
+        assert "time.sleep(0.3)" in caught.value.block.stack
+        assert caught.value.block.duration >= 0.2
+        assert loop_monitor.metrics.counter("loop.blocked") == 1
+        assert loop_monitor.metrics.histogram("loop.block_seconds")["count"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_awaiting_does_not_block(self):
+        async with monitor() as loop_monitor:
+            await asyncio.sleep(0.1)
+        
+        assert not loop_monitor.blocks
+        assert loop_monitor.metrics.histogram("loop.lag_seconds")["count"] >= 3
+        assert not loop_monitor.running
+    
+    @pytest.mark.asyncio
+    async def test_extraction_does_not_block(self, fake_client, fake_llm):
+        fake_llm.delays["facts"] = 0.05
+        orchestrator = MemoryOrchestrator(fake_client)
+        
+        async with monitor():
+            await orchestrator.extract_all([ChatMessage(content="I love hiking every weekend")])
+        
+        assert fake_llm.calls
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
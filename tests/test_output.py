@@ -0,0 +1,75 @@
+"""
+Tests for per-profile output-length policies.
+Query classification and budgets are checked directly; engine tests
+read the max_tokens and stop sent to the FakeLLM.
+"""
+import pytest
+from pydantic import ValidationError
+from types import SimpleNamespace
+from src.models.memory import UserMemory
+from src.models.personality import OutputPolicy
+from src.observability.metrics import METRICS
+from src.personality.engine import PersonalityEngine
+from src.personality.output import classify_query, output_limits
+
+
+class TestOutputPolicy:
+    """Budgets follow the query's kind and length within the profile's bounds."""
+    
+    def test_classify_query(self):
+        assert classify_query("good morning!!") == "greeting"
+        assert classify_query("hi") == "greeting"
+        assert classify_query("I've been so stressed about work lately...") == "venting"
+        assert classify_query("How do I make friends in a new city") == "question"
+        assert classify_query("Started learning guitar this week") == "statement"
+    
+    def test_budget_adapts_and_is_bounded(self):
+        policy = OutputPolicy(base_tokens=200, tokens_per_query_token=1.0, min_tokens=50, max_tokens=300)
+        greeting = output_limits(policy, "hey")
+        question = output_limits(policy, "What should I cook tonight?")
+        long_question = output_limits(policy, "What should I do? " + "I keep going back and forth. " * 40)
+        
+        assert greeting.max_tokens == 80
+        assert greeting.max_tokens < question.max_tokens < long_question.max_tokens == 300
+        assert output_limits(policy.model_copy(update={"base_tokens": 1}), "hey").max_tokens == 50
+        assert question.stop == ("\nUser:",)
+        with pytest.raises(ValidationError):
+            OutputPolicy(min_tokens=400, max_tokens=300)
+    
+    @pytest.mark.asyncio
+    async def test_engine_applies_profile_policy(self, fake_client, fake_llm):
+        engine = PersonalityEngine(fake_client)
+        witty = engine.profiles.current["witty-friend"].profile.output
+        therapist = engine.profiles.current["therapist"].profile.output
+        query = "I've been so stressed about work lately..."
+        
+        await engine.generate_response(query, UserMemory(), "witty-friend")
+        await engine.generate_response(query, UserMemory(), "therapist")
+        
+        caps = [call["max_tokens"] for call in fake_llm.calls]
+        assert caps == [output_limits(witty, query).max_tokens, output_limits(therapist, query).max_tokens]
+        assert caps[0] < caps[1]
+        assert all(call["stop"] == ["\nUser:"] for call in fake_llm.calls)
+        assert METRICS.histogram("personality.completion_tokens", profile="witty-friend")["count"] >= 1
+        assert METRICS.counter("personality.replies", profile="therapist", kind="venting") >= 1
+    
+    @pytest.mark.asyncio
+    async def test_length_stop_is_counted(self, fake_client, fake_llm, monkeypatch):
+        async def truncated(**request):
+            fake_llm.calls.append(request)
+            message = SimpleNamespace(content="okay but hear me")
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=message, finish_reason="length")],
+                usage=SimpleNamespace(completion_tokens=request["max_tokens"]),
+            )
+        monkeypatch.setattr(fake_llm, "create", truncated)
+        before = METRICS.counter("personality.length_stops", profile="witty-friend")
+        
+        response = await PersonalityEngine(fake_client).generate_response("hi", UserMemory(), "witty-friend")
+        
+        assert response.response == "okay but hear me"
+        assert METRICS.counter("personality.length_stops", profile="witty-friend") == before + 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
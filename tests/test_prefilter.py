@@ -0,0 +1,93 @@
+"""
+Tests for the extraction pre-filter.
+Uses the FakeLLM backend from conftest - no API calls.
+"""
+import pytest
+from src.extractors.orchestrator import MemoryOrchestrator
+from src.extractors.prefilter import FEATURES, MessagePrefilter
+from src.models.messages import ChatMessage
+from src.observability.metrics import MetricsRegistry
+
+
+def messages(*contents: str) -> list[ChatMessage]:
+    return [ChatMessage(content=c) for c in contents]
+
+
+class TestMessagePrefilter:
+    """Scoring, dropping and collapsing."""
+    
+    @pytest.fixture
+    def prefilter(self):
+        return MessagePrefilter(metrics=MetricsRegistry())
+    
+    def test_feature_matrix_shape(self, prefilter):
+        matrix = prefilter.features(messages("ok", "I love hiking", ""))
+        assert matrix.shape == (3, len(FEATURES))
+    
+    @pytest.mark.parametrize("content", ["ok", "lol", "hmm", "👍", "😂😂", "haha yeah", "thanks!"])
+    def test_filler_dropped(self, prefilter, content):
+        assert prefilter.apply(messages(content)).kept == []
+    
+    @pytest.mark.parametrize("content", [
+        "I love hiking",
+        "I'm vegan",
+        "moving to Pune next week",
+        "My sister's wedding is next month. So much to do!",
+        "日本語 and emojis 🎉 работает",
+    ])
+    def test_signal_kept(self, prefilter, content):
+        assert len(prefilter.apply(messages(content)).kept) == 1
+    
+    def test_original_indices_preserved(self, prefilter):
+        result = prefilter.apply(messages("ok", "I love hiking", "lol", "I work at a startup"))
+        
+        assert [i for i, _ in result.kept] == [1, 3]
+        assert result.dropped == [0, 2]
+        assert result.format() == "[1] I love hiking\n[3] I work at a startup"
+    
+    def test_duplicates_collapsed(self, prefilter):
+        result = prefilter.apply(messages("I love hiking!", "ok", "i love  hiking", "I love hiking"))
+        
+        assert [i for i, _ in result.kept] == [0]
+        assert result.duplicates == {0: [2, 3]}
+        assert result.format() == "[0] I love hiking! (repeated as [2], [3])"
+    
+    def test_zero_threshold_keeps_everything(self):
+        result = MessagePrefilter(threshold=0.0, metrics=MetricsRegistry()).apply(messages("ok", "lol"))
+        assert len(result.kept) == 2
+    
+    def test_metrics(self):
+        metrics = MetricsRegistry()
+        MessagePrefilter(metrics=metrics).apply(messages("ok", "I love hiking", "I love hiking"))
+        
+        assert metrics.counter("extraction.prefilter_messages", outcome="kept") == 1
+        assert metrics.counter("extraction.prefilter_messages", outcome="dropped") == 1
+        assert metrics.counter("extraction.prefilter_messages", outcome="collapsed") == 1
+        assert metrics.counter("extraction.prefilter_chars_saved") == len("ok") + len("I love hiking")
+
+
+class TestOrchestratorPrefilter:
+    """The orchestrator only sends surviving messages to the extractors."""
+    
+    @pytest.mark.asyncio
+    async def test_filler_never_reaches_llm(self, fake_client, fake_llm):
+        orchestrator = MemoryOrchestrator(fake_client)
+        
+        await orchestrator.extract_all(messages("ok", "I love hiking", "lol"))
+        
+        prompts = {call["messages"][1]["content"] for call in fake_llm.calls}
+        assert len(fake_llm.calls) == 3
+        assert all("[1] I love hiking" in p and "lol" not in p for p in prompts)
+    
+    @pytest.mark.asyncio
+    async def test_all_filler_skips_extraction(self, fake_client, fake_llm):
+        orchestrator = MemoryOrchestrator(fake_client)
+        
+        memory = await orchestrator.extract_all(messages("ok", "lol", "👍"))
+        
+        assert fake_llm.calls == []
+        assert memory.message_count == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
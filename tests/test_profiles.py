@@ -0,0 +1,153 @@
+"""
+Tests for file-based profiles, compiled prompts and hot reload.
+Uses the FakeLLM backend from conftest - no API calls.
+"""
+import asyncio
+import json
+import shutil
+import pytest
+from src.models.memory import UserMemory
+from src.observability.metrics import MetricsRegistry
+from src.personality.engine import PersonalityEngine
+from src.personality.profiles import PROFILES, PROFILES_DIR, load_profile_file, load_profiles
+from src.personality.registry import PROMPT_TEMPLATE, CompiledProfile, ProfileRegistry, ProfileStore
+
+
+@pytest.fixture
+def profile_dir(tmp_path):
+    for path in PROFILES_DIR.glob("*.json"):
+        shutil.copy(path, tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def store(profile_dir):
+    return ProfileStore(profile_dir, metrics=MetricsRegistry())
+
+
+def write_profile(directory, profile_id: str, **fields) -> None:
+    data = PROFILES["therapist"].model_dump() | {"id": profile_id, "name": profile_id.title()} | fields
+    (directory / f"{profile_id}.json").write_text(json.dumps(data))
+
+
+class TestCompiledProfiles:
+    """Profiles load from data/profiles with pre-rendered prompts."""
+    
+    def test_bundled_profiles(self):
+        assert set(ProfileRegistry.from_directory()) == {"calm-mentor", "witty-friend", "therapist"}
+    
+    def test_render_matches_template(self):
+        profile = PROFILES["calm-mentor"]
+        compiled = CompiledProfile.compile(profile)
+        
+        assert compiled.render("Key Facts: Has a dog") == PROMPT_TEMPLATE.format(
+            profile=profile, memory_context="Key Facts: Has a dog"
+        )
+        assert compiled.prefix.startswith(profile.system_prompt)
+    
+    def test_registry_is_read_only(self):
+        registry = ProfileRegistry(PROFILES.values())
+        with pytest.raises(TypeError):
+            registry._compiled["new"] = registry["therapist"]
+    
+    def test_id_must_match_file_name(self, tmp_path):
+        write_profile(tmp_path, "coach")
+        (tmp_path / "coach.json").rename(tmp_path / "mentor.json")
+        
+        with pytest.raises(ValueError, match="does not match"):
+            load_profile_file(tmp_path / "mentor.json")
+    
+    def test_invalid_file_skipped_at_startup(self, profile_dir, caplog):
+        write_profile(profile_dir, "coach", temperature=7)
+        (profile_dir / "broken.json").write_text("{not json")
+        
+        assert set(load_profiles(profile_dir)) == {"calm-mentor", "witty-friend", "therapist"}
+        assert set(ProfileStore(profile_dir, metrics=MetricsRegistry()).current) == set(PROFILES)
+        assert "Skipping profile file coach.json" in caplog.text
+    
+    def test_no_valid_profiles(self, tmp_path):
+        (tmp_path / "broken.json").write_text("{not json")
+        with pytest.raises(ValueError, match="No valid profiles"):
+            load_profiles(tmp_path)
+
+
+class TestHotReload:
+    """Changed files are swapped in; broken ones are skipped."""
+    
+    def test_new_profile_swapped_in(self, store, profile_dir):
+        old = store.current
+        assert not store.reload()
+        
+        write_profile(profile_dir, "coach")
+        
+        assert store.reload()
+        assert "coach" in store.current and "coach" not in old
+        assert store.current.version != old.version
+        assert store.metrics.histogram("profiles.swap_seconds")["count"] == 1
+    
+    def test_invalid_file_skipped(self, store, profile_dir):
+        write_profile(profile_dir, "coach", temperature=7)
+        write_profile(profile_dir, "mentor")
+        
+        assert store.reload()
+        assert "mentor" in store.current and "coach" not in store.current
+    
+    def test_broken_edit_keeps_last_good_version(self, store, profile_dir):
+        old = store.current["therapist"].profile
+        (profile_dir / "therapist.json").write_text("{not json")
+        
+        assert store.reload()
+        assert store.current["therapist"].profile is old
+    
+    def test_no_valid_profiles_keeps_current(self, store, profile_dir):
+        old = store.current
+        for path in profile_dir.iterdir():
+            path.unlink()
+        
+        assert not store.reload()
+        assert store.current is old
+        assert store.metrics.counter("profiles.reloads", outcome="failed") == 1
+    
+    @pytest.mark.asyncio
+    async def test_watcher(self, store, profile_dir):
+        store.start(interval=0.01)
+        write_profile(profile_dir, "coach")
+        await asyncio.sleep(0.05)
+        await store.stop()
+        
+        assert "coach" in store.current
+    
+    @pytest.mark.asyncio
+    async def test_in_flight_request_survives_swap(self, fake_client, fake_llm, store, profile_dir):
+        fake_llm.delays["respond"] = 0.05
+        engine = PersonalityEngine(fake_client, profiles=store)
+        
+        in_flight = asyncio.create_task(engine.generate_response("hi", UserMemory(), "therapist"))
+        await asyncio.sleep(0.01)
+        (profile_dir / "therapist.json").unlink()
+        assert store.reload()
+        
+        response = await in_flight
+        assert response.personality_id == "therapist"
+        assert fake_llm.calls[0]["messages"][0]["content"].startswith(PROFILES["therapist"].system_prompt)
+        with pytest.raises(ValueError):
+            await engine.generate_response("hi", UserMemory(), "therapist")
+    
+    @pytest.mark.asyncio
+    async def test_comparison_survives_swap(self, fake_client, fake_llm, store, profile_dir):
+        engine = PersonalityEngine(fake_client, profiles=store)
+        
+        async def reload_midway():
+            # Runs after the comparison has listed the profiles, before its calls start
+            (profile_dir / "therapist.json").unlink()
+            assert store.reload()
+        
+        responses, _ = await asyncio.gather(engine.generate_comparison("hi", UserMemory()), reload_midway())
+        events = [e async for e in engine.stream_comparison("hi", UserMemory(), registry=ProfileRegistry(PROFILES.values()))]
+        
+        assert set(responses) == set(PROFILES)
+        assert {e.personality_id for e in events if e.type == "personality"} == set(PROFILES)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,62 @@
+"""
+Tests for on-demand request profiling.
+Profiles /api/respond requests served by the app with a delayed FakeLLM,
+so the await time shows up in the written profiles.
+"""
+import json
+import pytest
+from fastapi.testclient import TestClient
+from src.api import resources as resources_module
+from src.observability.metrics import MetricsRegistry
+from src.observability.profiling import AWAIT_FRAME, ProfilingMiddleware
+
+RESPOND = {"query": "hi", "memory": {}, "personality_id": "therapist"}
+
+
+@pytest.fixture
+def profiled(fake_client, fake_llm, monkeypatch, tmp_path):
+    """The app behind a ProfilingMiddleware with token "secret"."""
+    monkeypatch.setattr(resources_module, "GroqClient", lambda **kwargs: fake_client)
+    from server import app
+    fake_llm.delays["respond"] = 0.05
+    return ProfilingMiddleware(app, token="secret", directory=tmp_path, interval=0.002, metrics=MetricsRegistry())
+
+
+class TestRequestProfiling:
+    """Profiles are written only for authorised or sampled requests."""
+    
+    def test_header_profiles_request(self, profiled, tmp_path):
+        with TestClient(profiled) as api:
+            response = api.post("/api/respond", json=RESPOND, headers={"X-Profile": "secret", "X-Request-ID": "req-1"})
+        
+        assert response.status_code == 200
+        assert response.headers["x-profile-id"] == "req-1"
+        profile = json.loads((tmp_path / "req-1.speedscope.json").read_text())
+        frames = [f["name"] for f in profile["shared"]["frames"]]
+        assert profile["profiles"][0]["samples"]
+        assert AWAIT_FRAME in frames
+        assert any(name.startswith("PersonalityEngine.generate_response") for name in frames)
+        collapsed = (tmp_path / "req-1.collapsed").read_text()
+        assert collapsed.splitlines()[0].endswith(tuple("0123456789"))
+        assert profiled.metrics.counter("profiling.profiles", trigger="header") == 1
+    
+    def test_wrong_token_or_no_header_is_not_profiled(self, profiled, tmp_path):
+        with TestClient(profiled) as api:
+            response = api.post("/api/respond", json=RESPOND, headers={"X-Profile": "guess"})
+            api.post("/api/respond", json=RESPOND)
+        
+        assert "x-profile-id" not in response.headers
+        assert list(tmp_path.iterdir()) == []
+        assert profiled.metrics.counter("profiling.rejected") == 1
+    
+    def test_sampling(self, profiled, tmp_path):
+        profiled.token = b""
+        profiled.sample_rate = 1.0
+        with TestClient(profiled) as api:
+            profile_id = api.post("/api/respond", json=RESPOND).headers["x-profile-id"]
+        
+        assert (tmp_path / f"{profile_id}.collapsed").exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
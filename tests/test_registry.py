@@ -0,0 +1,146 @@
+"""
+Tests for the extractor registry, concurrency budget and result cache.
+Uses the FakeLLM backend from conftest - no API calls.
+"""
+import asyncio
+import pytest
+from src.extractors.orchestrator import MemoryOrchestrator
+from src.extractors.registry import CostClass, ExtractorRegistry, ExtractorSpec, default_registry
+from src.extractors.scheduler import ExtractionScheduler
+from src.llm.deadline import Deadline, DeadlineExceeded
+from src.models.memory import Fact, Preference
+from src.models.messages import ChatMessage
+from src.observability.metrics import MetricsRegistry
+
+
+def messages(*contents: str) -> list[ChatMessage]:
+    return [ChatMessage(content=c) for c in contents]
+
+
+class CannedFacts:
+    """Extractor returning one fixed fact without calling the LLM."""
+    
+    def __init__(self, groq_client):
+        self.runs = 0
+    
+    async def extract(self, formatted_messages, deadline=None, complexity=None):
+        self.runs += 1
+        return [Fact(category="personal", fact="Has a cat", importance="low", confidence=0.7, source_message_ids=[0])]
+    
+    async def stream(self, formatted_messages, deadline=None, complexity=None):
+        for fact in await self.extract(formatted_messages, deadline, complexity):
+            yield fact
+
+
+class TestExtractorRegistry:
+    """Specs are validated against UserMemory."""
+    
+    def test_default_order(self):
+        assert default_registry().names == ("preferences", "facts", "emotional_patterns")
+    
+    @pytest.mark.parametrize("spec", [
+        ExtractorSpec("goals", CannedFacts, Fact),
+        ExtractorSpec("facts", CannedFacts, Preference),
+        ExtractorSpec("message_count", CannedFacts, Fact),
+    ])
+    def test_rejects_unknown_field_or_wrong_schema(self, spec):
+        with pytest.raises(ValueError):
+            ExtractorRegistry([spec])
+    
+    def test_cost_class_slots(self):
+        assert [c.slots for c in CostClass] == [1, 2, 4]
+
+
+class TestExtractionScheduler:
+    """Weighted admission in priority order."""
+    
+    @pytest.mark.asyncio
+    async def test_priority_order_and_capacity(self):
+        scheduler = ExtractionScheduler(capacity=2, metrics=MetricsRegistry())
+        order = []
+        gate = asyncio.Event()
+        
+        async def run(name, weight, priority):
+            async with scheduler.slot(name, weight, priority):
+                order.append(name)
+                assert scheduler.in_use <= 2
+                await gate.wait()
+        
+        holder = asyncio.create_task(run("holder", 2, 0))
+        await asyncio.sleep(0)
+        waiters = [
+            asyncio.create_task(run("late", 1, 5)),
+            asyncio.create_task(run("heavy", 2, 1)),
+            asyncio.create_task(run("light", 1, 1)),
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.queued == 3
+        
+        gate.set()
+        await asyncio.gather(holder, *waiters)
+        
+        assert order == ["holder", "heavy", "light", "late"]
+        assert scheduler.in_use == 0
+    
+    @pytest.mark.asyncio
+    async def test_deadline_while_queued(self):
+        scheduler = ExtractionScheduler(capacity=1, metrics=MetricsRegistry())
+        
+        async with scheduler.slot("holder"):
+            with pytest.raises(DeadlineExceeded):
+                async with scheduler.slot("waiter", deadline=Deadline.after(0.01)):
+                    pass
+            assert scheduler.queued == 0
+        assert scheduler.in_use == 0
+
+
+class TestOrchestratorRegistry:
+    """Registered extractors fill UserMemory by name; unchanged input is not re-extracted."""
+    
+    @pytest.mark.asyncio
+    async def test_unchanged_input_served_from_cache(self, fake_client, fake_llm):
+        orchestrator = MemoryOrchestrator(fake_client)
+        
+        first = await orchestrator.extract_all(messages("Hiking every weekend lately"))
+        calls = len(fake_llm.calls)
+        second = await orchestrator.extract_all(messages("Hiking every weekend lately"))
+        
+        assert calls == 3
+        assert len(fake_llm.calls) == calls
+        assert second.model_dump(exclude={"extracted_at"}) == first.model_dump(exclude={"extracted_at"})
+        
+        await orchestrator.extract_all(messages("Hiking every weekend lately", "Also swimming"))
+        assert len(fake_llm.calls) == 2 * calls
+    
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self, fake_client, fake_llm):
+        fake_llm.errors["facts"] = RuntimeError("boom")
+        orchestrator = MemoryOrchestrator(fake_client)
+        
+        await orchestrator.extract_all(messages("Hiking every weekend lately"))
+        del fake_llm.errors["facts"]
+        memory = await orchestrator.extract_all(messages("Hiking every weekend lately"))
+        
+        assert memory.extraction_errors == []
+        assert [fake_llm.kind(c) for c in fake_llm.calls].count("facts") == 2
+    
+    @pytest.mark.asyncio
+    async def test_custom_registry(self, fake_client, fake_llm):
+        registry = default_registry()
+        registry.unregister("emotional_patterns")
+        registry.register(ExtractorSpec("facts", CannedFacts, Fact, cost=CostClass.CHEAP))
+        orchestrator = MemoryOrchestrator(fake_client, registry=registry)
+        
+        memory = await orchestrator.extract_all(messages("Hiking every weekend lately"))
+        events = [e async for e in orchestrator.stream_all(messages("Hiking every weekend lately"))]
+        
+        assert orchestrator.sections == ("preferences", "facts")
+        assert [f.fact for f in memory.facts] == ["Has a cat"]
+        assert memory.emotional_patterns == []
+        assert {fake_llm.kind(c) for c in fake_llm.calls} == {"preferences"}
+        assert orchestrator.extractors["facts"].runs == 1
+        assert events[-1].memory.facts == memory.facts
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
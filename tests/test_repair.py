@@ -0,0 +1,138 @@
+"""
+Tests for local repair of malformed or partially valid LLM JSON.
+No API calls - repair runs on canned completion text.
+"""
+import json
+import pytest
+from src.llm.prompts import PREFERENCE_EXTRACTION_PROMPT
+from src.llm.repair import repair_json, validate_with_repair
+from src.models.memory import EmotionalPatternList, FactList, PreferenceList
+from src.observability.metrics import MetricsRegistry
+
+
+def preference(**overrides) -> dict:
+    item = {
+        "category": "interests",
+        "description": "Enjoys hiking",
+        "confidence": 0.9,
+        "source_message_ids": [2],
+        "evidence": "Went hiking this weekend",
+    }
+    item.update(overrides)
+    return item
+
+
+class TestRepairJson:
+    """Syntax-level repairs."""
+    
+    def test_valid_json_untouched(self):
+        text = json.dumps({"preferences": [preference()]})
+        assert repair_json(text) == (text, [])
+    
+    def test_truncated_json_keeps_complete_items(self):
+        text = json.dumps({"preferences": [preference(), preference()]})
+        truncated = text[: text.rindex('"evidence"') + 15]
+        
+        repaired, repairs = repair_json(truncated)
+        result = validate_with_repair(truncated, PreferenceList, MetricsRegistry())
+        
+        assert "truncated" in repairs
+        assert "evidence" not in json.loads(repaired)["preferences"][1]
+        assert result.preferences == PreferenceList(preferences=[preference()]).preferences
+    
+    def test_truncated_inside_string(self):
+        text = '{"preferences": [' + json.dumps(preference()) + ', {"category": "val'
+        repaired, _ = repair_json(text)
+        assert json.loads(repaired) == {"preferences": [preference()]}
+    
+    def test_code_fence_and_trailing_comma(self):
+        text = '```json\n{"facts": [],}\n```'
+        repaired, repairs = repair_json(text)
+        assert json.loads(repaired) == {"facts": []}
+        assert set(repairs) == {"code_fence", "trailing_comma"}
+
+
+class TestValidateWithRepair:
+    """Field-level repairs drop only what cannot be recovered."""
+    
+    def test_out_of_range_confidence_is_clamped(self):
+        metrics = MetricsRegistry()
+        content = json.dumps({"preferences": [preference(confidence=1.2)]})
+        
+        result = validate_with_repair(content, PreferenceList, metrics)
+        
+        assert result.preferences[0].confidence == 1.0
+        assert metrics.counter("llm.repairs", kind="clamped", model="PreferenceList") == 1
+    
+    def test_literal_is_coerced(self):
+        content = json.dumps({"preferences": [preference(category="Interest"), preference(category="VALUES")]})
+        result = validate_with_repair(content, PreferenceList, MetricsRegistry())
+        assert [p.category for p in result.preferences] == ["interests", "values"]
+    
+    @pytest.mark.parametrize("category", ["", " ", "i", "va", "x"])
+    def test_short_literal_junk_drops_item(self, category):
+        metrics = MetricsRegistry()
+        content = json.dumps({"preferences": [preference(category=category), preference()]})
+        
+        result = validate_with_repair(content, PreferenceList, metrics)
+        
+        assert [p.category for p in result.preferences] == ["interests"]
+        assert metrics.counter("llm.repairs", kind="coerced_literal", model="PreferenceList") == 0
+        assert metrics.counter("llm.repairs", kind="dropped_item", model="PreferenceList") == 1
+    
+    def test_invalid_item_dropped_siblings_kept(self):
+        metrics = MetricsRegistry()
+        content = json.dumps({"preferences": [
+            preference(),
+            preference(category="astrology"),
+            {"category": "values"},
+        ]})
+        
+        result = validate_with_repair(content, PreferenceList, metrics)
+        
+        assert len(result.preferences) == 1
+        assert metrics.counter("llm.repairs", kind="dropped_item", model="PreferenceList") == 2
+    
+    def test_scalar_lists_are_wrapped(self):
+        content = json.dumps({"emotional_patterns": [{
+            "pattern": "Stressed by deadlines",
+            "triggers": "deadlines",
+            "frequency": "frequent",
+            "emotional_range": ["stressed"],
+            "source_message_ids": "0, 7, 13",
+        }]})
+        result = validate_with_repair(content, EmotionalPatternList, MetricsRegistry())
+        pattern = result.emotional_patterns[0]
+        assert pattern.triggers == ["deadlines"]
+        assert pattern.source_message_ids == [0, 7, 13]
+    
+    def test_bare_array_is_wrapped(self):
+        content = json.dumps([{
+            "category": "personal", "fact": "Turning 28", "importance": "high",
+            "confidence": "95%", "source_message_ids": [3],
+        }])
+        result = validate_with_repair(content, FactList, MetricsRegistry())
+        assert result.facts[0].confidence == pytest.approx(0.95)
+    
+    def test_unrepairable_raises(self):
+        with pytest.raises(ValueError):
+            validate_with_repair("I could not find any preferences.", PreferenceList, MetricsRegistry())
+
+
+class TestClientRepairPath:
+    """GroqClient falls back to repair when the strict parse fails."""
+    
+    @pytest.mark.asyncio
+    async def test_one_bad_item_does_not_empty_the_extractor(self, fake_client, fake_llm):
+        fake_llm.content["preferences"] = json.dumps({"preferences": [
+            preference(), preference(confidence=1.2), preference(category="astrology"),
+        ]})
+        
+        result = await fake_client.extract_structured(PREFERENCE_EXTRACTION_PROMPT, "[0] hi", PreferenceList)
+        
+        assert len(result.preferences) == 2
+        assert len(fake_llm.calls) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
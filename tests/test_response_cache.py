@@ -0,0 +1,138 @@
+"""
+Tests for the personality response cache.
+Uses the FakeLLM backend from conftest - no API calls.
+"""
+import time
+import pytest
+from src.models.memory import Fact, UserMemory
+from src.observability.metrics import MetricsRegistry
+from src.personality.cache import ResponseCache, normalize_query
+from src.personality.engine import PersonalityEngine
+from src.personality.generic_cache import GenericResponseCache
+
+
+def fact(text: str) -> Fact:
+    return Fact(category="personal", fact=text, importance="high", confidence=1.0, source_message_ids=[0])
+
+
+@pytest.fixture
+def engine(fake_client) -> PersonalityEngine:
+    cache = ResponseCache(size=16, ttl=60, variants=1, metrics=MetricsRegistry())
+    return PersonalityEngine(fake_client, cache=cache)
+
+
+class TestResponseCache:
+    """Equivalent requests reuse replies until the memory, profile or TTL changes."""
+    
+    def test_normalize_query(self):
+        assert normalize_query("  Hiii!! ") == normalize_query("hii") == "hii"
+        assert normalize_query("Good   morning 🙂") == "good morning"
+        assert normalize_query("kal milte hai?") != normalize_query("kal milte hain")
+    
+    @pytest.mark.asyncio
+    async def test_equivalent_query_served_from_cache(self, engine, fake_llm):
+        memory = UserMemory(facts=[fact("Lives in Pune")])
+        first = await engine.generate_response("Good morning!", memory, "therapist")
+        second = await engine.generate_response("good morning", memory, "therapist")
+        other_profile = await engine.generate_response("good morning", memory, "witty-friend")
+        
+        assert len(fake_llm.calls) == 2
+        assert not first.cached and second.cached and not other_profile.cached
+        assert second.response == first.response
+        assert engine.cache.metrics.counter("personality.cache", outcome="hit") == 1
+        assert engine.cache.metrics.counter("personality.cache.saved_seconds") > 0
+        assert engine.cache.metrics.gauge("personality.cache.hit_rate") == pytest.approx(1 / 3)
+    
+    @pytest.mark.asyncio
+    async def test_memory_change_invalidates(self, engine, fake_llm):
+        await engine.generate_response("hi", UserMemory(facts=[fact("Lives in Pune")]), "therapist")
+        changed = await engine.generate_response("hi", UserMemory(facts=[fact("Moved to Delhi")]), "therapist")
+        
+        assert not changed.cached
+        assert len(fake_llm.calls) == 2
+    
+    @pytest.mark.asyncio
+    async def test_variants_and_ttl(self, fake_client, fake_llm):
+        cache = ResponseCache(size=16, ttl=0.2, variants=2, metrics=MetricsRegistry())
+        engine = PersonalityEngine(fake_client, cache=cache)
+        fake_llm.content["respond"] = "Namaste!"
+        
+        results = [await engine.generate_response("hi", UserMemory(), "therapist") for _ in range(4)]
+        assert [r.cached for r in results] == [False, False, True, True]
+        time.sleep(0.25)
+        assert not (await engine.generate_response("hi", UserMemory(), "therapist")).cached
+    
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self, fake_client, fake_llm):
+        engine = PersonalityEngine(fake_client, cache=ResponseCache(size=0))
+        for _ in range(2):
+            assert not (await engine.generate_response("hi", UserMemory(), "therapist")).cached
+        assert len(fake_llm.calls) == 2
+
+
+
+class TestGenericResponseCache:
+    """Reworded generic queries share a reply across users; memory stays bounded."""
+    
+    def test_rewording_hits_and_different_question_misses(self):
+        cache = GenericResponseCache(size=8, metrics=MetricsRegistry())
+        cache.put("How do I deal with stress?", "Take a breath.", 0.4)
+        cache.put("What should I eat for dinner?", "Try dal.", 0.4)
+        
+        assert cache.get("how to deal with stress") == "Take a breath."
+        assert cache.get("what should i eat for dinner") == "Try dal."
+        assert cache.get("Any good movies this weekend?") is None
+        assert cache.metrics.counter("generic_cache", outcome="reworded") == 1
+        assert cache.metrics.counter("generic_cache", outcome="exact") == 1
+        assert cache.metrics.counter("generic_cache.saved_seconds") == pytest.approx(0.8)
+    
+    @pytest.mark.parametrize("cached, query", [
+        ("should you quit a job?", "should you not quit a job?"),
+        ("is it ok to eat meat", "is it ok to eat wheat"),
+        ("how do you tell a boss you are quitting", "how do you tell a wife you are quitting"),
+        ("how do I deal with stress?", "how do I deal with anxiety?"),
+    ])
+    def test_different_question_misses(self, cached, query):
+        cache = GenericResponseCache(size=8, metrics=MetricsRegistry())
+        cache.put(cached, "reply", 0.4)
+        
+        assert cache.get(query) is None
+    
+    @pytest.mark.parametrize("query", [
+        "should I quit my job?",
+        "tell my boss I am quitting",
+        "my sister Priya passed away, how do I cope",
+        "How do I talk to Rahul about it",
+        "I'm so tired of everything",
+    ])
+    def test_personal_queries_are_not_shared(self, query):
+        cache = GenericResponseCache(size=8, metrics=MetricsRegistry())
+        cache.put(query, "reply", 0.4)
+        
+        assert cache.get(query) is None
+        assert cache.metrics.counter("generic_cache", outcome="personal") == 1
+    
+    def test_lru_eviction(self):
+        cache = GenericResponseCache(size=2, metrics=MetricsRegistry())
+        cache.put("how do I deal with stress", "a", 0.1)
+        cache.put("what should I eat for dinner", "b", 0.1)
+        cache.get("how do I deal with stress")
+        cache.put("any good movies this weekend", "c", 0.1)
+        
+        assert cache.get("what should I eat for dinner") is None
+        assert cache.get("how do I deal with stress") == "a"
+        assert cache.get("any good movies this weekend") == "c"
+        assert cache.metrics.counter("generic_cache.evictions") == 1
+    
+    @pytest.mark.asyncio
+    async def test_engine_shares_generic_reply(self, fake_client, fake_llm):
+        engine = PersonalityEngine(fake_client, generic_cache=GenericResponseCache(size=8, metrics=MetricsRegistry()))
+        first = await engine.generate_generic_response("How do I deal with stress at work?")
+        second = await engine.generate_generic_response("how do i deal with stress at work")
+        
+        assert second == first
+        assert len(fake_llm.calls) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
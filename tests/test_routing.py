@@ -0,0 +1,124 @@
+"""
+Tests for per-call model routing and small-to-large fallback.
+Uses the FakeLLM backend from conftest - no API calls.
+"""
+import json
+import pytest
+from src.extractors.orchestrator import MemoryOrchestrator
+from src.llm.prompts import FACT_EXTRACTION_PROMPT
+from src.llm.routing import LARGE_MODEL, SMALL_MODEL, Complexity, ModelRoute, ModelRouter, load_overrides
+from src.models.memory import FactList
+from src.models.messages import ChatMessage
+from src.observability.metrics import MetricsRegistry
+
+FACTS = json.dumps({"facts": [
+    {"category": "personal", "fact": "Has a dog", "importance": "low", "confidence": 0.8, "source_message_ids": [0]},
+]})
+
+
+def small_model_returns(fake_llm, content: str) -> None:
+    """Make fact extraction on the small model answer `content`."""
+    create = fake_llm.create
+    
+    async def routed_create(**request):
+        if request["model"] == SMALL_MODEL:
+            fake_llm.content["facts"], saved = content, fake_llm.content.get("facts", FACTS)
+            try:
+                return await create(**request)
+            finally:
+                fake_llm.content["facts"] = saved
+        return await create(**request)
+    
+    fake_llm.chat.completions = type("Completions", (), {"create": staticmethod(routed_create)})
+
+
+@pytest.fixture
+def metrics():
+    return MetricsRegistry()
+
+
+@pytest.fixture
+def routed_client(fake_client, metrics):
+    fake_client.router = ModelRouter(overrides={}, metrics=metrics)
+    return fake_client
+
+
+class TestModelRouter:
+    """Model choice by route and input complexity."""
+    
+    @pytest.mark.parametrize("route, complexity, expected", [
+        ("facts", Complexity(tokens=200), SMALL_MODEL),
+        ("facts", Complexity(tokens=5000), LARGE_MODEL),
+        ("preferences", Complexity(tokens=200, signal=2.5), SMALL_MODEL),
+        ("preferences", Complexity(tokens=200, signal=9.0), LARGE_MODEL),
+        ("emotional_patterns", Complexity(tokens=10), LARGE_MODEL),
+        ("personality", Complexity(tokens=10), LARGE_MODEL),
+        ("unknown", Complexity(tokens=10), LARGE_MODEL),
+    ])
+    def test_choose(self, metrics, route, complexity, expected):
+        assert ModelRouter(overrides={}, metrics=metrics).choose(route, complexity) == expected
+    
+    def test_overrides(self, metrics):
+        router = ModelRouter(
+            overrides=load_overrides('{"facts": {"small_model": null}, "generic": {"model": "other"}}'),
+            metrics=metrics,
+        )
+        
+        assert router.choose("facts", Complexity(tokens=10)) == LARGE_MODEL
+        assert router.route("generic").model == "other"
+        assert router.route("preferences") == ModelRoute(max_small_signal=6.0)
+    
+    def test_bad_overrides(self):
+        with pytest.raises(ValueError):
+            load_overrides('["facts"]')
+    
+    def test_client_keeps_default_model(self, fake_client):
+        assert fake_client.model == "llama-3.3-70b-versatile"
+
+
+class TestFallback:
+    """Invalid small-model output is retried on the large model."""
+    
+    @pytest.mark.asyncio
+    async def test_extract_structured_falls_back(self, routed_client, fake_llm, metrics):
+        fake_llm.content["facts"] = FACTS
+        small_model_returns(fake_llm, "Sure! Here are the facts: none")
+        
+        result = await routed_client.extract_structured(FACT_EXTRACTION_PROMPT, "I have a dog", FactList, route="facts")
+        
+        assert [f.fact for f in result.facts] == ["Has a dog"]
+        assert [c["model"] for c in fake_llm.calls] == [SMALL_MODEL, LARGE_MODEL]
+        assert metrics.counter("llm.validation", route="facts", model=SMALL_MODEL, outcome="invalid") == 1
+        assert metrics.counter("llm.validation", route="facts", model=LARGE_MODEL, outcome="valid") == 1
+        assert metrics.counter("llm.fallbacks", route="facts", model=SMALL_MODEL) == 1
+        assert metrics.histogram("llm.latency_seconds", route="facts", model=SMALL_MODEL)["count"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_valid_small_output_is_kept(self, routed_client, fake_llm, metrics):
+        fake_llm.content["facts"] = FACTS
+        
+        await routed_client.extract_structured(FACT_EXTRACTION_PROMPT, "I have a dog", FactList, route="facts")
+        
+        assert [c["model"] for c in fake_llm.calls] == [SMALL_MODEL]
+        assert metrics.counter("llm.validation", route="facts", model=SMALL_MODEL, outcome="valid") == 1
+    
+    @pytest.mark.asyncio
+    async def test_stream_falls_back_before_first_item(self, routed_client, fake_llm):
+        fake_llm.content["facts"] = FACTS
+        small_model_returns(fake_llm, "no json here")
+        
+        items = [i async for i in routed_client.stream_structured(FACT_EXTRACTION_PROMPT, "I have a dog", FactList, route="facts")]
+        
+        assert [f.fact for f in items] == ["Has a dog"]
+        assert [c["model"] for c in fake_llm.calls] == [SMALL_MODEL, LARGE_MODEL]
+    
+    @pytest.mark.asyncio
+    async def test_orchestrator_routes_by_section(self, routed_client, fake_llm):
+        await MemoryOrchestrator(routed_client).extract_all([ChatMessage(content="Hiking every weekend lately")])
+        
+        models = {fake_llm.kind(c): c["model"] for c in fake_llm.calls}
+        assert models == {"preferences": SMALL_MODEL, "facts": SMALL_MODEL, "emotional_patterns": LARGE_MODEL}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,131 @@
+"""
+Tests for the rule-based extraction fast path.
+Uses the FakeLLM backend from conftest - no API calls.
+"""
+import json
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.api import routes
+from src.api.resources import AppResources
+from src.extractors.orchestrator import MemoryOrchestrator
+from src.extractors.rules import RuleExtractor, is_duplicate
+from src.models.memory import Fact, Preference
+from src.models.messages import ChatMessage
+
+
+def messages(*contents: str) -> list[ChatMessage]:
+    return [ChatMessage(content=c) for c in contents]
+
+
+class TestRuleExtractor:
+    """Explicit statements become items with confidence 1.0."""
+    
+    @pytest.fixture
+    def extractor(self):
+        return RuleExtractor()
+    
+    @pytest.mark.parametrize("content, fact, category", [
+        ("I'm 28", "Is 28 years old", "personal"),
+        ("I am 31 years old.", "Is 31 years old", "personal"),
+        ("My sister's wedding is next month. So much to do!", "Sister's wedding is next month", "temporal"),
+        ("I work as a nurse at City Hospital.", "Works as a nurse at City Hospital", "professional"),
+        ("I live in Pune, it's nice", "Lives in Pune", "personal"),
+        ("I'm allergic to peanuts", "Allergic to peanuts", "personal"),
+        ("I'm from the UK but I love it here", "Is from the UK", "personal"),
+        ("I just moved to a small town near Pune.", "Moved to a small town near Pune", "temporal"),
+        ("My parents' anniversary is on Sunday", "Parents' anniversary is on Sunday", "temporal"),
+    ])
+    def test_facts(self, extractor, content, fact, category):
+        _, facts = extractor.extract(messages("ok", content))
+        
+        assert [(f.fact, f.category) for f in facts] == [(fact, category)]
+        assert facts[0].confidence == 1.0
+        assert facts[0].source_message_ids == [1]
+    
+    @pytest.mark.parametrize("content, description, category", [
+        ("I love cooking but never have time during weekdays.", "Enjoys cooking", "interests"),
+        ("I prefer deep conversations over small talk.", "Prefers deep conversations over small talk", "communication"),
+        ("I value honesty above everything else.", "Values honesty above everything else", "values"),
+        ("I'm a morning person.", "Is a morning person", "lifestyle"),
+    ])
+    def test_preferences(self, extractor, content, description, category):
+        preferences, _ = extractor.extract(messages(content))
+        
+        assert [(p.description, p.category) for p in preferences] == [(description, category)]
+        assert preferences[0].confidence == 1.0
+    
+    @pytest.mark.parametrize("content", ["I'm 5 minutes late", "I love it!", "My best friend moved to Delhi"])
+    def test_no_false_positives(self, extractor, content):
+        preferences, facts = extractor.extract(messages(content))
+        assert preferences == [] and all(not f.fact.startswith("Moved") for f in facts)
+    
+    @pytest.mark.parametrize("content", [
+        "I am from work",
+        "I live in fear of deadlines",
+        "my friend said hi",
+        "I'm moving to a new phase of life",
+        "my boss's attitude is the worst",
+    ])
+    def test_no_facts_from_figures_of_speech(self, extractor, content):
+        _, facts = extractor.extract(messages(content))
+        assert facts == []
+    
+    def test_repeated_statement_cites_every_message(self, extractor):
+        preferences, _ = extractor.extract(messages("I love cooking", "lol", "I love cooking!"))
+        assert preferences[0].source_message_ids == [0, 2]
+    
+    def test_assistant_messages_ignored(self, extractor):
+        preferences, facts = extractor.extract([ChatMessage(role="assistant", content="I love cooking. I'm 28")])
+        assert preferences == [] and facts == []
+
+
+class TestMerge:
+    """LLM items restating a rule item are dropped."""
+    
+    def test_is_duplicate(self):
+        rule = Fact(category="personal", fact="Is 28 years old", importance="high", confidence=1.0, source_message_ids=[3])
+        same = Fact(category="personal", fact="User is 28", importance="high", confidence=0.9, source_message_ids=[3])
+        other_message = same.model_copy(update={"source_message_ids": [4]})
+        
+        assert is_duplicate(rule, same)
+        assert not is_duplicate(rule, other_message)
+    
+    @pytest.mark.asyncio
+    async def test_extract_all_merges(self, fake_client, fake_llm):
+        fake_llm.content["preferences"] = json.dumps({"preferences": [
+            {"category": "interests", "description": "Loves cooking, short on time", "confidence": 0.9,
+             "source_message_ids": [0], "evidence": "I love cooking"},
+            {"category": "lifestyle", "description": "Relies on takeout on weekdays", "confidence": 0.8,
+             "source_message_ids": [0], "evidence": "It's always takeout"},
+        ]})
+        orchestrator = MemoryOrchestrator(fake_client)
+        
+        memory = await orchestrator.extract_all(messages("I love cooking but it's always takeout."))
+        
+        assert [p.description for p in memory.preferences] == ["Enjoys cooking", "Relies on takeout on weekdays"]
+    
+    @pytest.mark.asyncio
+    async def test_rule_items_stream_first(self, fake_client, fake_llm):
+        fake_llm.delays["facts"] = 0.05
+        orchestrator = MemoryOrchestrator(fake_client)
+        
+        events = [e async for e in orchestrator.stream_all(messages("I'm 28 and I love cooking."))]
+        
+        assert [(e.type, e.section) for e in events[:2]] == [("item", "preferences"), ("item", "facts")]
+        assert isinstance(events[0].item, Preference)
+        assert events[-1].memory.facts[0].fact == "Is 28 years old"
+    
+    def test_quick_route(self, fake_client, fake_llm):
+        app = FastAPI()
+        app.state.resources = AppResources.create(fake_client)
+        app.include_router(routes.router, prefix="/api")
+        
+        response = TestClient(app).post("/api/extract/quick", json={"messages": [{"content": "I'm 28"}]})
+        
+        assert response.json()["facts"][0]["fact"] == "Is 28 years old"
+        assert fake_llm.calls == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,66 @@
+"""
+Tests for the single-pass JSON validation and response serialization paths.
+Uses the FakeLLM backend from conftest - no API calls.
+"""
+import json
+import pytest
+from pydantic import ValidationError
+from src.api.responses import PydanticJSONResponse
+from src.llm.prompts import FACT_EXTRACTION_PROMPT
+from src.models.adapters import type_adapter
+from src.models.memory import Fact, FactList, UserMemory
+from src.models.personality import PersonalityResponse
+
+
+FACT = {
+    "category": "professional",
+    "fact": "Works at a startup",
+    "importance": "high",
+    "confidence": 0.95,
+    "source_message_ids": [4],
+}
+
+
+class TestStructuredValidation:
+    """GroqClient.extract_structured validates straight from the JSON text."""
+    
+    @pytest.mark.asyncio
+    async def test_valid_json(self, fake_client, fake_llm):
+        fake_llm.content["facts"] = json.dumps({"facts": [FACT]})
+        result = await fake_client.extract_structured(FACT_EXTRACTION_PROMPT, "[0] hi", FactList)
+        
+        assert result.facts == [Fact(**FACT)]
+    
+    @pytest.mark.asyncio
+    async def test_malformed_json_raises_validation_error(self, fake_client, fake_llm):
+        fake_llm.content["facts"] = '{"facts": [oops'
+        with pytest.raises(ValidationError):
+            await fake_client.extract_structured(FACT_EXTRACTION_PROMPT, "[0] hi", FactList)
+
+
+class TestPydanticJSONResponse:
+    """Responses are dumped by pydantic-core without re-validation."""
+    
+    def test_model_body_matches_model_dump_json(self):
+        memory = UserMemory(facts=[Fact(**FACT)], message_count=5)
+        response = PydanticJSONResponse(memory)
+        
+        assert response.media_type == "application/json"
+        assert json.loads(response.body) == json.loads(memory.model_dump_json())
+    
+    def test_typed_container(self):
+        responses = {
+            "therapist": PersonalityResponse(
+                personality_id="therapist", personality_name="Therapist", response="hi"
+            )
+        }
+        response = PydanticJSONResponse(responses, annotation=dict[str, PersonalityResponse])
+        
+        assert json.loads(response.body)["therapist"]["response"] == "hi"
+    
+    def test_type_adapters_are_cached(self):
+        assert type_adapter(dict[str, PersonalityResponse]) is type_adapter(dict[str, PersonalityResponse])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
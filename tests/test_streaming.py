@@ -0,0 +1,193 @@
+"""
+Tests for incremental JSON parsing and streamed extraction.
+Uses the FakeLLM backend from conftest - no API calls.
+"""
+import asyncio
+import json
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.api import routes
+from src.api.resources import AppResources
+from src.extractors.orchestrator import MemoryOrchestrator
+from src.llm.deadline import Deadline
+from src.llm.prompts import PREFERENCE_EXTRACTION_PROMPT
+from src.llm.streaming import IncrementalItemParser
+from src.models.memory import Preference, PreferenceList, UserMemory
+from src.models.messages import ChatMessage
+from src.personality.engine import PersonalityEngine
+from src.personality.profiles import PROFILES
+
+
+def preference(i: int, **overrides) -> dict:
+    item = {
+        "category": "interests",
+        "description": f'Enjoys {{hobby}} number {i}, "really"',
+        "confidence": 0.9,
+        "source_message_ids": [i],
+        "evidence": "mentioned [it] twice",
+    }
+    item.update(overrides)
+    return item
+
+
+def feed_all(parser: IncrementalItemParser, text: str, size: int) -> list[str]:
+    items = []
+    for start in range(0, len(text), size):
+        items.extend(parser.feed(text[start:start + size]))
+    return items
+
+
+class TestIncrementalItemParser:
+    """Items are emitted exactly when their object closes."""
+    
+    @pytest.mark.parametrize("chunk_size", [1, 7, 1000])
+    def test_items_from_wrapped_array(self, chunk_size):
+        payload = {"note": "[not {this}]", "preferences": [preference(0), preference(1)]}
+        items = feed_all(IncrementalItemParser("preferences"), json.dumps(payload), chunk_size)
+        assert [json.loads(i) for i in items] == payload["preferences"]
+    
+    def test_item_emitted_before_document_closes(self):
+        parser = IncrementalItemParser("preferences")
+        head = '{"preferences": [' + json.dumps(preference(0))
+        assert len(parser.feed(head)) == 1
+        assert parser.feed(', {"category": "val') == []
+    
+    def test_bare_array(self):
+        text = json.dumps([preference(0)])
+        assert len(feed_all(IncrementalItemParser("preferences"), text, 5)) == 1
+    
+    def test_other_arrays_ignored(self):
+        text = json.dumps({"examples": [preference(9)], "preferences": []})
+        parser = IncrementalItemParser("preferences")
+        assert feed_all(parser, text, 3) == []
+        assert parser.found_array
+    
+    def test_malformed_key_escape(self):
+        text = '{"n\\qote": "x", "preferences": [' + json.dumps(preference(0)) + "]}"
+        parser = IncrementalItemParser("preferences")
+        assert len(feed_all(parser, text, 4)) == 1
+        
+        parser = IncrementalItemParser("preferences")
+        assert feed_all(parser, '{"pref\\xerences": [' + json.dumps(preference(0)) + "]}", 4) == []
+        assert not parser.found_array
+
+
+class TestStreamStructured:
+    """GroqClient.stream_structured yields validated items progressively."""
+    
+    @pytest.mark.asyncio
+    async def test_first_item_before_stream_ends(self, fake_client, fake_llm):
+        fake_llm.content["preferences"] = json.dumps({"preferences": [preference(i) for i in range(3)]})
+        
+        seen = []
+        async for item in fake_client.stream_structured(PREFERENCE_EXTRACTION_PROMPT, "[0] hi", PreferenceList):
+            stream = fake_llm.streams[0]
+            seen.append((item, stream.sent))
+        
+        assert [item for item, _ in seen] == [Preference(**preference(i)) for i in range(3)]
+        assert seen[0][1] < stream.total
+        assert stream.closed
+        assert fake_client.active_calls == 0
+    
+    @pytest.mark.asyncio
+    async def test_bad_items_repaired_or_dropped(self, fake_client, fake_llm):
+        fake_llm.content["preferences"] = json.dumps({"preferences": [
+            preference(0, confidence=1.3), preference(1, category="astrology"), preference(2),
+        ]})
+        
+        items = [i async for i in fake_client.stream_structured(
+            PREFERENCE_EXTRACTION_PROMPT, "[0] hi", PreferenceList
+        )]
+        
+        assert [i.source_message_ids for i in items] == [[0], [2]]
+        assert items[0].confidence == 1.0
+
+
+class TestStreamAll:
+    """MemoryOrchestrator.stream_all interleaves sections and ends with the full memory."""
+    
+    @pytest.mark.asyncio
+    async def test_events_and_final_memory(self, fake_client, fake_llm):
+        fake_llm.content["preferences"] = json.dumps({"preferences": [preference(0), preference(1)]})
+        fake_llm.errors["facts"] = RuntimeError("boom")
+        orchestrator = MemoryOrchestrator(fake_client)
+        
+        events = [e async for e in orchestrator.stream_all([ChatMessage(content="Hiking every weekend lately")])]
+        
+        types = [e.type for e in events]
+        assert types.count("item") == 2 and types.count("error") == 1
+        done = events[-1]
+        assert done.type == "done"
+        assert len(done.memory.preferences) == 2
+        assert done.memory.extraction_errors == ["RuntimeError: boom"]
+    
+    def test_ndjson_route(self, fake_client, fake_llm):
+        fake_llm.content["preferences"] = json.dumps({"preferences": [preference(0)]})
+        app = FastAPI()
+        app.state.resources = AppResources.create(fake_client)
+        app.include_router(routes.router, prefix="/api")
+        
+        response = TestClient(app).post("/api/extract/stream", json={"messages": [{"content": "Hiking every weekend lately"}]})
+        
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[0] == {"type": "item", "section": "preferences", "item": preference(0)}
+        assert lines[-1]["type"] == "done"
+        assert lines[-1]["memory"]["message_count"] == 1
+
+
+
+class TestStreamComparison:
+    """PersonalityEngine.stream_comparison yields results in completion order."""
+    
+    @pytest.mark.asyncio
+    async def test_fast_results_not_held_back(self, fake_client, fake_llm):
+        fake_llm.delays["generic"] = 0.1
+        engine = PersonalityEngine(fake_client)
+        
+        events = [e async for e in engine.stream_comparison("hi", UserMemory())]
+        
+        types = [e.type for e in events]
+        assert types == ["personality"] * len(PROFILES) + ["generic", "done"]
+        assert {e.personality_id for e in events[:len(PROFILES)]} == set(PROFILES)
+        assert events[-2].generic == "generic reply"
+    
+    @pytest.mark.asyncio
+    async def test_late_calls_reported_and_cancelled(self, fake_client, fake_llm):
+        fake_llm.delays["generic"] = 5
+        engine = PersonalityEngine(fake_client)
+        
+        events = [
+            e async for e in engine.stream_comparison("hi", UserMemory(), deadline=Deadline.after(0.1))
+        ]
+        
+        assert [e.type for e in events][-2:] == ["error", "done"]
+        assert events[-2].error.startswith("DeadlineExceeded")
+        await asyncio.sleep(0)
+        assert "generic" in fake_llm.cancelled
+    
+    @pytest.mark.parametrize("accept", ["application/x-ndjson", "text/event-stream"])
+    def test_compare_route_streams_on_accept(self, fake_client, accept):
+        app = FastAPI()
+        app.state.resources = AppResources.create(fake_client)
+        app.include_router(routes.router, prefix="/api")
+        
+        response = TestClient(app).post(
+            "/api/compare",
+            json={"query": "hi", "memory": {}},
+            headers={"Accept": accept},
+        )
+        
+        assert response.headers["content-type"].startswith(accept)
+        if accept == "text/event-stream":
+            payloads = [line[len("data: "):] for line in response.text.splitlines() if line.startswith("data: ")]
+        else:
+            payloads = response.text.splitlines()
+        events = [json.loads(p) for p in payloads]
+        assert len(events) == len(PROFILES) + 2
+        assert events[-1]["type"] == "done"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
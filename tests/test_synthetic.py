@@ -0,0 +1,43 @@
+"""
+Tests for the seeded synthetic data generator.
+Pure generation and JSONL round-trips; no LLM client is involved.
+"""
+import pytest
+from benchmarks.synthetic import SyntheticConfig, generate_user, generate_users, iter_users, write_jsonl
+from src.extractors.rules import RuleExtractor
+
+
+class TestSyntheticUsers:
+    """Repeatable users whose memory matches their messages."""
+    
+    def test_seeded_and_independent(self):
+        config = SyntheticConfig(messages=(10, 100))
+        
+        assert generate_user(3, seed=7, config=config) == list(generate_users(5, seed=7, config=config))[3]
+        assert generate_user(3, seed=7, config=config) != generate_user(3, seed=8, config=config)
+    
+    def test_memory_matches_explicit_statements(self, tmp_path):
+        path = tmp_path / "users.jsonl"
+        with path.open("w", encoding="utf-8") as out:
+            write_jsonl(generate_users(1, config=SyntheticConfig(messages=(60, 60))), out)
+        _, messages, memory = next(iter_users(path))
+        preferences, facts = RuleExtractor().extract(messages)
+        
+        assert {f.fact for f in memory.facts} <= {f.fact for f in facts}
+        assert {p.description for p in memory.preferences} <= {p.description for p in preferences}
+        for item in memory.facts + memory.preferences + memory.emotional_patterns:
+            assert all(0 <= i < len(messages) for i in item.source_message_ids)
+    
+    def test_memory_padding_and_roundtrip(self, tmp_path):
+        path = tmp_path / "users.jsonl"
+        config = SyntheticConfig(messages=(50, 50), memory_items=200)
+        with path.open("w", encoding="utf-8") as out:
+            assert write_jsonl(generate_users(3, config=config), out) == 3
+        
+        users = list(iter_users(path))
+        assert [len(messages) for _, messages, _ in users] == [50, 50, 50]
+        assert all(len(m.facts) + len(m.preferences) + len(m.emotional_patterns) >= 200 for _, _, m in users)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,90 @@
+"""
+Tests for request trace recording and the replay schedule.
+Uses the FakeLLM backend from conftest - no API calls.
+"""
+import json
+import pytest
+from fastapi.testclient import TestClient
+from benchmarks.replay import load_trace, schedule
+from src.api import resources as resources_module
+from src.observability.metrics import MetricsRegistry
+from src.observability.traces import TraceRecorder
+
+
+@pytest.fixture
+def recorded(fake_client, monkeypatch, tmp_path):
+    """Serve the app behind a TraceRecorder; returns (client factory, trace path)."""
+    monkeypatch.setattr(resources_module, "GroqClient", lambda **kwargs: fake_client)
+    from server import app
+    trace = tmp_path / "trace.jsonl"
+    recorder = TraceRecorder(app, path=trace, metrics=MetricsRegistry())
+    yield recorder, trace
+    recorder.close()
+
+
+class TestTraceRecorder:
+    """API requests are appended as replayable JSON lines."""
+    
+    def test_records_api_requests(self, recorded):
+        recorder, trace = recorded
+        with TestClient(recorder) as api:
+            api.post("/api/extract", json={"messages": [{"content": "I love hiking"}]})
+            api.post(
+                "/api/respond",
+                json={"query": "hi", "memory": {}, "personality_id": "nobody"},
+                headers={"X-Request-Timeout-Ms": "5000", "X-Other": "dropped"},
+            )
+            api.get("/health")
+        
+        records = [json.loads(line) for line in trace.read_text().splitlines()]
+        assert [r["path"] for r in records] == ["/api/extract", "/api/respond"]
+        assert records[0]["body"] == {"messages": [{"content": "I love hiking"}]}
+        assert [r["status"] for r in records] == [200, 400]
+        assert records[1]["headers"]["x-request-timeout-ms"] == "5000"
+        assert "x-other" not in records[1]["headers"]
+        assert recorder.metrics.counter("traces.recorded") == 2
+    
+    def test_sampling(self, recorded):
+        recorder, trace = recorded
+        recorder.sample_rate = 0
+        with TestClient(recorder) as api:
+            api.post("/api/extract", json={"messages": []})
+        
+        assert not trace.exists()
+    
+    def test_write_errors_do_not_fail_requests(self, recorded, tmp_path):
+        recorder, _ = recorded
+        recorder.path = tmp_path  # a directory: every write fails
+        with TestClient(recorder) as api:
+            assert api.post("/api/extract", json={"messages": []}).status_code == 200
+        
+        assert recorder.metrics.counter("traces.write_errors") == 1
+        assert recorder.metrics.counter("traces.recorded") == 0
+
+
+class TestReplaySchedule:
+    """Recorded, time-scaled and fixed-rate send offsets."""
+    
+    @pytest.fixture
+    def trace(self, tmp_path):
+        path = tmp_path / "trace.jsonl"
+        lines = [{"t": 100 + t, "path": p, "body": {}} for t, p in [(2, "/api/respond"), (0, "/api/extract"), (1, "/health")]]
+        path.write_text("\n".join(json.dumps(r) for r in lines))
+        return load_trace(path)
+    
+    def test_recorded_timing(self, trace):
+        assert [r["path"] for r in trace] == ["/api/extract", "/api/respond"]
+        assert [offset for offset, _ in schedule(trace)] == [0, 2]
+        assert [offset for offset, _ in schedule(trace, speed=4)] == [0, 0.5]
+    
+    def test_fixed_rate_cycles_trace(self, trace):
+        plan = schedule(trace, rate=10, limit=5)
+        
+        assert [round(offset, 6) for offset, _ in plan] == [0, 0.1, 0.2, 0.3, 0.4]
+        assert [r["path"] for _, r in plan][:3] == ["/api/extract", "/api/respond", "/api/extract"]
+        poisson = schedule(trace, rate=10, arrivals="poisson", limit=1000)
+        assert poisson[-1][0] == pytest.approx(100, rel=0.15)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])